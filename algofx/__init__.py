@@ -0,0 +1,26 @@
+"""
+Core of AlgoFX: the algorithm language and its execution, without any UI.
+
+Nothing in this package imports PyQt5 or tkinter, so compiling, checking and
+running algorithms works on a server without a display and starts fast:
+
+- algo_lexer, algo_nodes, algo_parser: tokens and syntax tree of an algorithm
+- algo_checker: the diagnostics shown before compiling, in French or Arabic
+- algo_codegen: the Python syntax tree of an algorithm, and its SourceMap
+- algo_compiler: stateless compile(source, options) -> CompileResult
+- compile_cache: cache of compiled algorithms in memory and on disk
+- execution_guard, output_buffer, input_form, input_script: runtime helpers
+- algorithm_driver: step-by-step and headless execution
+- execution_pool: many headless runs at once, in subinterpreters or processes
+- process_runner: execution in a child process with resource limits
+- zygote: runner processes forked from a warm one instead of started
+- batch: checking and compiling whole folders in worker processes
+- grading: running submissions against test cases, with a score matrix
+- result_cache: on-disk cache of run results, for grading again
+- user_settings: the IDE settings, read without Qt
+- cli: the command-line tool, "python -m algofx check|compile|run"
+
+The IDE (algorithm_ide, compiler_module, real_time_execution and the other
+modules next to main.py) is built on top of it. Importing the package itself
+loads nothing; import the modules needed.
+"""
@@ -0,0 +1,568 @@
+"""
+Diagnostics for the French algorithm language.
+
+analyze() is the front end shared by the syntax checker and the compiler:
+the source is tokenized once (algo_lexer) and the token list walked once
+by the parser (algo_parser), which builds the tree algo_codegen turns into
+Python and hands each line it steps past to the checker. The checker looks
+at the line for every problem it knows about, each with a message in
+French or Arabic, and goes on alone over the lines after the one where a
+parse error stopped the parser.
+
+The checks are the ones the IDE has always run before compiling, made on
+tokens instead of regular expressions matched against each line. Where the
+old line patterns and the parser disagreed about valid code, the parser
+wins: a comment after code, accented keywords ("Début"), a ';' after
+'finsi' and expressions as 'pour' bounds ("a n - 1") are accepted, and the
+function in "ecrire(racine(x))" is not taken for an undeclared variable.
+"""
+import re
+from collections import namedtuple
+
+from .algo_lexer import tokenize, fold, KEYWORD, NAME, NEWLINE, EOF
+from .algo_parser import AlgoSyntaxError, parse
+
+# Message of each diagnostic code, in each error language
+MESSAGES = {
+    "algo_missing": {
+        "french": "L'en-tête de l'algorithme est manquant. L'algorithme doit commencer par 'algorithme nom_algo'.",
+        "arabic": "عليك بكتابة رأس الخورازمية بطريقة صحيحة Algorithme ثم اسم الخوارزمية."
+    },
+    "algo_name_invalid": {
+        "french": "Le nom de l'algorithme est invalide. Il doit suivre les règles de nommage des variables.",
+        "arabic": "اسم الخوارزمية غير صالح. يجب أن يتبع قواعد تسمية المتغيرات."
+    },
+    "algo_name_starts_with_number": {
+        "french": "Le nom de l'algorithme ne peut pas commencer par un chiffre.",
+        "arabic": "لا يمكن أن يبدأ اسم الخوارزمية برقم."
+    },
+    "algo_name_has_spaces": {
+        "french": "Le nom de l'algorithme ne peut pas contenir d'espaces.",
+        "arabic": "لا يمكن أن يحتوي اسم الخوارزمية على مسافات."
+    },
+    "algo_name_special_chars": {
+        "french": "Le nom de l'algorithme ne peut pas contenir de caractères spéciaux sauf '_'.",
+        "arabic": "لا يمكن أن يحتوي اسم الخوارزمية على أحرف خاصة باستثناء '_'."
+    },
+    "algo_name_reserved": {
+        "french": "Le nom de l'algorithme ne peut pas être un mot réservé.",
+        "arabic": "لا يمكن أن يكون اسم الخوارزمية كلمة محجوزة."
+    },
+    "var_section_missing": {
+        "french": "La section 'var' est manquante ou mal positionnée.",
+        "arabic": "قسم التصريح عن المتغيرات 'var' مفقود, مكتوب بطريقة غير صحيحة أو في موضع غير صحيح."
+    },
+    "var_name_invalid": {
+        "french": "Le nom de la variable '{}' est invalide. Il doit suivre les règles de nommage des variables.",
+        "arabic": "  اسم المتغير '{}' خاطئ. يجب أن يتبع قواعد تسمية المتغيرات."
+    },
+    "var_name_reserved": {
+        "french": "Le nom de la variable '{}' ne peut pas être un mot réservé.",
+        "arabic": "لا يمكن أن يكون اسم المتغير '{}' كلمة محجوزة."
+    },
+    "var_type_invalid": {
+        "french": "Le type '{}' n'est pas valide. Types valides: Entier, Reel, Chaine, Charactere, Boolean.",
+        "arabic": "النوع '{}' خاطئ.<br> الأنواع الصالحة: Entier, Reel, Chaine de caractere, Charactere, Boolean."
+    },
+    "var_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de la déclaration de variable.",
+        "arabic": "نقطة الفاصلة المنقوطة (;) مفقودة في نهاية إعلان المتغير."
+    },
+    "const_value_missing": {
+        "french": "La constante '{}' doit avoir une valeur assignée.",
+        "arabic": "يجب أن يكون للثابت '{}' قيمة معينة."
+    },
+    "const_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de la déclaration de constante.",
+        "arabic": "نقطة الفاصلة المنقوطة (;) مفقودة في نهاية إعلان الثابت."
+    },
+    "debut_missing": {
+        "french": "Le mot-clé 'debut' est manquant.",
+        "arabic": "الكلمة المفتاحية 'debut' مفقودة."
+    },
+    "fin_missing": {
+        "french": "Le mot-clé 'fin' est manquant.",
+        "arabic": "الكلمة المفتاحية 'fin' مفقودة."
+    },
+    "statement_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de cette instruction.",
+        "arabic": " الفاصلة المنقوطة (;) مفقودة في نهاية هذه التعليمة."
+    },
+    "undeclared_variable": {
+        "french": "La variable '{}' est utilisée mais n'a pas été déclarée.",
+        "arabic": "المتغير '{}' مستخدم ولكن لم يتم إعلانه."
+    },
+    "assignment_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de cette affectation.",
+        "arabic": " الفاصلة المنقوطة (;) مفقودة في نهاية عملية الإسناد."
+    },
+    "read_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de l'instruction 'lire'.",
+        "arabic": " الفاصلة المنقوطة (;) مفقودة في نهاية تعليمة القراءة 'lire'."
+    },
+    "write_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de l'instruction 'ecrire'.",
+        "arabic": " الفاصلة المنقوطة (;) مفقودة في نهاية تعليمة الكتابة 'ecrire'."
+    },
+    "read_invalid_spacing": {
+        "french": "Il ne doit pas y avoir d'espace entre 'lire' et '('.",
+        "arabic": "يجب أن لا يكون هناك مسافة بين 'lire' و '('."
+    },
+    "write_invalid_spacing": {
+        "french": "Il ne doit pas y avoir d'espace entre 'ecrire' et '('.",
+        "arabic": "يجب أن لا يكون هناك مسافة بين 'ecrire' و '('."
+    },
+    "si_missing_finsi": {
+        "french": "L'instruction 'si' n'a pas de 'finsi' correspondant.",
+        "arabic": "تعليمة 'si' ليس لها 'finsi'."
+    },
+    "pour_missing_finpour": {
+        "french": "L'instruction 'pour' n'a pas de 'finpour' correspondant.",
+        "arabic": "تعليمة 'pour' ليس لها 'finpour' ."
+    },
+    "tantque_missing_fintantque": {
+        "french": "L'instruction 'tantque' n'a pas de 'fintantque' correspondant.",
+        "arabic": "تعليمة 'tantque' ليس لها 'fintantque' ."
+    },
+    "si_missing_alors": {
+        "french": "L'instruction 'si' doit être suivie par 'alors'.",
+        "arabic": "تعليمة 'si' يجب أن تتبع بـ 'alors'."
+    },
+    "tantque_missing_faire": {
+        "french": "L'instruction 'tantque' doit être suivie par 'faire'.",
+        "arabic": "تعليمة 'tantque' يجب أن تتبع بـ 'faire'."
+    },
+    "pour_invalid_format": {
+        "french": "Format de boucle 'pour' invalide. Formats valides: 'pour var de val1 a val2 faire', 'pour var de val1 allant a val2 faire', 'pour var allant de val1 a val2 faire', ou avec l'option 'pas'.",
+        "arabic": "تنسيق حلقة 'pour' غير صالح.<br> التنسيقات الصالحة:<br> 'pour var de val1 a val2 faire'<br> 'pour var de val1 allant a val2 faire'<br> 'pour var allant de val1 a val2 faire'<br> أو مع خيار 'pas'."
+    },
+    "pour_missing_faire": {
+        "french": "L'instruction 'pour' doit se terminer par 'faire'.",
+        "arabic": "تعليمة 'pour' يجب أن تنتهي بـ 'faire'."
+    },
+    "invalid_instruction": {
+        "french": "Instruction non reconnue dans le bloc principal. Les instructions valides sont: lire, ecrire, affectation (<-), si...alors, pour...faire, tantque...faire, sortir ou commentaire.",
+        "arabic": "تعليمة غير معروفة في الكتلة الرئيسية. التعليمات الصالحة هي: lire, ecrire, affectation (<-), si...alors, pour...faire, tantque...faire, sortir أو تعليق."
+    },
+    "sortir_missing_semicolon": {
+        "french": "Il manque un point-virgule (;) à la fin de l'instruction 'sortir'.",
+        "arabic": "نقطة الفاصلة المنقوطة (;) مفقودة في نهاية تعليمة 'sortir'."
+    },
+    "var_format_invalid": {
+        "french": "Format de déclaration de variable invalide. Format valide: 'var_name: type;'",
+        "arabic": "تنسيق إعلان المتغير غير صالح. التنسيق الصالح: 'var_name: type;'"
+    },
+    "const_format_invalid": {
+        "french": "Format de déclaration de constante invalide. Format valide: 'const_name=value;'",
+        "arabic": "تنسيق إعلان الثابت غير صالح. التنسيق الصالح: 'const_name=value;'"
+    },
+    "duplicate_var": {
+        "french": "Variable '{}' déjà déclarée. Les noms des variables doivent être uniques.",
+        "arabic": "المتغير '{}' تم الإعلان عنه مسبقاً. أسماء المتغيرات يجب أن تكون فريدة."
+    },
+    "duplicate_const": {
+        "french": "Constante '{}' déjà déclarée. Les noms des constantes doivent être uniques.",
+        "arabic": "الثابت '{}' تم الإعلان عنه مسبقاً. أسماء الثوابت يجب أن تكون فريدة."
+    },
+    "var_const_name_conflict": {
+        "french": "Le nom '{}' est déjà utilisé comme constante. Les noms des variables et constantes doivent être uniques.",
+        "arabic": "الاسم '{}' مستخدم بالفعل كثابت. أسماء المتغيرات والثوابت يجب أن تكون فريدة."
+    },
+    "const_var_name_conflict": {
+        "french": "Le nom '{}' est déjà utilisé comme variable. Les noms des variables et constantes doivent être uniques.",
+        "arabic": "الاسم '{}' مستخدم بالفعل كمتغير. أسماء المتغيرات والثوابت يجب أن تكون فريدة."
+    }
+}
+
+# Words that cannot name the algorithm, a variable or a constant
+RESERVED_WORDS = frozenset([
+    "algorithme", "var", "const", "debut", "fin",
+    "si", "alors", "sinon", "finsi",
+    "pour", "faire", "finpour", "tantque", "fintantque", "sortir",
+    "lire", "ecrire", "et", "ou", "non", "mod", "div",
+    "entier", "reel", "chaine", "charactere", "boolean", "booleen",
+    "pas", "de", "allant",
+])
+
+# Declared types, spaces removed ("chaine de caractere")
+VALID_TYPES = frozenset(["entier", "reel", "chaine", "chainedecaractere", "charactere", "booleen", "boolean"])
+
+# Keywords opening a section of the algorithm, alone or before a declaration on their line
+_SECTIONS = ("var", "const", "debut", "fin")
+
+# Keywords between the bounds of a 'pour' header
+_POUR_MARKERS = ("de", "allant", "pas")
+
+# Keywords closing a block, alone on their line
+_BLOCK_ENDS = {"finsi": "si", "finpour": "pour", "fintantque": "tantque"}
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+# What follows 'algorithme' when it is a single word, valid name or not
+_HEADER_WORD = re.compile(r"\s+([^\s;]+)\s*;?\Z")
+
+Diagnostic = namedtuple("Diagnostic", "line text message code")
+Diagnostic.__doc__ = """A problem found by the checker: 1-based line, its text, the message and its code in MESSAGES."""
+
+Analysis = namedtuple("Analysis", "tokens program diagnostics syntax_error")
+Analysis.__doc__ = """Result of analyze(): tokens, Algorithme tree or None, Diagnostic list, AlgoSyntaxError or None."""
+
+
+def analyze(source, language="french"):
+    """
+    Tokenize an algorithm once, check it and parse it.
+
+    Args:
+        source: The algorithm source code
+        language: Language of the messages, "french" or "arabic"
+
+    Returns:
+        An Analysis. program is the parsed Algorithme, or None and
+        syntax_error says why; diagnostics lists everything the checker found
+    """
+    tokens = tokenize(source)
+    checker = _Checker(source, tokens, language)
+    try:
+        program, syntax_error = parse_program(tokens, checker.check_line), None
+    except AlgoSyntaxError as e:
+        program, syntax_error = None, e
+    # The lines after 'fin', or after the one the parser stopped on
+    for start, end in checker.token_lines(checker.next_start):
+        checker.check_line(start, end)
+    return Analysis(tokens, program, checker.finish(), syntax_error)
+
+
+def check(source, language="french"):
+    """The Diagnostic list of an algorithm, see analyze()."""
+    return check_tokens(source, tokenize(source), language)
+
+
+def parse_program(tokens, line_checker=None):
+    """
+    Parse a token list into an Algorithme tree; see algo_parser.Parser for line_checker.
+
+    Raises:
+        AlgoSyntaxError: If the Algorithme/Debut/Fin structure is missing or the tokens cannot be parsed
+    """
+    try:
+        return parse(tokens, line_checker)
+    except AlgoSyntaxError:
+        # Looked for only now: a parsed algorithm has all three
+        keywords_used = {token.value for token in tokens if token.kind == KEYWORD}
+        if not {"algorithme", "debut", "fin"} <= keywords_used:
+            raise AlgoSyntaxError("Structure de l'algorithme incomplète (Algorithme, Debut et Fin)", 1) from None
+        raise
+
+
+def check_tokens(source, tokens, language="french"):
+    """
+    Check an algorithm already tokenized.
+
+    Args:
+        source: The algorithm source code, for the text of the lines
+        tokens: tokenize(source)
+        language: Language of the messages, "french" or "arabic"
+
+    Returns:
+        List of Diagnostic, in the order the checker reports them
+    """
+    return _Checker(source, tokens, language).run()
+
+
+def _is_identifier(text):
+    return _IDENTIFIER.match(text) is not None
+
+
+class _Checker:
+    """
+    State of one check: check_line() for each line with tokens, in order, then finish().
+
+    Until the 'algorithme' header is found, lines are only checked as a
+    header; without one, finish() checks them all but the first as
+    instructions, the first being taken for the header.
+    """
+
+    def __init__(self, source, tokens, language):
+        self.lines = source.split("\n")
+        self.tokens = tokens
+        self.language = language
+        self.diagnostics = []
+
+        self.declared_vars = set()
+        self.declared_consts = set()
+        # Lowercase name -> line of its first use
+        self.used = {}
+
+        # Line numbers of the open blocks, by opening keyword
+        self.open_blocks = {"si": [], "pour": [], "tantque": []}
+        self.si_without_alors = []
+        self.tantque_without_faire = []
+        self.pour_without_faire = []
+
+        # Line of the header, None until found; the lines seen before it
+        self.header_line = None
+        self.before_header = []
+        self.found = set()
+        self.section = None
+        # Token index after the last line checked, and the number of that line
+        self.next_start = 0
+        self.last_line = 1
+
+    def text(self, line):
+        return self.lines[line - 1].strip() if 0 < line <= len(self.lines) else ""
+
+    def report(self, line, code, *args, text=None):
+        message = MESSAGES[code][self.language]
+        if args:
+            message = message.format(*args)
+        self.diagnostics.append(Diagnostic(line, self.text(line) if text is None else text, message, code))
+
+    def token_lines(self, start=0):
+        """(index of the first token, index past the last) of every line with tokens from token index start."""
+        # tokenize() ends every line with a NEWLINE token, the last one included
+        lines = []
+        for index in range(start, len(self.tokens)):
+            if self.tokens[index].kind == NEWLINE:
+                if start < index:
+                    lines.append((start, index))
+                start = index + 1
+        return lines
+
+    def run(self):
+        for start, end in self.token_lines():
+            self.check_line(start, end)
+        return self.finish()
+
+    def check_line(self, start, end):
+        """Check the line of the tokens from start to end (excluded)."""
+        self.next_start = end + 1
+        self.last_line = self.tokens[start].line
+        if self.header_line is None:
+            if self.check_header(start, end):
+                self.header_line = self.tokens[start].line
+            else:
+                self.before_header.append((start, end))
+            return
+        self.check_section_line(start, end)
+
+    def check_section_line(self, start, end):
+        first = self.tokens[start]
+        # A section keyword opens its section; a declaration may follow it on the same line
+        if first.kind == KEYWORD and first.value in _SECTIONS:
+            self.section = first.value
+            self.found.add(self.section)
+            start += 1
+            if start == end:
+                return
+        section = self.section
+        if section == "debut":
+            self.check_statement(start, end)
+        elif section == "var":
+            self.check_var(start, end)
+        elif section == "const":
+            self.check_const(start, end)
+
+    def finish(self):
+        """Report what only the whole algorithm tells; returns every Diagnostic."""
+        header_line = self.header_line
+        if header_line is None:
+            # Without a header the first line is taken for it
+            header_line = 1
+            for start, end in self.before_header[1:]:
+                self.check_section_line(start, end)
+        found = self.found
+        if "var" not in found:
+            self.report(header_line, "var_section_missing", text="")
+        if "debut" not in found:
+            self.report(self.last_line, "debut_missing", text="")
+        if "fin" not in found:
+            self.report(self.last_line, "fin_missing", text="")
+
+        declared = self.declared_vars | self.declared_consts
+        for name, line in self.used.items():
+            if name not in declared:
+                self.report(line, "undeclared_variable", name)
+
+        for keyword, code in (("si", "si_missing_finsi"), ("pour", "pour_missing_finpour"),
+                              ("tantque", "tantque_missing_fintantque")):
+            for line in self.open_blocks[keyword]:
+                self.report(line, code)
+        for line in self.si_without_alors:
+            self.report(line, "si_missing_alors")
+        for line in self.tantque_without_faire:
+            self.report(line, "tantque_missing_faire")
+        for line in self.pour_without_faire:
+            self.report(line, "pour_missing_faire")
+        return self.diagnostics
+
+    def check_header(self, start, end):
+        """Check a line that may be the 'algorithme nom' header; returns whether it is."""
+        first = self.tokens[start]
+        last = self.tokens[end - 1]
+        name_tokens = self.tokens[start + 1:end - 1 if last.is_op(";") else end]
+        if first.is_keyword("algorithme") and name_tokens:
+            name = name_tokens[0]
+            if len(name_tokens) == 1 and name.col > first.end_col and _is_identifier(name.text):
+                if name.text.lower() in RESERVED_WORDS:
+                    self.report(first.line, "algo_name_reserved")
+                return True
+            if _HEADER_WORD.match(self.lines[first.line - 1][first.end_col:last.end_col]):
+                self.report(first.line, "algo_name_invalid")
+                return True
+        self.report(first.line, "algo_missing")
+        return False
+
+    def check_name(self, name, line, kind):
+        """Check a declared name; kind is "var" or "const"."""
+        if not _is_identifier(name):
+            self.report(line, "var_name_invalid", name)
+            return
+        if name.lower() in RESERVED_WORDS:
+            self.report(line, "var_name_reserved", name)
+            return
+        lower = name.lower()
+        same, other = ((self.declared_vars, self.declared_consts) if kind == "var"
+                       else (self.declared_consts, self.declared_vars))
+        if lower in same:
+            self.report(line, "duplicate_" + kind, name)
+        elif lower in other:
+            self.report(line, "var_const_name_conflict" if kind == "var" else "const_var_name_conflict", name)
+        else:
+            same.add(lower)
+
+    def check_var(self, start, end):
+        """'a, b: entier;'"""
+        line = self.tokens[start].line
+        compact = "".join(token.text for token in self.tokens[start:end])
+        if not compact.endswith(";"):
+            self.report(line, "var_missing_semicolon")
+        if ":" not in compact:
+            self.report(line, "var_format_invalid")
+            return
+        parts = compact.split(":")
+        if len(parts) != 2:
+            return
+        names, type_name = parts[0], parts[1].rstrip(";")
+        if fold(type_name) not in VALID_TYPES:
+            self.report(line, "var_type_invalid", type_name)
+        for name in names.split(","):
+            if name:
+                self.check_name(name, line, "var")
+
+    def check_const(self, start, end):
+        """'NOM = valeur;'"""
+        line = self.tokens[start].line
+        compact = "".join(token.text for token in self.tokens[start:end])
+        if "=" not in compact:
+            self.report(line, "const_format_invalid")
+            return
+        if not compact.endswith(";"):
+            self.report(line, "const_missing_semicolon")
+        name, value = compact.split("=", 1)
+        self.check_name(name, line, "const")
+        if not value.rstrip(";"):
+            self.report(line, "const_value_missing", name)
+
+    def use(self, name, line):
+        self.used.setdefault(name.lower(), line)
+
+    def check_statement(self, start, end):
+        """One line of the main section."""
+        line_tokens = self.tokens[start:end]
+        # A NAME never has a keyword as value and an OP never a word, so values alone tell them apart
+        values = [token.value for token in line_tokens]
+        first = values[0]
+        line = line_tokens[0].line
+        ends_with_semicolon = values[-1] == ";"
+        valid = False
+
+        if first in ("si", "pour", "tantque"):
+            self.open_blocks[first].append(line)
+            valid = True
+            if first == "si":
+                if "alors" not in values:
+                    self.si_without_alors.append(line)
+            else:
+                if first == "pour" and not self.valid_pour_header(line_tokens, values):
+                    self.report(line, "pour_invalid_format")
+                if "faire" not in values:
+                    (self.pour_without_faire if first == "pour" else self.tantque_without_faire).append(line)
+        elif first in _BLOCK_ENDS and values.count(";") == len(values) - 1:
+            opened = self.open_blocks[_BLOCK_ENDS[first]]
+            if opened:
+                opened.pop()
+            valid = True
+
+        if "<-" in values:
+            if not ends_with_semicolon:
+                self.report(line, "assignment_missing_semicolon")
+            if values.index("<-") == 1 and _is_identifier(line_tokens[0].text):
+                self.use(line_tokens[0].text, line)
+            valid = True
+
+        for word in ("lire", "ecrire"):
+            if word not in values:
+                continue
+            valid = True
+            index = values.index(word)
+            keyword = line_tokens[index]
+            following = line_tokens[index + 1] if index + 1 < len(line_tokens) else None
+            if following is not None and following.is_op("(") and following.col > keyword.end_col:
+                self.report(line, "read_invalid_spacing" if word == "lire" else "write_invalid_spacing")
+            if not ends_with_semicolon:
+                self.report(line, "read_missing_semicolon" if word == "lire" else "write_missing_semicolon")
+            if following is not None and following.is_op("("):
+                self.use_arguments(line_tokens, index + 2, line, calls=word == "ecrire")
+
+        if first == "sinon":
+            valid = True
+        elif first == "sortir":
+            if not ends_with_semicolon:
+                self.report(line, "sortir_missing_semicolon")
+            valid = True
+
+        if not valid and "//" not in self.lines[line - 1]:
+            self.report(line, "invalid_instruction")
+
+    def use_arguments(self, line_tokens, index, line, calls):
+        """Mark the names between an opening parenthesis and its match as used, except called functions."""
+        depth = 0
+        for position in range(index, len(line_tokens)):
+            token = line_tokens[position]
+            if token.is_op("("):
+                depth += 1
+            elif token.is_op(")"):
+                if depth == 0:
+                    return
+                depth -= 1
+            elif token.kind == NAME and _is_identifier(token.text) and token.value not in RESERVED_WORDS:
+                following = line_tokens[position + 1] if position + 1 < len(line_tokens) else None
+                if not (calls and following is not None and following.is_op("(")):
+                    self.use(token.text, line)
+
+    def valid_pour_header(self, line_tokens, values):
+        """
+        Whether a 'pour' header has one of the accepted forms, each bound one or more tokens:
+            pour i de X a Y faire
+            pour i de X allant a Y faire
+            pour i allant de X a Y faire
+        each with an optional 'pas Z' before 'faire'.
+        """
+        if len(values) < 2 or line_tokens[1].kind != NAME or "faire" not in values:
+            return False
+        faire = values.index("faire")
+        markers = [index for index in range(2, faire) if values[index] in _POUR_MARKERS]
+        words = tuple(values[index] for index in markers)
+        if words[-1:] == ("pas",):
+            if faire == markers[-1] + 1:
+                return False
+            end = markers.pop()
+            words = words[:-1]
+        else:
+            end = faire
+        if words == ("de", "allant"):
+            de, allant = markers
+            return de == 2 and allant > de + 1 and values[allant + 1] == "a" and allant + 2 < end
+        if words == ("de",) or words == ("allant", "de"):
+            de = markers[-1]
+            return de == len(words) + 1 and any(values[index] == "a" for index in range(de + 2, end - 1))
+        return False
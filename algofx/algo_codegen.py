@@ -0,0 +1,544 @@
+"""
+Python code generation for the French algorithm language.
+
+PythonCodeGenerator walks an algo_nodes tree exactly once and builds the
+Python syntax tree (an ast.Module) that the IDE passes to compile(): no
+Python source is written out only to be parsed again. Every statement is
+located at the algorithm line it comes from, so compile errors and
+tracebacks of the code object already point into the student's code. The
+readable source shown in the "Code Python" tab comes from module_source(),
+only when it is needed, with a SourceMap from its lines to the algorithm.
+
+With as_function=True the instructions are emitted as the body of the
+function _algo_main(), called at the end: the variables become true locals
+(array slots instead of dict lookups in the module globals) and constants are
+bound as default arguments, which makes hot loops noticeably faster. With
+as_generator=True that function is a generator instead, for step-by-step
+execution by algorithm_driver: every Lire becomes a yield of its input
+request and every loop iteration a bare yield, where the driver may pause.
+"""
+import ast
+import copy
+
+from .algo_nodes import Span, Name, Number, String, Boolean, UnaryOp
+from .algo_parser import AlgoSyntaxError, INVALID_STRING_MESSAGE, NESTING_MESSAGE
+from .execution_guard import LOOP_GUARD_PER_LOOP, LOOP_GUARD_GLOBAL, LOOP_GUARD_MODES, STEP_LIMIT_MESSAGE
+from .input_form import READ_VALUES_FUNCTION, READ_VALUES_FALLBACK
+
+# Function holding the instructions in as_function mode
+MAIN_FUNCTION = "_algo_main"
+
+# Generator function holding the instructions in as_generator mode
+GENERATOR_FUNCTION = "_algorithme"
+
+# Type names in folded form (lowercase, no accents), see algo_lexer.fold
+TYPE_MAPPING = {
+    "entier": "int",
+    "reel": "float",
+    "chaine": "str",
+    "chaine de caractere": "str",
+    "chaine de caracteres": "str",
+    "booleen": "bool",
+    "boolean": "bool",
+    "caractere": "char",
+    "charactere": "char",
+    "char": "char"
+}
+
+# Default value of each declared variable
+DEFAULT_VALUES = {
+    "int": 0,
+    "float": 0.0,
+    "str": "",
+    "bool": False,
+    "char": ""
+}
+
+# Language operators and their Python AST operator. Operator nodes carry no
+# position, so one instance of each is shared, like _LOAD and _STORE below
+BINARY_OPERATORS = {
+    "+": ast.Add(),
+    "-": ast.Sub(),
+    "*": ast.Mult(),
+    "/": ast.Div(),
+    "mod": ast.Mod(),
+    "div": ast.FloorDiv(),
+    "puissance": ast.Pow()
+}
+
+UNARY_OPERATORS = {
+    "-": ast.USub(),
+    "+": ast.UAdd(),
+    "non": ast.Not()
+}
+
+BOOLEAN_OPERATORS = {
+    "et": ast.And(),
+    "ou": ast.Or()
+}
+
+# Comparisons as normalised by the parser, see algo_nodes.Compare
+COMPARISON_OPERATORS = {
+    "==": ast.Eq(),
+    "!=": ast.NotEq(),
+    "<": ast.Lt(),
+    "<=": ast.LtE(),
+    ">": ast.Gt(),
+    ">=": ast.GtE()
+}
+
+# Python 3.12 added type parameters to function definitions
+_FUNCTION_EXTRA_FIELDS = {"type_params": []} if "type_params" in ast.FunctionDef._fields else {}
+
+# Parsed once, copied into each module that needs it
+_READ_VALUES_FALLBACK = ast.parse(READ_VALUES_FALLBACK).body
+
+
+# Expression contexts carry no position and can be shared
+_LOAD = ast.Load()
+_STORE = ast.Store()
+
+
+def _position(span):
+    """Position attributes of the Python nodes generated for an algorithm span."""
+    return {"lineno": span.line, "col_offset": span.col,
+            "end_lineno": span.end_line, "end_col_offset": span.end_col}
+
+
+def _load(name, pos):
+    return ast.Name(name, _LOAD, **pos)
+
+
+def _store(name, pos):
+    return ast.Name(name, _STORE, **pos)
+
+
+def _constant(value, pos):
+    return ast.Constant(value, **pos)
+
+
+def _call(func, args, pos):
+    return ast.Call(_load(func, pos) if isinstance(func, str) else func, args, [], **pos)
+
+
+def _assign(name, value, pos):
+    return ast.Assign([_store(name, pos)], value, **pos)
+
+
+class SourceMap:
+    """
+    Where each line of a generated Python source comes from in the algorithm.
+
+    spans[n] is the Span of the algorithm code the statement on Python line n
+    was generated from, or None for a line without one (comments, else:);
+    spans[0] is unused. Every lookup is a single list index.
+    """
+    __slots__ = ("spans",)
+
+    def __init__(self, spans=None):
+        self.spans = spans if spans is not None else [None]
+
+    def __len__(self):
+        return len(self.spans) - 1
+
+    def span(self, python_line):
+        """Algorithm Span of a Python line, or None."""
+        if python_line is None or not 0 < python_line < len(self.spans):
+            return None
+        return self.spans[python_line]
+
+    def get(self, python_line, default=None):
+        """Algorithm line of a Python line, like dict.get() on {Python line: algorithm line}."""
+        span = self.span(python_line)
+        return span.line if span is not None else default
+
+    def lines(self):
+        """Algorithm line of every Python line, None where unknown; index 0 is line 1."""
+        return [span.line if span is not None else None for span in self.spans[1:]]
+
+
+def module_source(module, title=None):
+    """
+    Readable Python source of a generated module, for display or a standalone script.
+
+    Statements are written out one line at a time (expressions by
+    ast.unparse), so the source map is filled as the text is produced,
+    from the positions the generator gave each statement.
+
+    Args:
+        module: ast.Module built by PythonCodeGenerator.generate_module()
+        title: Algorithm name, written in a heading comment
+
+    Returns:
+        (source, source_map), source_map a SourceMap of source
+    """
+    lines = []
+    spans = [None]
+    if title is not None:
+        lines += [f"# Generated from algorithm: {title}", ""]
+        spans += [None, None]
+
+    def write(text, node, depth):
+        lines.append("    " * depth + text)
+        spans.append(Span(node.lineno, node.col_offset, node.end_lineno, node.end_col_offset))
+
+    def block(statements, depth):
+        for node in statements:
+            if isinstance(node, ast.If):
+                write(f"if {ast.unparse(node.test)}:", node, depth)
+            elif isinstance(node, ast.While):
+                write(f"while {ast.unparse(node.test)}:", node, depth)
+            elif isinstance(node, ast.For):
+                write(f"for {ast.unparse(node.target)} in {ast.unparse(node.iter)}:", node, depth)
+            elif isinstance(node, ast.FunctionDef):
+                write(f"def {node.name}({ast.unparse(node.args)}):", node, depth)
+            else:
+                write(ast.unparse(node), node, depth)
+                continue
+            block(node.body, depth + 1)
+            if getattr(node, "orelse", None):
+                # The else: line belongs to the first statement of its block
+                write("else:", node.orelse[0], depth)
+                block(node.orelse, depth + 1)
+
+    block(module.body, 0)
+    return "\n".join(lines), SourceMap(spans)
+
+
+class PythonCodeGenerator:
+    """Builds the Python syntax tree of an Algorithme tree in one walk."""
+
+    def __init__(self, max_execution_steps=1000, loop_guard=LOOP_GUARD_PER_LOOP, as_generator=False,
+                 as_function=False):
+        """
+        Args:
+            max_execution_steps: Iteration limit enforced by the loop counters
+            loop_guard: One of execution_guard.LOOP_GUARD_MODES
+            as_generator: Emit the instructions as the generator function GENERATOR_FUNCTION
+            as_function: Emit the instructions as the function MAIN_FUNCTION, then call it
+        """
+        if loop_guard not in LOOP_GUARD_MODES:
+            raise ValueError(f"Unknown loop guard mode: {loop_guard}")
+        self.max_execution_steps = max_execution_steps
+        self.loop_guard = loop_guard
+        self.as_generator = as_generator
+        self.as_function = as_function and not as_generator
+        self.loop_count = 0
+        self.variables = {}
+        self.constants = {}
+        self.source_map = SourceMap()
+        self.needs_math_import = False
+        self.needs_read_values = False
+        self._body = []
+
+    def emit(self, statement):
+        """Append one statement to the current block."""
+        self._body.append(statement)
+        return statement
+
+    def block(self, body):
+        """Python statements of an algorithm block, as a new list."""
+        outer, self._body = self._body, []
+        self.statements(body)
+        inner, self._body = self._body, outer
+        return inner
+
+    def generate(self, program):
+        """
+        Generate the Python source of a parsed algorithm.
+
+        Args:
+            program: The Algorithme node returned by the parser
+
+        Returns:
+            The Python source code; source_map maps its lines to the algorithm
+        """
+        source, self.source_map = module_source(self.generate_module(program), program.name)
+        return source
+
+    def generate_module(self, program):
+        """
+        Build the Python syntax tree of a parsed algorithm.
+
+        Every node is created with its position, so the tree needs no
+        ast.fix_missing_locations() pass before compile().
+
+        Args:
+            program: The Algorithme node returned by the parser
+
+        Returns:
+            An ast.Module for compile(); each statement has the line of the
+            algorithm it comes from, the generated setup that of the header
+        """
+        self.variables = {}
+        self.constants = {}
+        self.source_map = SourceMap()
+        self.needs_math_import = False
+        self.needs_read_values = False
+        self.loop_count = 0
+        header = _position(program.span)
+
+        declarations = {}
+        for decl in program.variables:
+            var_type = TYPE_MAPPING.get(decl.type_name)
+            if var_type is None:
+                continue
+            for name in decl.names:
+                self.variables[name] = var_type
+                declarations[name] = decl
+
+        for decl in program.constants:
+            self.constants[decl.name] = (self.constant_type(decl.value), self.expression(decl.value))
+
+        # Translate instructions first so we know whether math is needed
+        self._body = []
+        instructions = self.block(program.body)
+
+        module_body = self._body
+        if self.needs_math_import:
+            self.emit(ast.Import([ast.alias("math", None, **header)], **header))
+
+        # French boolean literals
+        self.emit(_assign("vrai", _constant(True, header), header))
+        self.emit(_assign("faux", _constant(False, header), header))
+
+        if self.needs_read_values:
+            # Read several variables at once (the IDE asks for them in a single form)
+            for statement in copy.deepcopy(_READ_VALUES_FALLBACK):
+                for child in ast.walk(statement):
+                    if "lineno" in child._attributes:
+                        for name, value in header.items():
+                            setattr(child, name, value)
+                self.emit(statement)
+
+        for decl in program.constants:
+            pos = _position(decl.span)
+            self.emit(_assign(decl.name, self.constants[decl.name][1], pos))
+
+        wrapper = GENERATOR_FUNCTION if self.as_generator else MAIN_FUNCTION if self.as_function else None
+        if wrapper:
+            self._body = []
+            if self.as_generator:
+                # A first pause before any instruction also makes it a generator when nothing else yields
+                self.emit(ast.Expr(ast.Yield(None, **header), **header))
+
+        # Initialize variables with default values
+        for var_name, var_type in self.variables.items():
+            pos = _position(declarations[var_name].span)
+            self.emit(_assign(var_name, _constant(DEFAULT_VALUES[var_type], pos), pos))
+
+        if self.loop_guard == LOOP_GUARD_GLOBAL:
+            # Global execution counter to prevent infinite loops
+            self.emit(_assign("_global_execution_counter", _constant(0, header), header))
+
+        self._body.extend(instructions)
+
+        if wrapper:
+            body = self._body or [ast.Pass(**header)]
+            self._body = module_body
+            # Constants (and math) as default arguments are locals of the function too
+            bound = [decl.name for decl in program.constants]
+            if self.needs_math_import:
+                bound.append("math")
+            arguments = ast.arguments(posonlyargs=[], args=[ast.arg(name, None, **header) for name in bound],
+                                      vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None,
+                                      defaults=[_load(name, header) for name in bound])
+            self.emit(ast.FunctionDef(wrapper, arguments, body, [], None, **_FUNCTION_EXTRA_FIELDS, **header))
+            if self.as_function:
+                self.emit(ast.Expr(_call(MAIN_FUNCTION, [], header), **header))
+
+        self._body = []
+        return ast.Module(module_body, [])
+
+    @staticmethod
+    def constant_type(value):
+        """Python type of a constant, from the shape of its value."""
+        if isinstance(value, UnaryOp) and value.op in ("-", "+") and isinstance(value.operand, Number):
+            value = value.operand
+        if isinstance(value, Boolean):
+            return "bool"
+        if isinstance(value, Number):
+            return "float" if "." in value.text else "int"
+        if isinstance(value, String):
+            # Single character in quotes is char type
+            return "char" if len(value.text) == 3 else "str"
+        return "expr"
+
+    # Statements
+
+    def statements(self, body):
+        for node in body:
+            try:
+                getattr(self, "visit_" + type(node).__name__)(node, _position(node.span))
+            except RecursionError:
+                # e.g. a sum of thousands of terms, which parses in a loop but is generated recursively
+                raise AlgoSyntaxError(NESTING_MESSAGE, node.span.line, node.span.col) from None
+
+    def loop_guard_start(self, pos):
+        """Emit what a loop needs before it starts; returns the name of its iteration counter."""
+        if self.loop_guard == LOOP_GUARD_GLOBAL:
+            return "_global_execution_counter"
+        if self.loop_guard != LOOP_GUARD_PER_LOOP:
+            return None
+        # Each loop gets its own counter, nested or sibling loops never share one
+        self.loop_count += 1
+        loop_counter_var = f"_loop_counter_{self.loop_count}"
+        self.emit(_assign(loop_counter_var, _constant(0, pos), pos))
+        return loop_counter_var
+
+    def loop_guard_check(self, loop_counter_var, pos):
+        """Emit the per-iteration check at the top of a loop body."""
+        if loop_counter_var is None:
+            return
+        self.emit(ast.AugAssign(_store(loop_counter_var, pos), BINARY_OPERATORS["+"], _constant(1, pos), **pos))
+        limit_exceeded = ast.Compare(_load(loop_counter_var, pos), [COMPARISON_OPERATORS[">"]],
+                                     [_constant(self.max_execution_steps, pos)], **pos)
+        error = _call("RuntimeError", [_constant(STEP_LIMIT_MESSAGE, pos)], pos)
+        self.emit(ast.If(limit_exceeded, [ast.Raise(error, None, **pos)], [], **pos))
+
+    def loop_body(self, node, loop_counter_var, pos):
+        outer, self._body = self._body, []
+        self.loop_guard_check(loop_counter_var, pos)
+        if self.as_generator:
+            # The driver may pause between two iterations
+            self.emit(ast.Expr(ast.Yield(None, **pos), **pos))
+        self.statements(node.body)
+        if not self._body:
+            self.emit(ast.Pass(**pos))
+        body, self._body = self._body, outer
+        return body
+
+    def visit_Si(self, node, pos):
+        body = self.block(node.body) or [ast.Pass(**pos)]
+        orelse = self.block(node.orelse)
+        self.emit(ast.If(self.expression(node.condition), body, orelse, **pos))
+
+    def visit_TantQue(self, node, pos):
+        loop_counter_var = self.loop_guard_start(pos)
+        condition = self.expression(node.condition)
+        self.emit(ast.While(condition, self.loop_body(node, loop_counter_var, pos), [], **pos))
+
+    def visit_Pour(self, node, pos):
+        loop_counter_var = self.loop_guard_start(pos)
+        end = self.expression(node.end)
+        bounds = [self.expression(node.start), ast.BinOp(end, BINARY_OPERATORS["+"], _constant(1, pos), **pos)]
+        # Include step parameter in range if specified
+        if node.step is not None:
+            bounds.append(self.expression(node.step))
+        loop = ast.For(_store(node.var, pos), _call("range", bounds, pos),
+                       self.loop_body(node, loop_counter_var, pos), [], **pos)
+        self.emit(loop)
+
+    def read_fields(self, node, pos):
+        """The (name, type) pairs a Lire asks for, as a tuple per variable."""
+        return [ast.Tuple([_constant(target.id, pos), _constant(self.variables.get(target.id, 'str'), pos)],
+                          _LOAD, **pos)
+                for target in node.targets]
+
+    def read_targets(self, node, pos):
+        return ast.Tuple([_store(target.id, _position(target.span)) for target in node.targets], _STORE, **pos)
+
+    def visit_Lire(self, node, pos):
+        if self.as_generator:
+            # The driver answers with the converted values, see algorithm_driver
+            request = ast.Yield(ast.List(self.read_fields(node, pos), _LOAD, **pos), **pos)
+            self.emit(ast.Assign([self.read_targets(node, pos)], request, **pos))
+            return
+        if len(node.targets) > 1:
+            # One call for all the variables, see input_form
+            self.needs_read_values = True
+            values = _call(READ_VALUES_FUNCTION, self.read_fields(node, pos), pos)
+            self.emit(ast.Assign([self.read_targets(node, pos)], values, **pos))
+            return
+        for target in node.targets:
+            var_name = target.id
+            # Look up the variable type and add appropriate conversion
+            var_type = self.variables.get(var_name)
+            if var_type == "bool":
+                prompt = _constant(f"Entrez {var_name} (vrai/faux): ", pos)
+            else:
+                prompt = _constant(f"Entrez {var_name}: ", pos)
+            text = _call("input", [prompt], pos)
+            if var_type == "int":
+                self.emit(_assign(var_name, _call("int", [text], pos), pos))
+            elif var_type == "float":
+                self.emit(_assign(var_name, _call("float", [text], pos), pos))
+            elif var_type == "bool":
+                self.emit(_assign("_input", _call(ast.Attribute(text, "lower", _LOAD, **pos), [], pos), pos))
+                true_words = ast.List([_constant(word, pos) for word in ("vrai", "true", "1")], _LOAD, **pos)
+                self.emit(_assign(var_name, ast.Compare(_load("_input", pos), [ast.In()], [true_words], **pos),
+                                  pos))
+            elif var_type == "char":
+                self.emit(_assign("_input", text, pos))
+                first = ast.Subscript(_load("_input", pos), _constant(0, pos), _LOAD, **pos)
+                self.emit(_assign(var_name, ast.IfExp(_load("_input", pos), first, _constant("", pos), **pos), pos))
+            else:
+                self.emit(_assign(var_name, text, pos))
+
+    def visit_Ecrire(self, node, pos):
+        processed_items = []
+        for value in node.values:
+            # Boolean variables are displayed as vrai/faux
+            if isinstance(value, Name) and self.variables.get(value.id) == "bool":
+                value_pos = _position(value.span)
+                processed_items.append(ast.IfExp(self.expression(value), _constant("vrai", value_pos),
+                                                 _constant("faux", value_pos), **value_pos))
+            else:
+                processed_items.append(self.expression(value))
+        self.emit(ast.Expr(_call("print", processed_items, pos), **pos))
+
+    def visit_Affectation(self, node, pos):
+        target = _store(node.target.id, _position(node.target.span))
+        self.emit(ast.Assign([target], self.expression(node.value), **pos))
+
+    def visit_Sortir(self, node, pos):
+        self.emit(ast.Break(**pos))
+
+    # Expressions
+
+    def expression(self, node):
+        """Python AST of an expression, located at its algorithm span."""
+        return getattr(self, "expr_" + type(node).__name__)(node, _position(node.span))
+
+    def expr_Name(self, node, pos):
+        return _load(node.id, pos)
+
+    def expr_Number(self, node, pos):
+        return _constant(float(node.text) if "." in node.text else int(node.text), pos)
+
+    def expr_String(self, node, pos):
+        # The quotes are part of the text; escapes mean what they mean in Python
+        if "\\" in node.text:
+            try:
+                return _constant(ast.literal_eval(node.text), pos)
+            except (SyntaxError, ValueError):
+                # The parser rejects such literals; only a tree built without it gets here
+                message = INVALID_STRING_MESSAGE.format(node.text)
+                raise AlgoSyntaxError(message, node.span.line, node.span.col) from None
+        return _constant(node.text[1:-1], pos)
+
+    def expr_Boolean(self, node, pos):
+        return _constant(node.value, pos)
+
+    def expr_Call(self, node, pos):
+        if node.func.lower() == "racine":
+            self.needs_math_import = True
+            func = ast.Attribute(_load("math", pos), "sqrt", _LOAD, **pos)
+        else:
+            func = node.func
+        return _call(func, [self.expression(arg) for arg in node.args], pos)
+
+    def expr_UnaryOp(self, node, pos):
+        return ast.UnaryOp(UNARY_OPERATORS[node.op], self.expression(node.operand), **pos)
+
+    def expr_BinOp(self, node, pos):
+        return ast.BinOp(self.expression(node.left), BINARY_OPERATORS[node.op], self.expression(node.right),
+                         **pos)
+
+    def expr_BoolOp(self, node, pos):
+        return ast.BoolOp(BOOLEAN_OPERATORS[node.op], [self.expression(node.left), self.expression(node.right)],
+                          **pos)
+
+    def expr_Compare(self, node, pos):
+        return ast.Compare(self.expression(node.left), [COMPARISON_OPERATORS[op] for op in node.ops],
+                           [self.expression(comparator) for comparator in node.comparators], **pos)
@@ -0,0 +1,169 @@
+"""
+Lexer for the French algorithm language.
+
+The whole source is scanned once with a single precompiled master regex and
+turned into a flat list of typed tokens. Every token keeps its line and column
+so that later stages (compiler, syntax checker, error dialogs) can point back
+at the exact place in the editor.
+
+Words are folded once per token: lowercase, accents removed. The folded form
+is stored in ``Token.value`` so the rest of the compiler only ever compares
+against plain ASCII spellings ("ecrire", "reel", "debut") whatever the student
+typed ("ÉCRIRE", "Réel", "Début").
+"""
+import re
+import unicodedata
+from collections import namedtuple
+
+# Token kinds
+KEYWORD = "KEYWORD"
+NAME = "NAME"
+NUMBER = "NUMBER"
+STRING = "STRING"
+OP = "OP"
+NEWLINE = "NEWLINE"
+ERROR = "ERROR"
+EOF = "EOF"
+
+# Reserved words of the language, in folded form. Type names and the "a"/"à"
+# of a "pour" header are deliberately not reserved: they are only meaningful
+# in context and "a" is a very common variable name.
+KEYWORDS = frozenset([
+    "algorithme", "var", "const", "debut", "fin",
+    "si", "alors", "sinon", "finsi",
+    "pour", "de", "allant", "pas", "faire", "finpour",
+    "tantque", "fintantque", "sortir",
+    "lire", "ecrire",
+    "et", "ou", "non", "mod", "div", "puissance",
+    "vrai", "faux",
+])
+
+# Leading blanks are part of every match so they never cost a loop turn of
+# their own; the final empty alternative swallows trailing blanks.
+_TOKEN_RE = re.compile(r"""
+    [ \t\r\f\v]*
+    (?:
+      (?P<newline>\n)
+    | (?P<comment>//[^\n]*)
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<string>"[^"\n]*"|'[^'\n]*')
+    | (?P<badstring>["'][^\n]*)
+    | (?P<name>[^\W\d]\w*)
+    | (?P<op><-|<>|<=|>=|==|!=|[-+*/%^<>=(),;:.\[\]])
+    | (?P<error>.)
+    | $
+    )
+""", re.VERBOSE)
+
+# Token kind of each group of _TOKEN_RE, by group number, as tokenize() reads them from match.lastindex
+_GROUP_KINDS = [None] * (_TOKEN_RE.groups + 1)
+for _group, _kind in (("newline", NEWLINE), ("number", NUMBER), ("string", STRING), ("badstring", ERROR),
+                      ("name", NAME), ("op", OP), ("error", ERROR)):
+    _GROUP_KINDS[_TOKEN_RE.groupindex[_group]] = _kind
+del _group, _kind
+_COMMENT_GROUP = _TOKEN_RE.groupindex["comment"]
+_NAME_GROUP = _TOKEN_RE.groupindex["name"]
+_NEWLINE_GROUP = _TOKEN_RE.groupindex["newline"]
+
+_fold_cache = {}
+
+
+def fold(word):
+    """Return the lowercase, accent-free spelling of a word ("Écrire" -> "ecrire")."""
+    folded = _fold_cache.get(word)
+    if folded is None:
+        decomposed = unicodedata.normalize("NFD", word.lower())
+        folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+        if len(_fold_cache) < 4096:
+            _fold_cache[word] = folded
+    return folded
+
+
+class Token(namedtuple("Token", "kind value text line col")):
+    """A lexical token.
+
+    Attributes:
+        kind: One of KEYWORD, NAME, NUMBER, STRING, OP, NEWLINE, ERROR, EOF
+        value: Folded spelling for words, the text itself for everything else
+        text: Exact source text of the token
+        line: 1-based line number
+        col: 0-based column of the first character
+    """
+    __slots__ = ()
+
+    @property
+    def end_col(self):
+        return self.col + len(self.text)
+
+    def is_keyword(self, *words):
+        return self.kind == KEYWORD and self.value in words
+
+    def is_op(self, *ops):
+        return self.kind == OP and self.value in ops
+
+
+def tokenize(source):
+    """
+    Split algorithm source code into tokens.
+
+    Whitespace and comments are dropped. Every source line produces a NEWLINE
+    token and the list always ends with an EOF token, so consumers never have
+    to bounds-check.
+
+    Args:
+        source: The algorithm source code
+
+    Returns:
+        List of Token
+    """
+    tokens = []
+    append = tokens.append
+    # tuple.__new__ skips the Python-level __new__ of the namedtuple
+    new_token = tuple.__new__
+    group_kinds = _GROUP_KINDS
+    line = 1
+    line_start = 0
+    for match in _TOKEN_RE.finditer(source):
+        # Group numbers, not names: no dictionary lookup for each token
+        group = match.lastindex
+        if group is None or group == _COMMENT_GROUP:
+            continue
+        text = match.group(group)
+        col = match.start(group) - line_start
+        if group == _NAME_GROUP:
+            value = _fold_cache.get(text) or fold(text)
+            append(new_token(Token, (KEYWORD if value in KEYWORDS else NAME, value, text, line, col)))
+            continue
+        append(new_token(Token, (group_kinds[group], text, text, line, col)))
+        if group == _NEWLINE_GROUP:
+            line += 1
+            line_start = match.end()
+    append(Token(NEWLINE, "\n", "", line, len(source) - line_start))
+    append(Token(EOF, "", "", line, len(source) - line_start))
+    return tokens
+
+
+def split_lines(tokens):
+    """Group a token list into one list per non-empty source line."""
+    lines = []
+    current = []
+    for token in tokens:
+        if token.kind == NEWLINE or token.kind == EOF:
+            if current:
+                lines.append(current)
+                current = []
+        else:
+            current.append(token)
+    return lines
+
+
+def tokens_to_source(tokens):
+    """Rebuild source text from tokens, keeping the original spacing between them."""
+    parts = []
+    previous = None
+    for token in tokens:
+        if previous is not None and (previous.line != token.line or previous.end_col != token.col):
+            parts.append(" ")
+        parts.append(token.text)
+        previous = token
+    return "".join(parts)
@@ -0,0 +1,144 @@
+"""
+Syntax tree of the French algorithm language.
+
+Nodes are produced by algo_parser.Parser in a single pass over the token
+stream and consumed by algo_codegen. Every node carries a Span pointing at
+the source text it was parsed from.
+"""
+from collections import namedtuple
+
+
+class Span(namedtuple("Span", "line col end_line end_col")):
+    """Source range of a node: 1-based lines, 0-based columns, end column exclusive."""
+    __slots__ = ()
+
+    # Built with tuple.__new__: one Span per parsed node, and the namedtuple
+    # __new__ would add a Python call to each
+
+    @classmethod
+    def of_tokens(cls, first, last):
+        return tuple.__new__(cls, (first.line, first.col, last.line, last.col + len(last.text)))
+
+    @classmethod
+    def join(cls, first, last):
+        return tuple.__new__(cls, (first.line, first.col, last.end_line, last.end_col))
+
+
+class Node:
+    """Base class of all syntax tree nodes."""
+    __slots__ = ("span",)
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Give each node class an __init__ assigning its own fields, as namedtuple does."""
+        super().__init_subclass__(**kwargs)
+        # Tens of thousands of nodes per long algorithm: no loop and no setattr() for each
+        parameters = "".join(f"{name}, " for name in cls._fields)
+        assignments = "".join(f"    self.{name} = {name}\n" for name in cls._fields)
+        namespace = {}
+        exec(f"def __init__(self, {parameters}*, span=None):\n{assignments}    self.span = span\n", namespace)
+        cls.__init__ = namespace["__init__"]
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+# Program structure
+
+class Algorithme(Node):
+    """A whole algorithm: header name, declarations and the main instruction block."""
+    __slots__ = _fields = ("name", "variables", "constants", "body")
+
+
+class VarDecl(Node):
+    """'a, b: entier;' - type_name is the folded type spelling ("chaine de caractere")."""
+    __slots__ = _fields = ("names", "type_name")
+
+
+class ConstDecl(Node):
+    """'PI = 3.14;' - value is an expression node."""
+    __slots__ = _fields = ("name", "value")
+
+
+# Statements
+
+class Si(Node):
+    """'si ... alors ... [sinon ...] finsi' - orelse is an empty list without 'sinon'."""
+    __slots__ = _fields = ("condition", "body", "orelse")
+
+
+class Pour(Node):
+    """'pour i de start a end [pas step] faire ... finpour' - step is None when absent."""
+    __slots__ = _fields = ("var", "start", "end", "step", "body")
+
+
+class TantQue(Node):
+    """'tantque condition faire ... fintantque'."""
+    __slots__ = _fields = ("condition", "body")
+
+
+class Lire(Node):
+    """'lire(a, b);' - targets is a list of Name nodes."""
+    __slots__ = _fields = ("targets",)
+
+
+class Ecrire(Node):
+    """'ecrire(expr, ...);'."""
+    __slots__ = _fields = ("values",)
+
+
+class Affectation(Node):
+    """'target <- value;'."""
+    __slots__ = _fields = ("target", "value")
+
+
+class Sortir(Node):
+    """'sortir;' - leaves the innermost loop."""
+    __slots__ = _fields = ()
+
+
+# Expressions
+
+class Name(Node):
+    __slots__ = _fields = ("id",)
+
+
+class Number(Node):
+    """Numeric literal, text is the literal as written ("3.14")."""
+    __slots__ = _fields = ("text",)
+
+
+class String(Node):
+    """String literal, text includes the quotes."""
+    __slots__ = _fields = ("text",)
+
+
+class Boolean(Node):
+    """'vrai' or 'faux'."""
+    __slots__ = _fields = ("value",)
+
+
+class UnaryOp(Node):
+    """op is one of "-", "+", "non"."""
+    __slots__ = _fields = ("op", "operand")
+
+
+class BinOp(Node):
+    """Arithmetic operator; op is "+", "-", "*", "/", "mod", "div" or "puissance"."""
+    __slots__ = _fields = ("op", "left", "right")
+
+
+class BoolOp(Node):
+    """op is "et" or "ou"."""
+    __slots__ = _fields = ("op", "left", "right")
+
+
+class Compare(Node):
+    """Possibly chained comparison; ops are normalised ("=" -> "==", "<>" -> "!=")."""
+    __slots__ = _fields = ("left", "ops", "comparators")
+
+
+class Call(Node):
+    """Function call such as 'racine(x)'; func is the name as written."""
+    __slots__ = _fields = ("func", "args")
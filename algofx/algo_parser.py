@@ -0,0 +1,502 @@
+"""
+Recursive-descent parser for the French algorithm language.
+
+The parser walks the token list produced by algo_lexer.tokenize exactly once,
+left to right, and builds the syntax tree defined in algo_nodes. Every block
+is parsed by the call that opened it, so nested 'si'/'pour'/'tantque' never
+cause a rescan of the lines that follow them.
+
+Expression precedence, from lowest to highest:
+    ou
+    et
+    non
+    =  <>  <  >  <=  >=          (chainable, like Python)
+    +  -
+    *  /  mod  div
+    unary -  +
+    puissance  ^                 (right associative)
+
+Statements are parsed by recursive descent; expressions by precedence
+climbing over this table, in a single loop rather than one call per level.
+"""
+import ast
+
+from .algo_lexer import tokens_to_source, KEYWORD, NAME, OP, NUMBER, STRING, NEWLINE, EOF
+from .algo_nodes import (
+    Span, Algorithme, VarDecl, ConstDecl,
+    Si, Pour, TantQue, Lire, Ecrire, Affectation, Sortir,
+    Name, Number, String, Boolean, UnaryOp, BinOp, BoolOp, Compare, Call,
+)
+
+# Comparison operators as written -> normalised spelling stored in Compare.ops
+_COMPARISONS = {"=": "==", "==": "==", "<>": "!=", "!=": "!=",
+                "<": "<", ">": ">", "<=": "<=", ">=": ">="}
+
+# Precedence levels of the docstring table, from loosest to tightest
+_OR, _AND, _NOT, _COMPARISON, _SUM, _TERM, _UNARY = range(1, 8)
+
+# Binary operators -> (precedence, operator stored in the node); the comparisons are chained into one Compare
+_BINARY_OPS = {"+": (_SUM, "+"), "-": (_SUM, "-"), "*": (_TERM, "*"), "/": (_TERM, "/"), "%": (_TERM, "mod")}
+_BINARY_OPS.update((op, (_COMPARISON, None)) for op in _COMPARISONS)
+_BINARY_KEYWORDS = {"ou": (_OR, "ou"), "et": (_AND, "et"), "mod": (_TERM, "mod"), "div": (_TERM, "div")}
+
+# Keywords that open a section of the program
+_SECTION_KEYWORDS = ("var", "const", "debut")
+
+# Keywords that close a block; met out of place they mean a missing 'finsi'/'finpour'/...
+_CLOSING_KEYWORDS = ("fin", "finsi", "sinon", "finpour", "fintantque")
+
+# Message of the error on a string literal whose escapes cannot be decoded, formatted with the literal
+INVALID_STRING_MESSAGE = "Chaîne de caractères {} invalide : séquence d'échappement \\ incorrecte"
+
+# Message of the error on an expression or block nesting too deep for the recursive parser and code generator
+NESTING_MESSAGE = "Instruction trop longue ou trop imbriquée"
+
+# Keywords that start a statement, each handled by the parse_<keyword> method
+_STATEMENT_KEYWORDS = ("si", "pour", "tantque", "lire", "ecrire", "sortir")
+
+
+class AlgoSyntaxError(Exception):
+    """Raised when the algorithm cannot be parsed.
+
+    Attributes:
+        message: Description of the problem, in French
+        line: 1-based line of the offending token
+        col: 0-based column of the offending token
+    """
+    def __init__(self, message, line, col=0):
+        super().__init__(f"Ligne {line}: {message}")
+        self.message = message
+        self.line = line
+        self.col = col
+
+
+def _decodable(text):
+    """Whether the escapes of a string literal (quotes included) mean something, as algo_codegen decodes them."""
+    if "\\" not in text:
+        return True
+    try:
+        ast.literal_eval(text)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def _describe(token):
+    if token.kind == EOF:
+        return "la fin du fichier"
+    if token.kind == NEWLINE:
+        return "la fin de la ligne"
+    return f"'{token.text}'"
+
+
+class Parser:
+    """Builds an Algorithme tree from a token list in a single pass."""
+
+    def __init__(self, tokens, line_checker=None):
+        """
+        Args:
+            tokens: The list returned by algo_lexer.tokenize
+            line_checker: Called with the (start, end) token indexes of each
+                line with tokens as the parser steps past its NEWLINE, so
+                the checker of algo_checker runs in the same walk
+        """
+        self.tokens = tokens
+        self.pos = 0
+        # The token at pos, read on every step, so kept at hand instead of indexed each time
+        self.token = tokens[0]
+        self.line_checker = line_checker
+        self.line_start = 0
+
+    # Token helpers
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        if index >= len(self.tokens):
+            return self.tokens[-1]
+        return self.tokens[index]
+
+    def advance(self):
+        token = self.token
+        if token.kind != EOF:
+            self.pos += 1
+            self.token = self.tokens[self.pos]
+        return token
+
+    def seek(self, pos):
+        """Go back to an earlier position, e.g. to parse the same tokens another way."""
+        self.pos = pos
+        self.token = self.tokens[pos]
+
+    def error(self, message, token=None):
+        token = token or self.token
+        return AlgoSyntaxError(message, token.line, token.col)
+
+    def expect_keyword(self, word, context=""):
+        token = self.token
+        if not token.is_keyword(word):
+            where = f" {context}" if context else ""
+            raise self.error(f"'{word}' attendu{where}, trouvé {_describe(token)}")
+        return self.advance()
+
+    def expect_op(self, op, context=""):
+        token = self.token
+        if token.kind != OP or token.value != op:
+            where = f" {context}" if context else ""
+            raise self.error(f"'{op}' attendu{where}, trouvé {_describe(token)}")
+        return self.advance()
+
+    def expect_name(self, context=""):
+        token = self.token
+        if token.kind != NAME:
+            where = f" {context}" if context else ""
+            raise self.error(f"Nom attendu{where}, trouvé {_describe(token)}")
+        return self.advance()
+
+    def next_line(self):
+        """Step over a NEWLINE token, handing the line it ends to line_checker."""
+        end = self.pos
+        if self.line_start < end and self.line_checker is not None:
+            self.line_checker(self.line_start, end)
+        self.line_start = end + 1
+        self.advance()
+
+    def skip_newlines(self):
+        while self.token.kind == NEWLINE:
+            self.next_line()
+
+    def skip_separators(self):
+        """Skip line ends and stray semicolons between statements."""
+        while True:
+            token = self.token
+            if token.kind == NEWLINE:
+                self.next_line()
+            elif token.kind == OP and token.value == ";":
+                self.advance()
+            else:
+                return
+
+    def optional_semicolon(self):
+        token = self.token
+        if token.kind == OP and token.value == ";":
+            self.advance()
+
+    # Program structure
+
+    def parse_program(self):
+        """Parse a whole algorithm, from 'algorithme' to the matching 'fin'."""
+        self.skip_newlines()
+        start = self.expect_keyword("algorithme", "au début de l'algorithme")
+
+        # The name is everything up to the end of the header line
+        name_tokens = []
+        while self.token.kind not in (NEWLINE, EOF) and not self.token.is_op(";"):
+            name_tokens.append(self.advance())
+        self.optional_semicolon()
+        name = tokens_to_source(name_tokens) or None
+
+        variables = []
+        constants = []
+        while True:
+            self.skip_separators()
+            token = self.token
+            if token.is_keyword("var"):
+                self.advance()
+                self.parse_var_section(variables)
+            elif token.is_keyword("const"):
+                self.advance()
+                self.parse_const_section(constants)
+            elif token.is_keyword("debut"):
+                self.advance()
+                break
+            else:
+                raise self.error(f"'debut' attendu, trouvé {_describe(token)}")
+
+        body = self.parse_block(("fin",), "pour terminer l'algorithme")
+        end = self.advance()
+        return Algorithme(name, variables, constants, body, span=Span.of_tokens(start, end))
+
+    def parse_var_section(self, variables):
+        """Parse 'a, b: entier;' declarations until the next section keyword."""
+        while True:
+            self.skip_separators()
+            token = self.token
+            if token.kind == EOF or token.is_keyword(*_SECTION_KEYWORDS):
+                return
+            names = [self.expect_name("dans la déclaration de variables")]
+            while self.token.is_op(","):
+                self.advance()
+                names.append(self.expect_name("après ','"))
+            self.expect_op(":", "après les noms de variables")
+
+            # Type names may span several words ("chaine de caractere")
+            type_tokens = []
+            while self.token.kind not in (NEWLINE, EOF) and not self.token.is_op(";"):
+                type_tokens.append(self.advance())
+            if not type_tokens:
+                raise self.error("Type de variable manquant")
+            self.optional_semicolon()
+            type_name = " ".join(t.value for t in type_tokens)
+            variables.append(VarDecl([n.text for n in names], type_name,
+                                     span=Span.of_tokens(names[0], type_tokens[-1])))
+
+    def parse_const_section(self, constants):
+        """Parse 'NOM = valeur;' declarations until the next section keyword."""
+        while True:
+            self.skip_separators()
+            token = self.token
+            if token.kind == EOF or token.is_keyword(*_SECTION_KEYWORDS):
+                return
+            name = self.expect_name("dans la déclaration de constantes")
+            self.expect_op("=", "après le nom de la constante")
+
+            start = self.pos
+            try:
+                value = self.parse_expression()
+                if self.token.kind not in (NEWLINE, EOF) and not self.token.is_op(";"):
+                    raise self.error("Fin de déclaration attendue")
+            except AlgoSyntaxError:
+                # Not an expression (e.g. 'MESSAGE = Bonjour !'): keep the raw text as a string
+                self.seek(start)
+                while self.token.kind not in (NEWLINE, EOF) and not self.token.is_op(";"):
+                    self.advance()
+                if self.pos == start:
+                    raise self.error("Valeur de constante manquante")
+                raw = self.tokens[start:self.pos]
+                value = String(f'"{tokens_to_source(raw)}"', span=Span.of_tokens(raw[0], raw[-1]))
+                if not _decodable(value.text):
+                    raise self.error(INVALID_STRING_MESSAGE.format(value.text), raw[0])
+            self.optional_semicolon()
+            constants.append(ConstDecl(name.text, value, span=Span.join(name, value.span)))
+
+    # Statements
+
+    def parse_block(self, terminators, context):
+        """Parse statements until one of the terminator keywords, which is left unconsumed."""
+        body = []
+        while True:
+            self.skip_separators()
+            token = self.token
+            if token.kind == KEYWORD and token.value in terminators:
+                return body
+            if token.kind == EOF or token.kind == KEYWORD and token.value in _CLOSING_KEYWORDS:
+                expected = "' ou '".join(terminators)
+                raise self.error(f"'{expected}' attendu {context}, trouvé {_describe(token)}")
+            body.append(self.parse_statement())
+
+    def parse_statement(self):
+        token = self.token
+        if token.kind == KEYWORD and token.value in _STATEMENT_KEYWORDS:
+            return getattr(self, "parse_" + token.value)()
+        if token.kind == NAME:
+            return self.parse_affectation()
+        raise self.error(f"Instruction non reconnue: {_describe(token)}")
+
+    def parse_si(self):
+        start = self.advance()
+        condition = self.parse_expression()
+        self.expect_keyword("alors", "après la condition du 'si'")
+        body = self.parse_block(("sinon", "finsi"), "pour fermer le 'si' de la ligne %d" % start.line)
+        orelse = []
+        if self.token.is_keyword("sinon"):
+            self.advance()
+            orelse = self.parse_block(("finsi",), "pour fermer le 'si' de la ligne %d" % start.line)
+        end = self.advance()
+        self.optional_semicolon()
+        return Si(condition, body, orelse, span=Span.of_tokens(start, end))
+
+    def parse_tantque(self):
+        start = self.advance()
+        condition = self.parse_expression()
+        self.expect_keyword("faire", "après la condition du 'tantque'")
+        body = self.parse_block(("fintantque",), "pour fermer le 'tantque' de la ligne %d" % start.line)
+        end = self.advance()
+        self.optional_semicolon()
+        return TantQue(condition, body, span=Span.of_tokens(start, end))
+
+    def parse_pour(self):
+        """
+        Parse a 'pour' loop.
+
+        Accepted headers (each with an optional 'pas' step before 'faire'):
+            pour i de 1 a n faire
+            pour i allant de 1 a n faire
+            pour i de 1 allant a n faire
+            pour i allant a n faire        (starts from 0)
+        """
+        start_token = self.advance()
+        var = self.expect_name("après 'pour'")
+
+        if self.token.is_keyword("allant"):
+            self.advance()
+        start = None
+        if self.token.is_keyword("de"):
+            self.advance()
+            start = self.parse_expression()
+            if self.token.is_keyword("allant"):
+                self.advance()
+
+        # 'a' / 'à' separates the bounds; it is a plain name for the lexer
+        token = self.token
+        if token.kind != NAME or token.value != "a":
+            raise self.error(f"'à' attendu dans la boucle 'pour', trouvé {_describe(token)}")
+        self.advance()
+        end = self.parse_expression()
+
+        step = None
+        if self.token.is_keyword("pas"):
+            self.advance()
+            step = self.parse_expression()
+        self.expect_keyword("faire", "dans la boucle 'pour'")
+
+        if start is None:
+            start = Number("0", span=Span.of_tokens(var, var))
+        body = self.parse_block(("finpour",), "pour fermer le 'pour' de la ligne %d" % start_token.line)
+        end_token = self.advance()
+        self.optional_semicolon()
+        return Pour(var.text, start, end, step, body, span=Span.of_tokens(start_token, end_token))
+
+    def parse_lire(self):
+        start = self.advance()
+        self.expect_op("(", "après 'lire'")
+        targets = []
+        if not self.token.is_op(")"):
+            while True:
+                name = self.expect_name("dans 'lire'")
+                targets.append(Name(name.text, span=Span.of_tokens(name, name)))
+                if not self.token.is_op(","):
+                    break
+                self.advance()
+        end = self.expect_op(")", "pour fermer 'lire'")
+        self.optional_semicolon()
+        return Lire(targets, span=Span.of_tokens(start, end))
+
+    def parse_ecrire(self):
+        start = self.advance()
+        self.expect_op("(", "après 'ecrire'")
+        values = self.parse_arguments()
+        end = self.expect_op(")", "pour fermer 'ecrire'")
+        self.optional_semicolon()
+        return Ecrire(values, span=Span.of_tokens(start, end))
+
+    def parse_sortir(self):
+        token = self.advance()
+        self.optional_semicolon()
+        return Sortir(span=Span.of_tokens(token, token))
+
+    def parse_affectation(self):
+        name = self.advance()
+        self.expect_op("<-", "après '%s' (affectation)" % name.text)
+        value = self.parse_expression()
+        self.optional_semicolon()
+        target = Name(name.text, span=Span.of_tokens(name, name))
+        return Affectation(target, value, span=Span.join(target.span, value.span))
+
+    # Expressions
+
+    def parse_arguments(self):
+        """Comma-separated expressions up to (not including) a closing parenthesis."""
+        args = []
+        if self.token.is_op(")"):
+            return args
+        args.append(self.parse_expression())
+        while self.token.is_op(","):
+            self.advance()
+            args.append(self.parse_expression())
+        return args
+
+    def parse_expression(self, min_precedence=_OR):
+        """
+        Parse an expression, stopping at a binary operator looser than min_precedence.
+
+        Precedence climbing: the binary operators of every level are handled
+        by this one loop, so an operand costs the same few calls whatever the
+        number of precedence levels above it.
+        """
+        left = self.parse_operand(min_precedence)
+        while True:
+            token = self.token
+            if token.kind == OP:
+                operator = _BINARY_OPS.get(token.value)
+            elif token.kind == KEYWORD:
+                operator = _BINARY_KEYWORDS.get(token.value)
+            else:
+                return left
+            if operator is None or operator[0] < min_precedence:
+                return left
+            precedence, op = operator
+            if precedence == _COMPARISON:
+                ops = []
+                comparators = []
+                while self.token.kind == OP and self.token.value in _COMPARISONS:
+                    ops.append(_COMPARISONS[self.advance().value])
+                    comparators.append(self.parse_expression(_SUM))
+                left = Compare(left, ops, comparators, span=Span.join(left.span, comparators[-1].span))
+                continue
+            self.advance()
+            right = self.parse_expression(precedence + 1)
+            node_class = BoolOp if precedence <= _AND else BinOp
+            left = node_class(op, left, right, span=Span.join(left.span, right.span))
+
+    def parse_operand(self, min_precedence):
+        """Parse a 'non' (where min_precedence allows it), a unary sign, a power or a primary."""
+        token = self.token
+        if token.kind == KEYWORD and token.value == "non" and min_precedence <= _NOT:
+            self.advance()
+            operand = self.parse_expression(_NOT)
+            return UnaryOp("non", operand, span=Span.join(Span.of_tokens(token, token), operand.span))
+        if token.kind == OP and (token.value == "-" or token.value == "+"):
+            self.advance()
+            operand = self.parse_operand(_UNARY)
+            return UnaryOp(token.value, operand, span=Span.join(Span.of_tokens(token, token), operand.span))
+        base = self.parse_primary()
+        token = self.token
+        if (token.kind == KEYWORD and token.value == "puissance") or (token.kind == OP and token.value == "^"):
+            self.advance()
+            # Right associative, and a sign may follow: "2 ^ -1"
+            exponent = self.parse_operand(_UNARY)
+            return BinOp("puissance", base, exponent, span=Span.join(base.span, exponent.span))
+        return base
+
+    def parse_primary(self):
+        token = self.token
+        kind = token.kind
+        if kind == NAME:
+            self.advance()
+            following = self.token
+            if following.kind == OP and following.value == "(":
+                self.advance()
+                args = self.parse_arguments()
+                end = self.expect_op(")", "pour fermer l'appel à '%s'" % token.text)
+                return Call(token.text, args, span=Span.of_tokens(token, end))
+            return Name(token.text, span=Span.of_tokens(token, token))
+        if kind == NUMBER:
+            self.advance()
+            return Number(token.text, span=Span.of_tokens(token, token))
+        if kind == STRING:
+            if not _decodable(token.text):
+                # e.g. "C:\" where the backslash escapes the closing quote, or a truncated \xXX
+                raise self.error(INVALID_STRING_MESSAGE.format(token.text))
+            self.advance()
+            return String(token.text, span=Span.of_tokens(token, token))
+        if kind == KEYWORD and (token.value == "vrai" or token.value == "faux"):
+            self.advance()
+            return Boolean(token.value == "vrai", span=Span.of_tokens(token, token))
+        if kind == OP and token.value == "(":
+            self.advance()
+            inner = self.parse_expression()
+            end = self.expect_op(")", "pour fermer la parenthèse")
+            # The parentheses belong to the expression, e.g. for "a div (b - c)"
+            inner.span = Span.of_tokens(token, end)
+            return inner
+        raise self.error(f"Expression attendue, trouvé {_describe(token)}")
+
+
+def parse(tokens, line_checker=None):
+    """Parse a token list into an Algorithme tree, raising AlgoSyntaxError on failure; see Parser for line_checker."""
+    parser = Parser(tokens, line_checker)
+    try:
+        return parser.parse_program()
+    except RecursionError:
+        # e.g. thousands of nested parentheses: reported where the parser gave up
+        raise parser.error(NESTING_MESSAGE) from None
@@ -0,0 +1,227 @@
+"""
+Step-by-step execution of algorithms compiled as generators.
+
+PythonCodeGenerator(as_generator=True) puts the instructions in the
+generator function _algorithme(): each Lire is a yield of its request, the
+list of (name, type) pairs it reads, answered with the converted values, and
+each loop iteration is a bare yield. AlgorithmDriver resumes the generator
+until it asks for input, ends, or has used its time slice, so the caller
+keeps control between two steps without any thread, nested event loop or
+blocking input():
+
+    driver = AlgorithmDriver(code, {"print": my_print})
+    request = driver.resume()
+    while not driver.finished:
+        if request is None:
+            request = driver.resume()  # paused at a loop, e.g. to repaint
+        else:
+            request = driver.answer(["12", "3.5"])  # one text per field
+
+real_time_execution.GeneratorWorker drives it from the Qt event loop;
+run_headless() feeds a list of inputs, e.g. to grade an algorithm.
+"""
+import time
+from types import CodeType
+
+from .algo_codegen import GENERATOR_FUNCTION
+from .execution_guard import (ExecutionLimitExceeded, DEFAULT_CPU_TIME_LIMIT, STEP_LIMIT_MESSAGE, generated_code_span,
+                              error_status)
+from .input_form import input_prompt, convert_input
+from .output_buffer import (OutputBuffer, OutputLimitExceeded, ExecutionResult,
+                           DEFAULT_MAX_OUTPUT_BYTES, DEFAULT_MAX_OUTPUT_LINES)
+
+# Loop iterations between two reads of the CPU clock
+_CLOCK_CHECK_INTERVAL = 64
+
+
+class MissingInput(RuntimeError):
+    """Raised in the algorithm when it reads more values than run_headless() was given."""
+    def __init__(self, *args):
+        super().__init__(*(args or ("Aucune valeur à lire : les entrées fournies sont épuisées",)))
+
+
+class AlgorithmDriver:
+    """Runs a generator-mode algorithm one step at a time."""
+
+    def __init__(self, code, namespace, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT):
+        """
+        Args:
+            code: Generated syntax tree, code object or source, generated with as_generator=True
+            namespace: Globals of the algorithm, e.g. with its print function
+            cpu_time_limit: CPU seconds the algorithm may use over all its steps
+        """
+        if not isinstance(code, CodeType):
+            code = compile(code, "<algorithme>", "exec")
+        namespace.setdefault("__name__", "__main__")
+        exec(code, namespace)
+        self.generator = namespace[GENERATOR_FUNCTION]()
+        # Up to the bare yield that starts the function: none of the algorithm runs yet
+        next(self.generator)
+        self.cpu_time_limit = cpu_time_limit
+        self.cpu_time = 0.0
+        # Loop iterations run so far
+        self.steps = 0
+        # Fields of the pending Lire, None when the algorithm is not reading
+        self.request = None
+        self.finished = False
+
+    def resume(self, values=None, time_slice=None, error=None):
+        """
+        Run the algorithm until it reads, ends or has run for time_slice CPU seconds.
+
+        Args:
+            values: Converted values answering the pending request
+            time_slice: Pause at the first loop iteration after this many seconds, None to run on
+            error: Exception to raise in the algorithm instead of sending values
+
+        Returns:
+            The fields the algorithm asks for, or None if it paused or finished (see finished)
+
+        Raises:
+            Whatever the algorithm raises, ExecutionLimitExceeded once it has used cpu_time_limit
+        """
+        generator = self.generator
+        self.request = None
+        # CPU time of this thread only: other runs may be going on in the same process, see execution_pool
+        start = time.thread_time()
+        deadline = start + time_slice if time_slice is not None else None
+        limit = start + self.cpu_time_limit - self.cpu_time
+        count = 0
+        steps = 0
+        try:
+            request = generator.throw(error) if error is not None else generator.send(values)
+            while request is None:
+                count += 1
+                if count == _CLOCK_CHECK_INTERVAL:
+                    count = 0
+                    steps += _CLOCK_CHECK_INTERVAL
+                    now = time.thread_time()
+                    if now >= limit:
+                        # Raised at the loop where the algorithm is, so its line is reported
+                        request = generator.throw(ExecutionLimitExceeded())
+                        continue
+                    if deadline is not None and now >= deadline:
+                        return None
+                request = generator.send(None)
+        except StopIteration:
+            self.finished = True
+            return None
+        except BaseException:
+            self.finished = True
+            raise
+        finally:
+            self.cpu_time += time.thread_time() - start
+            self.steps += steps + count
+        self.request = request
+        return request
+
+    def answer(self, texts, time_slice=None):
+        """Answer the pending request with the text typed for each field, then resume."""
+        try:
+            values = [convert_input(text, var_type) for (name, var_type), text in zip(self.request, texts)]
+        except ValueError as e:
+            # Raised at the Lire, as int(input()) would
+            return self.resume(time_slice=time_slice, error=e)
+        return self.resume(values, time_slice)
+
+    def close(self):
+        """Stop the algorithm where it is; returns the generated-code line it was at, if any."""
+        frame = self.generator.gi_frame
+        line = frame.f_lineno if frame is not None else None
+        self.generator.close()
+        self.finished = True
+        return line
+
+
+class BufferedOutput:
+    """File-like stream storing into an OutputBuffer; the write that hits its cap raises OutputLimitExceeded."""
+
+    def __init__(self, output_buffer):
+        self.buffer = output_buffer
+
+    def write(self, text):
+        self.buffer.write(text)
+        if self.buffer.truncated:
+            raise OutputLimitExceeded(self.buffer.truncation_message)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def is_limit_error(error):
+    """Whether an exception raised by an algorithm means it hit a limit (CPU time, loop iterations, memory, output)."""
+    if isinstance(error, (ExecutionLimitExceeded, OutputLimitExceeded, MemoryError, RecursionError)):
+        return True
+    return isinstance(error, RuntimeError) and str(error) == STEP_LIMIT_MESSAGE
+
+
+def run_headless(python_code, inputs=(), source_map=None, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                 max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES, max_output_lines=DEFAULT_MAX_OUTPUT_LINES,
+                 echo_inputs=True):
+    """
+    Run a generator-mode algorithm with the given input values, without any UI.
+
+    Args:
+        python_code: Generated syntax tree, code object or source, generated with as_generator=True
+        inputs: The text of each value read, in order
+        source_map: algo_codegen.SourceMap of python_code, when it is source text
+        echo_inputs: Write the prompt and the value of each Lire to the output, as the IDE does
+
+    Returns:
+        An ExecutionResult: "success", "error", "output" (prompts and values
+        echoed as in the IDE), "inputs" (the values actually read), "line"
+        and "span" (algorithm line and Span of the error, if known),
+        "limit_exceeded" (whether a limit stopped it, see is_limit_error)
+        "cpu_time" (seconds used by the algorithm) and "steps" (loop
+        iterations it ran)
+    """
+    output_buffer = OutputBuffer(max_output_bytes, max_output_lines)
+    stream = BufferedOutput(output_buffer)
+    result = ExecutionResult(output_buffer, inputs=[], limit_exceeded=False, cpu_time=0.0, steps=0)
+    remaining = list(reversed(inputs))
+    driver = None
+
+    def algorithm_print(*values, sep=" ", end="\n", file=None, flush=False):
+        print(*values, sep=sep, end=end, file=stream if file is None else file)
+
+    try:
+        driver = AlgorithmDriver(python_code, {"print": algorithm_print}, cpu_time_limit)
+        request = driver.resume()
+        while not driver.finished:
+            if request is None:
+                request = driver.resume()
+                continue
+            texts = []
+            for name, var_type in request:
+                if not remaining:
+                    break
+                texts.append(remaining.pop())
+                if echo_inputs:
+                    stream.write(input_prompt(name, var_type) + texts[-1] + "\n")
+            result["inputs"].extend(texts)
+            if len(texts) < len(request):
+                request = driver.resume(error=MissingInput())
+            else:
+                request = driver.answer(texts)
+    except OutputLimitExceeded as e:
+        result["success"] = False
+        result["error"] = str(e)
+        result["limit_exceeded"] = True
+    except Exception as e:
+        result["success"] = False
+        result["error"] = str(e)
+        result["limit_exceeded"] = is_limit_error(e)
+        span = generated_code_span(e.__traceback__)
+        if span is not None and source_map is not None:
+            span = source_map.span(span.line)
+        result["span"] = span
+        result["line"] = span.line if span is not None else None
+        try:
+            stream.write(error_status(e, result["line"]))
+        except OutputLimitExceeded:
+            pass
+    if driver is not None:
+        result["cpu_time"] = driver.cpu_time
+        result["steps"] = driver.steps
+    return result
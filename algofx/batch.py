@@ -0,0 +1,89 @@
+"""
+Checking and compiling whole folders of algorithms, e.g. the submissions of an exam.
+
+compile_directory() finds the .algo files of a directory tree and compiles
+each one with algo_compiler.compile(), which runs the checker first, in a
+pool of worker processes. The files are handed out in chunks, so a worker
+asks for work once per chunk instead of once per file, and the reports come
+back as soon as their chunk is done (in completion order, not file order):
+
+    for report in compile_directory("copies/", workers=8):
+        print(report["file"], report["success"], report["code_hash"])
+
+Each report is algo_compiler.compile_report() plus "code_hash", the SHA-256
+of the generated Python code (equal for algorithms that compile to the same
+program, whatever their layout and comments), and "time", the seconds spent
+on the file. The command-line tool streams them as JSON lines:
+
+    python -m algofx batch copies/ --workers 8 > rapports.jsonl
+"""
+import functools
+import hashlib
+import os
+import time
+
+from .algo_codegen import module_source
+from .algo_compiler import DEFAULT_OPTIONS, compile as compile_algorithm, compile_report
+
+ALGORITHM_EXTENSION = ".algo"
+
+# Chunks per worker when no chunk size is given: small enough to balance the load, large enough to cut the messages
+CHUNKS_PER_WORKER = 4
+
+
+def find_algorithms(directory):
+    """Paths of the .algo files under directory, sorted."""
+    paths = []
+    for folder, subfolders, files in os.walk(directory):
+        subfolders.sort()
+        paths.extend(os.path.join(folder, name) for name in sorted(files)
+                     if name.lower().endswith(ALGORITHM_EXTENSION))
+    return paths
+
+
+def compile_file(path, options=DEFAULT_OPTIONS):
+    """Check and compile one file; returns its report, see the module docstring."""
+    start = time.perf_counter()
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        report = {"file": path, "success": False, "diagnostics": [],
+                  "error": {"message": str(e), "line": None, "column": None}}
+    else:
+        result = compile_algorithm(source, options)
+        report = compile_report(result, path)
+        if result.code is not None:
+            python_code, _ = module_source(result.module)
+            report["code_hash"] = hashlib.sha256(python_code.encode("utf-8")).hexdigest()
+    report.setdefault("code_hash", None)
+    report["time"] = round(time.perf_counter() - start, 6)
+    return report
+
+
+def compile_directory(directory, options=DEFAULT_OPTIONS, workers=None, chunk_size=None):
+    """
+    Compile every algorithm of a directory tree in worker processes.
+
+    Args:
+        directory: Folder to search for .algo files
+        options: algo_compiler.CompileOptions of every compilation
+        workers: Number of worker processes, None for one per CPU, 1 to compile in this process
+        chunk_size: Files handed to a worker at a time, None to give each worker CHUNKS_PER_WORKER chunks
+
+    Yields:
+        The report of each file, as soon as its chunk is done
+    """
+    paths = find_algorithms(directory)
+    if not paths:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if chunk_size is None:
+        chunk_size = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+    work = functools.partial(compile_file, options=options)
+    if workers == 1:
+        yield from map(work, paths)
+        return
+    import multiprocessing
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(work, paths, chunk_size)
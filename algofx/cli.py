@@ -0,0 +1,323 @@
+"""
+Command-line tool: check, compile and run algorithms without the IDE.
+
+    python -m algofx check exercice.algo
+    python -m algofx compile exercice.algo -o exercice.py
+    python -m algofx run exercice.algo < entrees.txt > sortie.txt
+    python -m algofx batch copies/ --workers 8 > rapports.jsonl
+    python -m algofx grade copies/ tests.json --scores notes.csv > rapports.jsonl
+
+check prints the diagnostics the IDE shows before compiling, compile also
+translates the algorithm and prints the Python code, run compiles it and
+runs it with each Lire reading one line of stdin and Ecrire writing to
+stdout. With --json the diagnostics (and for run the final status, on
+stderr) are printed as one JSON object, for grading scripts. batch checks
+and compiles a whole folder in worker processes, see batch; grade runs
+a whole folder against test cases, see grading, and reuses the results of
+the runs it has already done, see result_cache (--no-cache to run all).
+
+The limits are the ones of the IDE settings (loop iterations, loop guard,
+CPU time, memory), read without Qt, see user_settings; options override
+them. The tool is started once per submission by graders, so only the
+modules a command needs are imported, and nothing of the GUI. It needs
+nothing from site-packages either: "python -S -m algofx" also skips their
+.pth files, often the largest part of the interpreter start-up.
+
+Exit codes are EXIT_OK, EXIT_INVALID (diagnostics or syntax error),
+EXIT_USAGE (bad arguments, unreadable file), EXIT_RUNTIME_ERROR and
+EXIT_LIMIT_EXCEEDED (CPU time, loop iterations or memory).
+"""
+import argparse
+import json
+import sys
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_USAGE = 2
+EXIT_RUNTIME_ERROR = 3
+EXIT_LIMIT_EXCEEDED = 4
+
+# Exit code of a run stopped with Ctrl+C, as for any program killed by SIGINT
+EXIT_INTERRUPTED = 130
+
+# Fallback of each setting when the IDE has never saved it, as in the settings dialog
+DEFAULT_STEPS = 1000
+DEFAULT_MEMORY_LIMIT_MB = 1024
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="algofx", description="Check, compile and run AlgoFX algorithms.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    def add_command(name, help_text, compiles=True):
+        command = commands.add_parser(name, help=help_text, description=help_text)
+        if name in ("batch", "grade"):
+            command.add_argument("file", metavar="directory", help="folder searched for .algo files")
+        else:
+            command.add_argument("file", help="algorithm file, - to read it from stdin (check and compile only)")
+            command.add_argument("--json", action="store_true", help="print the diagnostics as JSON")
+        command.add_argument("--language", choices=("french", "arabic"),
+                             help="language of the messages (default: the IDE setting)")
+        if compiles:
+            command.add_argument("--steps", type=int, help="loop iterations allowed (default: the IDE setting)")
+            command.add_argument("--loop-guard", choices=("per_loop", "global", "watchdog"),
+                                 help="how loop iterations are limited (default: the IDE setting)")
+        return command
+
+    add_command("check", "Report the errors of an algorithm.", compiles=False)
+    command = add_command("compile", "Check an algorithm and print its Python code.")
+    command.add_argument("-o", "--output", help="write the Python code to this file instead of stdout")
+    command = add_command("run", "Compile an algorithm and run it: Lire reads stdin, Ecrire writes stdout.")
+    command.add_argument("--cpu-time", type=float, help="CPU seconds allowed (default: the IDE setting)")
+    command.add_argument("--memory", type=int, help="memory limit in MB, 0 for none (default: the IDE setting)")
+    prompts = command.add_mutually_exclusive_group()
+    prompts.add_argument("--prompts", action="store_true", default=None,
+                         help="print the 'Entrez x:' prompts (default: only when stdin is a terminal)")
+    prompts.add_argument("--no-prompts", action="store_false", dest="prompts")
+    command = add_command("batch", "Check and compile every .algo file of a folder in parallel, "
+                                   "printing one JSON line per file.")
+    command.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    command.add_argument("--chunk-size", type=int, help="files handed to a worker at a time (default: automatic)")
+    command = add_command("grade", "Run every .algo file of a folder against test cases, printing one JSON line "
+                                   "per submission and writing the score matrix.")
+    command.add_argument("tests", help="JSON file of the test cases, see algofx.grading")
+    command.add_argument("--scores", default="scores.csv", help="CSV file of the score matrix (default: %(default)s)")
+    command.add_argument("--stop-on-failure", action="store_true", default=None,
+                         help="skip the remaining cases of a submission at its first failure "
+                              "(default: the test case file)")
+    command.add_argument("--cpu-time", type=float, help="CPU seconds allowed per run (default: the IDE setting)")
+    command.add_argument("--memory", type=int, help="memory limit of each run in MB, 0 for none "
+                                                    "(default: the IDE setting)")
+    command.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    command.add_argument("--chunk-size", type=int, help="submissions handed to a worker at a time "
+                                                        "(default: automatic)")
+    command.add_argument("--cache-dir", help="folder of the cached run results (default: ~/.AlgoFX/cache/results)")
+    command.add_argument("--no-cache", action="store_true", help="run every case, without reading or storing "
+                                                                 "cached results")
+    return parser
+
+
+def read_source(path):
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return f.read()
+
+
+def compile_options(args, settings):
+    """The CompileOptions of the command: its options, else the IDE settings."""
+    from .algo_compiler import CompileOptions
+    from .execution_guard import LOOP_GUARD_PER_LOOP
+    options = CompileOptions(language=args.language or settings.value("error_language_param", "french", type=str))
+    if args.command == "check":
+        return options
+    return options._replace(
+        max_steps=args.steps if args.steps is not None else settings.value("algorithm_execution_steps",
+                                                                         DEFAULT_STEPS, type=int),
+        loop_guard=args.loop_guard or settings.value("loop_guard_mode", LOOP_GUARD_PER_LOOP, type=str),
+        fast_locals=settings.value("fast_locals", True, type=bool))
+
+
+def print_compile_errors(report, file):
+    for diagnostic in report["diagnostics"]:
+        print(f"{report['file']}:{diagnostic['line']}: {diagnostic['message']}", file=file)
+    error = report["error"]
+    if error is not None:
+        print(f"{report['file']}:{error['line']}:{error['column']}: {error['message']}", file=file)
+
+
+def command_check(args, source, options):
+    from .algo_checker import analyze
+    analysis = analyze(source, options.language)
+    report = {
+        "file": args.file,
+        "success": not analysis.diagnostics and analysis.program is not None,
+        "diagnostics": [diagnostic._asdict() for diagnostic in analysis.diagnostics],
+        "error": None,
+    }
+    if analysis.program is None and not analysis.diagnostics:
+        error = analysis.syntax_error
+        report["error"] = {"message": error.message, "line": error.line, "column": error.col + 1}
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False)
+        print()
+    else:
+        print_compile_errors(report, sys.stdout)
+    return EXIT_OK if report["success"] else EXIT_INVALID
+
+
+def command_compile(args, source, options):
+    from .algo_compiler import compile as compile_algorithm, compile_report
+    from .algo_codegen import module_source
+    result = compile_algorithm(source, options)
+    report = compile_report(result, args.file)
+    if result.code is not None:
+        python_code, _ = module_source(result.module, result.program_name)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(python_code)
+        elif not args.json:
+            sys.stdout.write(python_code)
+        else:
+            report["python"] = python_code
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False)
+        print()
+    else:
+        print_compile_errors(report, sys.stderr)
+    return EXIT_OK if result.code is not None else EXIT_INVALID
+
+
+def command_run(args, source, options, settings):
+    import time
+    from .algo_compiler import compile as compile_algorithm, compile_report
+    from .algorithm_driver import MissingInput, is_limit_error
+    from .execution_guard import CpuWatchdog, DEFAULT_CPU_TIME_LIMIT, LOOP_GUARD_WATCHDOG, generated_code_span
+    from .process_runner import apply_resource_limits, resource
+
+    result = compile_algorithm(source, options)
+    if result.code is None:
+        report = compile_report(result, args.file)
+        if args.json:
+            json.dump(report, sys.stderr, ensure_ascii=False)
+            print(file=sys.stderr)
+        else:
+            print_compile_errors(report, sys.stderr)
+        return EXIT_INVALID
+
+    cpu_time_limit = args.cpu_time if args.cpu_time is not None else settings.value(
+        "algorithm_cpu_time_limit", DEFAULT_CPU_TIME_LIMIT, type=float)
+    memory_limit_mb = args.memory if args.memory is not None else settings.value(
+        "algorithm_memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB, type=int)
+    prompts = sys.stdin.isatty() if args.prompts is None else args.prompts
+    stdout = sys.stdout
+
+    def algorithm_input(prompt=""):
+        if prompts:
+            stdout.write(prompt)
+            stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            raise MissingInput()
+        return line.rstrip("\r\n")
+
+    namespace = {"__name__": "__main__", "input": algorithm_input}
+    # Outside of the IDE the process itself is the sandbox, as for process_runner
+    apply_resource_limits(cpu_time_limit, memory_limit_mb)
+    guard = CpuWatchdog(cpu_time_limit) if resource is None or options.loop_guard == LOOP_GUARD_WATCHDOG else None
+    status = {"file": args.file, "status": "success", "error": None, "line": None}
+    exit_code = EXIT_OK
+    start = time.process_time()
+    try:
+        if guard is not None:
+            with guard:
+                exec(result.code, namespace)
+        else:
+            exec(result.code, namespace)
+    except KeyboardInterrupt:
+        exit_code = EXIT_INTERRUPTED
+        status["status"] = "interrupted"
+    except Exception as e:
+        limit = is_limit_error(e)
+        exit_code = EXIT_LIMIT_EXCEEDED if limit else EXIT_RUNTIME_ERROR
+        status.update(status="limit" if limit else "error", error=str(e) or type(e).__name__)
+        span = generated_code_span(e.__traceback__)
+        status["line"] = span.line if span is not None else None
+    status["cpu_time"] = round(time.process_time() - start, 6)
+    try:
+        stdout.flush()
+    except OSError:
+        pass
+    if args.json:
+        json.dump(status, sys.stderr, ensure_ascii=False)
+        print(file=sys.stderr)
+    elif status["error"] is not None:
+        location = f"{args.file}:{status['line']}" if status["line"] is not None else args.file
+        print(f"{location}: {status['error']}", file=sys.stderr)
+    return exit_code
+
+
+def command_batch(args, options):
+    import os
+    import time
+    from .batch import compile_directory
+    if not os.path.isdir(args.file):
+        print(f"algofx: {args.file}: not a directory", file=sys.stderr)
+        return EXIT_USAGE
+    start = time.perf_counter()
+    files = compiled = 0
+    for report in compile_directory(args.file, options, args.workers, args.chunk_size):
+        files += 1
+        compiled += report["success"]
+        # One line per file as it is done, for a consumer reading the stream
+        print(json.dumps(report, ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    rate = files / elapsed if elapsed > 0 else 0.0
+    print(f"{files} files, {compiled} compiled, {files - compiled} with errors in {elapsed:.2f} s "
+          f"({rate:.0f} files/s)", file=sys.stderr)
+    return EXIT_OK if compiled == files else EXIT_INVALID
+
+
+def command_grade(args, options, settings):
+    import os
+    import time
+    from .execution_guard import DEFAULT_CPU_TIME_LIMIT
+    from .grading import TestSuiteError, grade_directory, load_test_suite, write_score_matrix
+    from .result_cache import ResultCache
+    if not os.path.isdir(args.file):
+        print(f"algofx: {args.file}: not a directory", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        suite = load_test_suite(args.tests)
+    except (OSError, TestSuiteError) as e:
+        print(f"algofx: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.stop_on_failure is not None:
+        suite = suite._replace(stop_on_failure=args.stop_on_failure)
+    cpu_time_limit = args.cpu_time if args.cpu_time is not None else settings.value(
+        "algorithm_cpu_time_limit", DEFAULT_CPU_TIME_LIMIT, type=float)
+    memory_limit_mb = args.memory if args.memory is not None else settings.value(
+        "algorithm_memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB, type=int)
+    result_cache = None if args.no_cache else ResultCache(args.cache_dir)
+    start = time.perf_counter()
+    reports = []
+    for report in grade_directory(args.file, suite, options, cpu_time_limit, memory_limit_mb,
+                                  args.workers, args.chunk_size, result_cache):
+        reports.append(report)
+        print(json.dumps(report, ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    try:
+        write_score_matrix(args.scores, reports, suite)
+    except OSError as e:
+        print(f"algofx: {args.scores}: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    runs = sum(case["status"] not in ("skipped", "compile_error") for report in reports for case in report["cases"])
+    cached = sum(case["cached"] for report in reports for case in report["cases"])
+    rate = runs / elapsed if elapsed > 0 else 0.0
+    print(f"{len(reports)} submissions, {runs} runs ({cached} cached) in {elapsed:.2f} s ({rate:.0f} runs/s, "
+          f"{rate * 60:.0f} runs/min), scores in {args.scores}", file=sys.stderr)
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.file == "-":
+        parser.error("run reads the values of Lire on stdin: the algorithm must be a file")
+    from .user_settings import UserSettings
+    settings = UserSettings()
+    options = compile_options(args, settings)
+    if args.command == "batch":
+        return command_batch(args, options)
+    if args.command == "grade":
+        return command_grade(args, options, settings)
+    try:
+        source = read_source(args.file)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"algofx: {args.file}: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.command == "check":
+        return command_check(args, source, options)
+    if args.command == "compile":
+        return command_compile(args, source, options)
+    return command_run(args, source, options, settings)
@@ -0,0 +1,248 @@
+"""
+Two-tier cache of compiled algorithms.
+
+Compiling an algorithm means running the syntax checks, translating it to
+a Python syntax tree and compiling that tree to a code object. The result only depends
+on the algorithm text, the compiler itself and the loop guard baked into the
+generated code (limit and mode), so it is cached under a hash of exactly those:
+
+- an in-memory LRU of CompiledAlgorithm entries (code objects included)
+- an on-disk cache (~/.AlgoFX/cache/compile) of marshalled entries, bounded
+  in total size, oldest-used files evicted first
+
+The compiler version is a hash of the compiler's own modules, so editing the
+lexer, parser, code generator or the runtime code it embeds (or upgrading
+Python, which changes the marshal format) invalidates every entry.
+"""
+import hashlib
+import importlib
+import importlib.util
+import marshal
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+# Bump when the layout of the cached entries changes
+CACHE_FORMAT = 3
+
+# Modules whose code determines the generated Python; the code generator copies the step
+# limit message of execution_guard and the Lire helper source of input_form into it
+_COMPILER_MODULES = tuple(f"{__package__}.{name}" for name in (
+    "algo_lexer", "algo_nodes", "algo_parser", "algo_checker", "algo_codegen", "algo_compiler",
+    "execution_guard", "input_form"))
+
+# The Python source text is not kept: it is only unparsed for display, see FrenchAlgorithmCompiler.python_source
+CompiledAlgorithm = namedtuple("CompiledAlgorithm", "code")
+
+_compiler_version = None
+
+
+def _module_fingerprint(name):
+    """Bytes identifying the current code of a module (its source, or its bytecode when frozen)."""
+    module = sys.modules.get(name)
+    if module is None:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            return b""
+    try:
+        with open(module.__file__, "rb") as f:
+            return f.read()
+    except (OSError, TypeError, AttributeError):
+        pass
+    try:
+        # PyInstaller bundles have no sources on disk, but their loader can still give the code
+        return marshal.dumps(module.__loader__.get_code(name))
+    except Exception:
+        return name.encode()
+
+
+def compiler_version():
+    """Hash of the compiler modules, the Python bytecode format and the cache format."""
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256()
+        digest.update(importlib.util.MAGIC_NUMBER)
+        digest.update(str(CACHE_FORMAT).encode())
+        for name in _COMPILER_MODULES:
+            digest.update(name.encode())
+            digest.update(_module_fingerprint(name))
+        _compiler_version = digest.hexdigest()[:16]
+    return _compiler_version
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".AlgoFX", "cache", "compile")
+
+
+class CompileCache:
+    """In-memory LRU in front of a size-bounded directory of marshalled entries."""
+
+    def __init__(self, directory=None, max_memory_entries=64, max_disk_bytes=16 * 1024 * 1024):
+        """
+        Args:
+            directory: Where to store the on-disk tier, None for the default
+                location, False to keep the cache in memory only
+            max_memory_entries: Number of entries kept in memory
+            max_disk_bytes: Total size of the on-disk tier before eviction
+        """
+        self.directory = default_cache_dir() if directory is None else directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_ready = False
+
+    def key(self, source, max_steps, loop_guard="per_loop", fast_locals=False):
+        """Cache key of an algorithm: (source hash, compiler version, max execution steps, loop guard, fast locals)."""
+        digest = hashlib.sha256(source.encode("utf-8", "surrogatepass"))
+        key = f"{digest.hexdigest()}-{compiler_version()}-{max_steps}-{loop_guard}"
+        return key + "-fast" if fast_locals else key
+
+    def get(self, source, max_steps, loop_guard="per_loop", fast_locals=False):
+        """Return the CompiledAlgorithm for this source, or None on a miss."""
+        key = self.key(source, max_steps, loop_guard, fast_locals)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, source, max_steps, code, loop_guard="per_loop", fast_locals=False):
+        """
+        Store a successful compilation.
+
+        Args:
+            source: The algorithm source code
+            max_steps: Loop limit the Python code was generated with
+            code: The compiled code object
+            loop_guard: Loop guard mode the Python code was generated with
+            fast_locals: Whether the instructions were generated inside a function
+
+        Returns:
+            The stored CompiledAlgorithm
+        """
+        entry = CompiledAlgorithm(code)
+        key = self.key(source, max_steps, loop_guard, fast_locals)
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        return entry
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    # On-disk tier. Every failure here only costs a recompilation, so errors are swallowed.
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def _prepare_disk(self):
+        """Create the cache directory and wipe it if it was filled by another compiler version."""
+        if self._disk_ready:
+            return True
+        if not self.directory:
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            version_file = os.path.join(self.directory, "VERSION")
+            try:
+                with open(version_file, "r") as f:
+                    stored_version = f.read().strip()
+            except OSError:
+                stored_version = None
+            if stored_version != compiler_version():
+                self.clear()
+                with open(version_file, "w") as f:
+                    f.write(compiler_version())
+        except OSError:
+            return False
+        self._disk_ready = True
+        return True
+
+    def _read_disk(self, key):
+        if not self._prepare_disk():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            self._remove(path)
+            return None
+        if not (isinstance(data, tuple) and len(data) == 2 and data[0] == CACHE_FORMAT):
+            self._remove(path)
+            return None
+        try:
+            # Mark as recently used for the eviction order
+            os.utime(path)
+        except OSError:
+            pass
+        return CompiledAlgorithm(data[1])
+
+    def _write_disk(self, key, entry):
+        if not self._prepare_disk():
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                marshal.dump((CACHE_FORMAT, entry.code), f)
+            os.replace(temp_path, path)
+        except (OSError, ValueError):
+            self._remove(temp_path)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete the least recently used files until the directory fits in max_disk_bytes."""
+        files = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".bin"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_disk_bytes:
+            return
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,197 @@
+"""
+Protection against algorithms that never stop.
+
+Three strategies are available, selected with the "loop_guard_mode" setting:
+
+- LOOP_GUARD_PER_LOOP: every 'pour'/'tantque' counts its own iterations and
+  stops after algorithm_execution_steps of them (the historical behaviour)
+- LOOP_GUARD_GLOBAL: one counter shared by all loops; the whole run may
+  execute at most algorithm_execution_steps loop iterations
+- LOOP_GUARD_WATCHDOG: no counter in the generated code at all; a CpuWatchdog
+  thread interrupts the run once it has used too much CPU time
+
+Counters are emitted by algo_codegen, the watchdog is armed by the code that
+executes the algorithm.
+"""
+import itertools
+import threading
+import time
+
+from .algo_nodes import Span
+
+LOOP_GUARD_PER_LOOP = "per_loop"
+LOOP_GUARD_GLOBAL = "global"
+LOOP_GUARD_WATCHDOG = "watchdog"
+LOOP_GUARD_MODES = (LOOP_GUARD_PER_LOOP, LOOP_GUARD_GLOBAL, LOOP_GUARD_WATCHDOG)
+
+DEFAULT_CPU_TIME_LIMIT = 5.0
+
+# Message of the RuntimeError raised by the loop counters once a loop has run too many times
+STEP_LIMIT_MESSAGE = "Possible infinite loop detected!"
+
+# How often the watchdog looks at the CPU clock, in seconds
+_POLL_INTERVAL = 0.02
+
+
+class ExecutionLimitExceeded(RuntimeError):
+    """Raised inside the running algorithm when the watchdog stops it."""
+    def __init__(self, *args):
+        super().__init__(*(args or ("Temps de calcul maximal dépassé, boucle infinie probable!",)))
+
+
+def _thread_cpu_clock(thread_id):
+    """Return a function giving the CPU time of a thread, or of the whole process if unsupported."""
+    try:
+        clock_id = time.pthread_getcpuclockid(thread_id)
+        time.clock_gettime(clock_id)
+        return lambda: time.clock_gettime(clock_id)
+    except (AttributeError, OSError, OverflowError):
+        return time.process_time
+
+
+def generated_code_line(tb):
+    """
+    Line of the generated code (compiled as "<algorithme>") where a traceback ends, or None.
+
+    For code compiled from algo_codegen's syntax tree, this is the algorithm line.
+    """
+    line = None
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == "<algorithme>":
+            line = tb.tb_lineno
+        tb = tb.tb_next
+    return line
+
+
+def generated_code_span(tb):
+    """
+    Span of the generated-code instruction where a traceback ends, or None.
+
+    Read from the location table of the code object at the failing
+    instruction, so for code compiled from algo_codegen's syntax tree it is
+    the algorithm span of the expression that failed (e.g. the "a div b" of
+    a division by zero), not just its line. The columns are None when the
+    code object has no column information.
+    """
+    span = None
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        if code.co_filename == "<algorithme>":
+            span = Span(tb.tb_lineno, None, tb.tb_lineno, None)
+            if hasattr(code, "co_positions") and tb.tb_lasti >= 0:
+                # One (line, end_line, col, end_col) entry per 2-byte code unit
+                position = next(itertools.islice(code.co_positions(), tb.tb_lasti // 2, None), None)
+                if position is not None and None not in position:
+                    line, end_line, col, end_col = position
+                    span = Span(line, col, end_line, end_col)
+        tb = tb.tb_next
+    return span
+
+
+def error_status(error, line):
+    """Message written to the output when an algorithm fails with error at a given algorithm line."""
+    if line is None:
+        return f"\nError: {error}"
+    return f"\nError: {error} (ligne {line})"
+
+
+def raise_in_thread(thread_id, exception):
+    """Raise exception asynchronously in another Python thread; None cancels a pending one."""
+    # Imported here: only stopping a run needs it, not compiling or starting the command-line tool
+    import ctypes
+    return ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(exception) if exception else None)
+
+
+class CpuWatchdog:
+    """
+    Raise ExecutionLimitExceeded in a thread once it has used too much CPU time.
+
+    Used as a context manager around the execution of an algorithm:
+
+        with CpuWatchdog(5.0):
+            exec(code)
+
+    Time spent waiting (for an input dialog for instance) does not count.
+    The exception is delivered between two bytecodes, so a single very long
+    builtin call is only interrupted when it returns.
+    """
+
+    def __init__(self, limit_seconds=DEFAULT_CPU_TIME_LIMIT, thread_id=None):
+        self.limit_seconds = limit_seconds
+        self.thread_id = thread_id
+        self.fired = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        clock = _thread_cpu_clock(self.thread_id)
+        deadline = clock() + self.limit_seconds
+
+        def watch():
+            while not self._stop.wait(_POLL_INTERVAL):
+                if clock() >= deadline:
+                    self.fired = True
+                    raise_in_thread(self.thread_id, ExecutionLimitExceeded)
+                    return
+
+        self._thread = threading.Thread(target=watch, name="AlgoFX CPU watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        if self.fired and exc_type is None:
+            # The limit was hit just as the algorithm finished: drop the pending exception
+            raise_in_thread(self.thread_id, None)
+        return False
+
+
+def watchdog_preamble(limit_seconds=DEFAULT_CPU_TIME_LIMIT):
+    """
+    Python source that arms a CPU-time watchdog in a standalone script.
+
+    Prepended to the generated code when it runs in its own interpreter (the
+    console mode), where the algorithm runs on the main thread.
+    """
+    return (
+        "import threading as _threading, time as _time, _thread\n"
+        "def _cpu_watchdog(limit):\n"
+        "    deadline = _time.process_time() + limit\n"
+        "    while _time.process_time() < deadline:\n"
+        "        _time.sleep(%r)\n"
+        "    print('\\nTemps de calcul maximal dépassé, boucle infinie probable!')\n"
+        "    _thread.interrupt_main()\n"
+        "_threading.Thread(target=_cpu_watchdog, args=(%r,), daemon=True).start()\n"
+        "\n" % (_POLL_INTERVAL, float(limit_seconds))
+    )
+
+
+def error_line_preamble(source_map, offset=0):
+    """
+    Python source that makes a standalone script name the algorithm line of an uncaught error.
+
+    Prepended right before the generated code in console mode, offset lines
+    into the script, where the traceback only shows lines of the script:
+    source_map (algo_codegen.SourceMap of the generated code) is embedded as
+    a list indexed by script line.
+    """
+    template = (
+        "import sys as _sys\n"
+        "def _algorithm_excepthook(kind, error, tb, _lines=%r, _first=%d, _hook=_sys.excepthook):\n"
+        "    _hook(kind, error, tb)\n"
+        "    line = None\n"
+        "    while tb is not None:\n"
+        "        if tb.tb_frame.f_code.co_filename == __file__:\n"
+        "            line = tb.tb_lineno\n"
+        "        tb = tb.tb_next\n"
+        "    if line is not None and 0 <= line - _first < len(_lines) and _lines[line - _first] is not None:\n"
+        "        print(\"\\nErreur à la ligne %%d de l'algorithme\" %% _lines[line - _first], file=_sys.stderr)\n"
+        "_sys.excepthook = _algorithm_excepthook\n"
+        "\n"
+    )
+    first_line = offset + template.count("\n") + 1
+    return template % (source_map.lines(), first_line)
@@ -0,0 +1,267 @@
+"""
+Headless runs of many algorithms at once, in subinterpreters or processes.
+
+run_headless() (algorithm_driver) keeps everything of a run in its own
+namespace and output buffer, but all the runs of a process share one GIL,
+so they cannot compute at the same time. ExecutionPool runs them on worker
+threads that each own a subinterpreter: on Python 3.12 and later every
+subinterpreter has its own GIL, its own modules and its own builtins, so the
+runs are isolated from each other and from the caller, and go in parallel
+without starting a process per run or per worker:
+
+    with ExecutionPool(workers=4) as pool:
+        futures = [pool.submit(code, case.inputs) for case in suite.cases]
+        results = [future.result() for future in futures]
+
+The code is compiled with as_generator=True, as for run_headless(), and each
+result is the same dict as run_headless() returns, with "output" stored.
+A worker creates its subinterpreter on its first run, imports the runtime
+there once, and gives each run a new namespace.
+
+On older Python versions, where subinterpreters share the GIL, the pool
+uses worker processes instead (backend PROCESSES), with the same interface.
+Subinterpreters share the memory limit of their process: runs that need
+their own address space limit belong in process_runner.
+"""
+import json
+import marshal
+import os
+import queue
+import sys
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future
+
+from .algo_nodes import Span
+from .algorithm_driver import run_headless
+from .batch import CHUNKS_PER_WORKER
+from .execution_guard import DEFAULT_CPU_TIME_LIMIT
+from .output_buffer import DEFAULT_MAX_OUTPUT_BYTES, DEFAULT_MAX_OUTPUT_LINES
+
+# The subinterpreter modules are private, and renamed in 3.13; before 3.12 they share the GIL
+if sys.version_info >= (3, 13):
+    try:
+        import _interpreters
+    except ImportError:
+        _interpreters = None
+elif sys.version_info >= (3, 12):
+    try:
+        import _xxsubinterpreters as _interpreters
+    except ImportError:
+        _interpreters = None
+else:
+    _interpreters = None
+
+INTERPRETERS = "interpreters"
+PROCESSES = "processes"
+
+# Imports the runtime in a new subinterpreter, with the package importable from the directory that contains it
+_INTERPRETER_BOOTSTRAP = ("import sys; sys.path.insert(0, {!r}); "
+                          "from algofx.execution_pool import _interpreter_run")
+
+_INTERPRETER_RUN = "_interpreter_run(_code, _input_lists, _options, _result_fd)"
+
+
+def subinterpreters_supported():
+    """Whether this Python runs subinterpreters with a GIL each (3.12 and later)."""
+    return _interpreters is not None
+
+
+def _run_all(code, input_lists, options):
+    """The runs of the marshalled code with each list of inputs, as plain dicts."""
+    code = marshal.loads(code)
+    results = []
+    for inputs in input_lists:
+        result = run_headless(code, inputs, **options)
+        results.append(dict(result, output=result["output"]))
+    return results
+
+
+def _interpreter_run(code, input_lists, options, result_fd):
+    """Body of a task in a subinterpreter: the results go out as JSON through the scratch file of the worker."""
+    results = _run_all(code, json.loads(input_lists), json.loads(options))
+    with open(result_fd, "w", encoding="utf-8", closefd=False) as f:
+        json.dump(results, f)
+
+
+def _first_result(chunk, future):
+    """Pass the result of a chunk of one run to the future of that run."""
+    error = chunk.exception()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(chunk.result()[0])
+
+
+class _Interpreter:
+    """A subinterpreter and the scratch file its runs write their result to."""
+
+    def __init__(self):
+        self.id = _interpreters.create()
+        # run_string() returns nothing, and the channel modules that could carry a result differ between versions
+        self.scratch = tempfile.TemporaryFile()
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.run_string(_INTERPRETER_BOOTSTRAP.format(root))
+
+    def run_string(self, script, shared=None):
+        try:
+            error = _interpreters.run_string(self.id, script, shared)
+        except getattr(_interpreters, "RunFailedError", RuntimeError) as e:  # 3.12 raises, 3.13 returns
+            error = e
+        if error is not None:
+            raise RuntimeError(f"The run failed in its subinterpreter: {getattr(error, 'formatted', error)}")
+
+    def run(self, code, input_lists, options):
+        self.scratch.seek(0)
+        self.scratch.truncate()
+        self.run_string(_INTERPRETER_RUN, {"_code": code, "_input_lists": input_lists, "_options": options,
+                                           "_result_fd": self.scratch.fileno()})
+        self.scratch.seek(0)
+        results = json.loads(self.scratch.read().decode("utf-8"))
+        for result in results:
+            if result.get("span") is not None:
+                result["span"] = Span(*result["span"])
+        return results
+
+    def close(self):
+        _interpreters.destroy(self.id)
+        self.scratch.close()
+
+
+class _InterpreterThread(threading.Thread):
+    """
+    A worker thread running the tasks of a queue in its own subinterpreter.
+
+    The subinterpreter is created and destroyed in the thread: once it has
+    imported threading, destroying it from another thread never returns.
+    """
+
+    def __init__(self, tasks, options):
+        super().__init__(name="AlgoFX interpreter", daemon=True)
+        self.tasks = tasks
+        self.options = options
+
+    def run(self):
+        interpreter = None
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    return
+                future, code, input_lists = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if interpreter is None:
+                        interpreter = _Interpreter()
+                    future.set_result(interpreter.run(code, input_lists, self.options))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            if interpreter is not None:
+                interpreter.close()
+
+
+def _stop_threads(tasks, threads):
+    for thread in threads:
+        tasks.put(None)
+    for thread in threads:
+        thread.join()
+
+
+class ExecutionPool:
+    """
+    Runs generator-mode algorithms with their inputs on a pool of workers.
+
+    submit() may be called from any thread. Close the pool, or use it as a
+    context manager, to stop the workers and free their subinterpreters.
+    """
+
+    def __init__(self, workers=None, backend=None, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                 max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES, max_output_lines=DEFAULT_MAX_OUTPUT_LINES,
+                 echo_inputs=True):
+        """
+        Args:
+            workers: Number of runs at a time, None for one per CPU
+            backend: INTERPRETERS or PROCESSES, None for subinterpreters where supported
+            cpu_time_limit, max_output_bytes, max_output_lines, echo_inputs: As for run_headless()
+        """
+        if backend is None:
+            backend = INTERPRETERS if subinterpreters_supported() else PROCESSES
+        if backend == INTERPRETERS and not subinterpreters_supported():
+            raise ValueError("Subinterpreters with their own GIL need Python 3.12 or later")
+        if backend not in (INTERPRETERS, PROCESSES):
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
+        self.options = {"cpu_time_limit": cpu_time_limit, "max_output_bytes": max_output_bytes,
+                        "max_output_lines": max_output_lines, "echo_inputs": echo_inputs}
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._tasks = queue.SimpleQueue()
+        threads = []
+        if backend == PROCESSES:
+            # Only here: multiprocessing is most of the import time of the module
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(self.workers)
+        else:
+            options = json.dumps(self.options)
+            threads = [_InterpreterThread(self._tasks, options) for _ in range(self.workers)]
+            for thread in threads:
+                thread.start()
+        # Also at exit: the interpreter aborts if subinterpreters are left when it ends
+        self._stop = weakref.finalize(self, _stop_threads, self._tasks, threads)
+
+    def submit(self, code, inputs=()):
+        """
+        Start a run.
+
+        Args:
+            code: Code object generated with as_generator=True
+            inputs: The text of each value read, in order
+
+        Returns:
+            A concurrent.futures.Future of the result, see run_headless()
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._submit_chunk(marshal.dumps(code), [list(inputs)]).add_done_callback(
+            lambda chunk: _first_result(chunk, future))
+        return future
+
+    def map(self, code, input_lists, chunk_size=None):
+        """
+        Results of the runs of one algorithm with each list of inputs, in order.
+
+        The runs are handed to the workers in chunks, each a single task,
+        so the cost of a task is shared by the runs of its chunk.
+
+        Args:
+            chunk_size: Runs per task, None to give each worker CHUNKS_PER_WORKER chunks
+        """
+        input_lists = [list(inputs) for inputs in input_lists]
+        if chunk_size is None:
+            chunk_size = max(1, len(input_lists) // (self.workers * CHUNKS_PER_WORKER))
+        code = marshal.dumps(code)
+        chunks = [self._submit_chunk(code, input_lists[start:start + chunk_size])
+                  for start in range(0, len(input_lists), chunk_size)]
+        return (result for chunk in chunks for result in chunk.result())
+
+    def _submit_chunk(self, code, input_lists):
+        if self._executor is not None:
+            return self._executor.submit(_run_all, code, input_lists, self.options)
+        future = Future()
+        self._tasks.put((future, code, json.dumps(input_lists)))
+        return future
+
+    def close(self):
+        """Wait for the submitted runs, then stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,246 @@
+"""
+Grading: running every submission against a set of test cases.
+
+The test cases are a JSON file:
+
+    {
+        "whitespace": "lines",
+        "tolerance": 1e-6,
+        "stop_on_failure": false,
+        "cases": [
+            {"name": "pgcd", "inputs": ["12", "18"], "expected": "6\\n", "points": 2},
+            {"name": "premiers", "inputs": ["7", "7"], "expected": "7\\n", "whitespace": "tokens"}
+        ]
+    }
+
+Each case gives the text of the values read by Lire, in order, the output
+expected from Ecrire, and optionally its points (1), tolerance and whitespace
+policy, which default to the ones of the file:
+
+- "exact": the output must be exactly the expected text
+- "lines": the same lines with the same words, whatever the spaces around
+  them and the empty lines at the end
+- "tokens": the same words, whatever the spaces and line breaks
+
+Outside "exact", two words that are both numbers match when they differ by
+at most the tolerance (absolute, or relative to the larger one), so
+"3.3333333" matches "3.33333333333".
+
+grade_directory() compiles each submission once, as a generator
+(algorithm_driver), and runs its cases in order in the same worker, each in
+a child process forked from it with the CPU time and memory limits (see
+process_runner.run_isolated()), and the loop iteration and output limits.
+A run that used more CPU time than allowed is a "limit", whatever it
+printed. With stop_on_failure
+the remaining cases of a submission are skipped at its first failing one.
+Given a result_cache.ResultCache, a run already done with the same code,
+inputs and limits (and not stopped by one) is not done again: after a change to the test cases,
+only the runs of the changed cases are computed.
+The submissions are spread over a pool of worker processes in chunks; each
+report is yielded as soon as it is done. write_score_matrix() writes the
+points of every student for every case as CSV.
+"""
+import csv
+import functools
+import math
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+
+from .algo_compiler import DEFAULT_OPTIONS, compile as compile_algorithm, compile_report
+from .batch import CHUNKS_PER_WORKER, find_algorithms
+from .execution_guard import DEFAULT_CPU_TIME_LIMIT
+from .process_runner import DEFAULT_MEMORY_LIMIT_MB, run_isolated
+
+WHITESPACE_POLICIES = ("exact", "lines", "tokens")
+
+DEFAULT_WHITESPACE = "lines"
+DEFAULT_TOLERANCE = 1e-6
+
+# Status of a test case in a report
+PASSED = "passed"
+FAILED = "failed"  # Wrong output
+ERROR = "error"  # Runtime error, e.g. a division by zero or a missing input
+LIMIT = "limit"  # Stopped by a limit: CPU time, loop iterations, memory or output
+COMPILE_ERROR = "compile_error"
+SKIPPED = "skipped"  # Not run, an earlier case failed and stop_on_failure is set
+
+TestCase = namedtuple("TestCase", "name inputs expected points tolerance whitespace")
+TestCase.__doc__ = """One run of a submission: the values it reads, the output it must write, what it is worth."""
+
+TestSuite = namedtuple("TestSuite", "cases stop_on_failure")
+
+
+class TestSuiteError(ValueError):
+    """Raised when a test case file is not valid."""
+
+
+def load_test_suite(path):
+    """
+    Read a test case file, see the module docstring.
+
+    Raises:
+        OSError: If the file cannot be read
+        TestSuiteError: If it is not a valid test case file
+    """
+    import json
+    with open(path, "r", encoding="utf-8-sig") as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise TestSuiteError(f"{path}: {e}") from None
+    if not isinstance(data, dict) or not isinstance(data.get("cases"), list) or not data["cases"]:
+        raise TestSuiteError(f"{path}: a \"cases\" list is required")
+    whitespace = data.get("whitespace", DEFAULT_WHITESPACE)
+    tolerance = data.get("tolerance", DEFAULT_TOLERANCE)
+    cases = []
+    for index, case in enumerate(data["cases"], 1):
+        try:
+            test_case = TestCase(str(case.get("name", f"cas{index}")), [str(value) for value in case.get("inputs", [])],
+                                 str(case["expected"]), float(case.get("points", 1)),
+                                 float(case.get("tolerance", tolerance)), case.get("whitespace", whitespace))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise TestSuiteError(f"{path}: case {index} needs an \"expected\" output and numeric points") from None
+        if test_case.whitespace not in WHITESPACE_POLICIES:
+            raise TestSuiteError(f"{path}: case {index}: whitespace must be one of {', '.join(WHITESPACE_POLICIES)}")
+        cases.append(test_case)
+    names = [case.name for case in cases]
+    if len(set(names)) != len(names):
+        raise TestSuiteError(f"{path}: the case names must be unique")
+    return TestSuite(cases, bool(data.get("stop_on_failure", False)))
+
+
+def _words_match(words, expected_words, tolerance):
+    if len(words) != len(expected_words):
+        return False
+    for word, expected in zip(words, expected_words):
+        if word == expected:
+            continue
+        try:
+            if not math.isclose(float(word), float(expected), rel_tol=tolerance, abs_tol=tolerance):
+                return False
+        except ValueError:
+            return False
+    return True
+
+
+def output_matches(output, expected, tolerance=DEFAULT_TOLERANCE, whitespace=DEFAULT_WHITESPACE):
+    """Whether the output of a run matches the expected one under a whitespace policy, see the module docstring."""
+    if whitespace == "exact":
+        return output == expected
+    if whitespace == "tokens":
+        return _words_match(output.split(), expected.split(), tolerance)
+    lines = output.rstrip().splitlines()
+    expected_lines = expected.rstrip().splitlines()
+    return len(lines) == len(expected_lines) and all(
+        _words_match(line.split(), expected_line.split(), tolerance)
+        for line, expected_line in zip(lines, expected_lines))
+
+
+def student_name(path, directory):
+    """Name of the student of a submission: its path under the directory, without the extension."""
+    return os.path.splitext(os.path.relpath(path, directory))[0].replace(os.sep, "/")
+
+
+def grade_submission(path, suite, directory=None, options=DEFAULT_OPTIONS, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                     memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, result_cache=None):
+    """
+    Compile one submission and run its test cases.
+
+    Args:
+        memory_limit_mb: Address space of each run, None for no limit
+        result_cache: result_cache.ResultCache of the runs, None to run every case
+
+    Returns:
+        A dict: "file", "student", "score", "max_score", "compile"
+        (algo_compiler.compile_report()), "cases" (per case: "case",
+        "status", "points", "cpu_time", "error", "cached") and "time" (seconds)
+    """
+    start = time.perf_counter()
+    report = {"file": path, "student": student_name(path, directory or os.path.dirname(path)), "score": 0.0,
+              "max_score": sum(case.points for case in suite.cases), "compile": None, "cases": []}
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        code = None
+        report["compile"] = {"file": path, "success": False, "diagnostics": [],
+                             "error": {"message": str(e), "line": None, "column": None}}
+    else:
+        result = compile_algorithm(source, options._replace(as_generator=True))
+        code = result.code
+        report["compile"] = compile_report(result, path)
+
+    stopped = code is None
+    for case in suite.cases:
+        if stopped:
+            status = COMPILE_ERROR if code is None else SKIPPED
+            report["cases"].append({"case": case.name, "status": status, "points": 0.0, "cpu_time": 0.0,
+                                    "error": None, "cached": False})
+            continue
+        if result_cache is None:
+            run = run_isolated(code, case.inputs, cpu_time_limit, memory_limit_mb, echo_inputs=False)
+        else:
+            run = result_cache.run(code, case.inputs, cpu_time_limit, memory_limit_mb, echo_inputs=False)
+        if run["limit_exceeded"] or run["cpu_time"] > cpu_time_limit:
+            # Also a run that finished, late, in a long builtin call the CPU clock was not read in
+            status = LIMIT
+        elif not run["success"]:
+            status = ERROR
+        elif output_matches(run["output"], case.expected, case.tolerance, case.whitespace):
+            status = PASSED
+        else:
+            status = FAILED
+        points = case.points if status == PASSED else 0.0
+        report["score"] += points
+        report["cases"].append({"case": case.name, "status": status, "points": points,
+                                "cpu_time": round(run["cpu_time"], 6), "error": run["error"] or None,
+                                "cached": run.get("cached", False)})
+        stopped = status != PASSED and suite.stop_on_failure
+    report["time"] = round(time.perf_counter() - start, 6)
+    return report
+
+
+def grade_directory(directory, suite, options=DEFAULT_OPTIONS, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                    memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, workers=None, chunk_size=None, result_cache=None):
+    """
+    Grade every .algo file of a directory tree in worker processes.
+
+    Args:
+        directory: Folder of the submissions
+        suite: The TestSuite, see load_test_suite()
+        options: algo_compiler.CompileOptions, e.g. with the loop iteration limit
+        cpu_time_limit: CPU seconds allowed to each run
+        memory_limit_mb: Address space of each run, None for no limit
+        workers: Number of worker processes, None for one per CPU, 1 to grade in this process
+        chunk_size: Submissions handed to a worker at a time, None for automatic
+        result_cache: result_cache.ResultCache shared by the workers, None to run every case
+
+    Yields:
+        The report of each submission, see grade_submission(), as soon as it is done
+    """
+    paths = find_algorithms(directory)
+    if not paths:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if chunk_size is None:
+        chunk_size = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+    work = functools.partial(grade_submission, suite=suite, directory=directory, options=options,
+                             cpu_time_limit=cpu_time_limit, memory_limit_mb=memory_limit_mb, result_cache=result_cache)
+    if workers == 1:
+        yield from map(work, paths)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(work, paths, chunk_size)
+
+
+def write_score_matrix(path, reports, suite):
+    """Write the points of each student (rows, sorted) for each case (columns) as CSV, with their total."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student"] + [case.name for case in suite.cases] + ["total", "max"])
+        for report in sorted(reports, key=lambda report: report["student"]):
+            points = {case["case"]: case["points"] for case in report["cases"]}
+            writer.writerow([report["student"]] + [f"{points[case.name]:g}" for case in suite.cases]
+                            + [f"{report['score']:g}", f"{report['max_score']:g}"])
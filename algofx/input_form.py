@@ -0,0 +1,79 @@
+"""
+Reading several variables with one Lire.
+
+"lire(a, b, c);" compiles to a single call:
+
+    a, b, c = _lire_valeurs(("a", "int"), ("b", "float"), ("c", "bool"))
+
+The IDE provides _lire_valeurs in the namespace of the algorithm: in dialog
+mode it asks for all the values in one form, typed and validated against
+the Var declarations, instead of one dialog per variable. The generated code
+also defines a fallback reading the values one by one with input(), used
+when the code runs on its own (console mode, a copied script). Values are
+converted exactly as a single-variable Lire converts them.
+"""
+
+READ_VALUES_FUNCTION = "_lire_valeurs"
+
+# Emitted once at the top of the generated code when a Lire reads several variables
+READ_VALUES_FALLBACK = f'''if "{READ_VALUES_FUNCTION}" not in globals():
+    def {READ_VALUES_FUNCTION}(*fields):
+        values = []
+        for name, var_type in fields:
+            if var_type == "bool":
+                values.append(input(f"Entrez {{name}} (vrai/faux): ").lower() in ['vrai', 'true', '1'])
+                continue
+            text = input(f"Entrez {{name}}: ")
+            if var_type == "int":
+                values.append(int(text))
+            elif var_type == "float":
+                values.append(float(text))
+            elif var_type == "char":
+                values.append(text[0] if text else '')
+            else:
+                values.append(text)
+        return values'''
+
+TRUE_WORDS = ("vrai", "true", "1")
+FALSE_WORDS = ("faux", "false", "0")
+
+
+def input_prompt(name, var_type):
+    """Prompt of one variable, the same as a single-variable Lire."""
+    if var_type == "bool":
+        return f"Entrez {name} (vrai/faux): "
+    return f"Entrez {name}: "
+
+
+def convert_input(text, var_type):
+    """Value of a variable from the text typed for it; raises ValueError like int() and float() do."""
+    if var_type == "int":
+        return int(text)
+    if var_type == "float":
+        return float(text)
+    if var_type == "bool":
+        return text.lower() in TRUE_WORDS
+    if var_type == "char":
+        return text[0] if text else ''
+    return text
+
+
+def validation_error(text, var_type):
+    """Why text is not a valid value for the type, or None if it is."""
+    if var_type == "int":
+        try:
+            int(text)
+        except ValueError:
+            return "Nombre entier attendu"
+    elif var_type == "float":
+        try:
+            float(text)
+        except ValueError:
+            return "Nombre réel attendu"
+    elif var_type == "bool":
+        if text.lower() not in TRUE_WORDS + FALSE_WORDS:
+            return "vrai ou faux attendu"
+    elif var_type == "char":
+        if len(text) != 1:
+            return "Un seul caractère attendu"
+    return None
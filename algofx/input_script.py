@@ -0,0 +1,71 @@
+"""
+Inputs given to an algorithm up front.
+
+An input script is a text with one value per line. While it is not empty,
+each Lire takes its next value directly, without any dialog or terminal
+round trip; once it runs out, the usual input method takes over. Every
+value an algorithm reads, scripted or typed, is recorded, so a run can be
+replayed exactly by using the recording as the script of the next run.
+"""
+from collections import deque
+
+
+def parse_input_script(text):
+    """Values of an input script: one per line, the line break after the last one is optional."""
+    return text.splitlines()
+
+
+def read_input_script(file_path):
+    """Values of an input script file."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return parse_input_script(f.read())
+
+
+def write_input_script(file_path, values):
+    with open(file_path, "w", encoding="utf-8") as f:
+        for value in values:
+            f.write(value + "\n")
+
+
+class InputScript:
+    """Scripted values still to be read, and the record of every value read so far."""
+
+    def __init__(self, values=()):
+        self.values = deque(values)
+        self.recorded = []
+
+    def take(self):
+        """Next scripted value, or None once the script is exhausted."""
+        return self.values.popleft() if self.values else None
+
+    def take_many(self, count):
+        """Up to count scripted values, fewer if the script runs out."""
+        return [self.values.popleft() for _ in range(min(count, len(self.values)))]
+
+    def record(self, value):
+        """Note a value the algorithm actually read."""
+        self.recorded.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def input_script_preamble(values):
+    """
+    Python source replacing input() by a scripted version in a standalone script.
+
+    Prepended to the generated code in console mode, where the algorithm runs
+    in a terminal of its own; input() falls back to the terminal once the
+    values run out.
+    """
+    return (
+        "import builtins as _builtins, collections as _collections\n"
+        "_input_script = _collections.deque(%r)\n"
+        "def input(prompt=''):\n"
+        "    if _input_script:\n"
+        "        value = _input_script.popleft()\n"
+        "        print(str(prompt) + value)\n"
+        "        return value\n"
+        "    return _builtins.input(prompt)\n"
+        "\n" % (list(values),)
+    )
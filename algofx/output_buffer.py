@@ -0,0 +1,105 @@
+"""
+Bounded storage for the output of a running algorithm.
+
+Output is kept as a list of chunks (no quadratic string growth) and capped
+both in bytes (UTF-8) and in lines. Once a cap is reached the buffer keeps
+what fits, appends a "sortie tronquée" marker and ignores everything after.
+The stream writing into it raises OutputLimitExceeded so the algorithm stops
+right there instead of spinning on output nobody will see.
+"""
+
+DEFAULT_MAX_OUTPUT_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_OUTPUT_LINES = 100000
+
+
+class OutputLimitExceeded(Exception):
+    """Raised in the algorithm when its output reached the configured cap."""
+
+
+class OutputBuffer:
+    """Chunked output store with a maximum size in bytes and in lines."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_OUTPUT_BYTES, max_lines=DEFAULT_MAX_OUTPUT_LINES):
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.chunks = []
+        self.size_bytes = 0
+        self.line_count = 0
+        self.truncated = False
+        self.truncation_message = ""
+
+    def write(self, text):
+        """
+        Store text, or the part of it that fits under the caps.
+
+        Returns:
+            The text actually stored, including the truncation marker when
+            this write hit a cap; an empty string once truncated
+        """
+        if self.truncated or not text:
+            return ""
+        size = len(text) if text.isascii() else len(text.encode("utf-8"))
+        lines = text.count("\n")
+        if self.size_bytes + size <= self.max_bytes and self.line_count + lines <= self.max_lines:
+            self.chunks.append(text)
+            self.size_bytes += size
+            self.line_count += lines
+            return text
+
+        # Keep the beginning that fits, then the marker
+        if self.line_count + lines > self.max_lines:
+            end = -1
+            for _ in range(self.max_lines - self.line_count):
+                end = text.index("\n", end + 1)
+            text = text[:end + 1]
+            self.truncation_message = f"sortie tronquée : limite de {self.max_lines} lignes atteinte"
+        room = self.max_bytes - self.size_bytes
+        if (len(text) if text.isascii() else len(text.encode("utf-8"))) > room:
+            text = text.encode("utf-8")[:max(room, 0)].decode("utf-8", "ignore")
+            size = f"{self.max_bytes // 1024} Ko" if self.max_bytes >= 1024 else f"{self.max_bytes} octets"
+            self.truncation_message = f"sortie tronquée : limite de {size} atteinte"
+        # The marker always starts on a line of its own
+        previous = text or (self.chunks[-1] if self.chunks else "\n")
+        separator = "" if previous.endswith("\n") else "\n"
+        stored = f"{text}{separator}[{self.truncation_message}]\n"
+        self.truncated = True
+        self.chunks.append(stored)
+        self.size_bytes += len(stored.encode("utf-8"))
+        self.line_count += stored.count("\n")
+        return stored
+
+    def getvalue(self):
+        """The whole output as one string, built on demand."""
+        if len(self.chunks) > 1:
+            self.chunks = ["".join(self.chunks)]
+        return self.chunks[0] if self.chunks else ""
+
+    def __iter__(self):
+        """Iterate over the stored chunks without joining them."""
+        return iter(self.chunks)
+
+
+class ExecutionResult(dict):
+    """
+    Result dict of an execution: "success", "error" and "output".
+
+    "output" is not stored: it is joined from the OutputBuffer only when a
+    caller actually reads it.
+    """
+
+    def __init__(self, output_buffer, **values):
+        super().__init__(success=True, error="", **values)
+        self.output_buffer = output_buffer
+
+    def __missing__(self, key):
+        if key == "output":
+            return self.output_buffer.getvalue()
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key == "output" and not dict.__contains__(self, key):
+            return self.output_buffer.getvalue()
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key == "output" or super().__contains__(key)
@@ -0,0 +1,495 @@
+"""
+Execution of an algorithm in a child process.
+
+The generated Python runs in a separate interpreter with resource limits
+(RLIMIT_CPU for the computing time, RLIMIT_AS for the memory), so a student
+program that allocates a huge list or computes an enormous number only
+kills its own process, never the IDE. Stop kills the child at once.
+
+The parent and the child talk over three pipes:
+
+- stdin: the length of the code and the marshalled code object (the child
+  is the same interpreter: it runs the code without compiling anything), a
+  JSON object with the scripted inputs (see input_script) and whether
+  multi-variable reads use a form, then one line per input() past the
+  script: the value, or a JSON list of values for a form
+- stdout: everything the algorithm prints, forwarded as it arrives
+- stderr: control messages, one JSON object per line: {"input": prompt}
+  when the algorithm waits for a value, {"form": [[name, type], ...]} when
+  it waits for several (see input_form), {"input": prompt, "answer": value}
+  when it took a scripted one (nothing to answer), {"error": ..., "line": ...,
+  "span": [line, col, end_line, end_col]} or {"done": true} when it ends
+
+The parent side (AlgorithmProcess) reads stdout and stderr through
+non-blocking pipes and a selector, so it needs no terminal and no Qt. The
+child side is child_main(), run as "python -m algofx.process_runner" or, in
+the frozen application, as "main --run-algorithm". Given a zygote (see
+zygote), AlgorithmProcess forks the child from it instead of starting an
+interpreter, which saves the start-up time of every run.
+
+run_isolated() is run_headless() (algorithm_driver) in a forked child with
+the same resource limits, for the headless runs of grading: the result
+comes back as one JSON object once the child has exited.
+"""
+import codecs
+import json
+import marshal
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from .algo_nodes import Span
+from .execution_guard import ExecutionLimitExceeded, DEFAULT_CPU_TIME_LIMIT, generated_code_line, generated_code_span
+from .input_form import READ_VALUES_FUNCTION, input_prompt, convert_input
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_MEMORY_LIMIT_MB = 1024
+
+# First argument of the frozen executable when it is started as a runner
+RUNNER_ARGUMENT = "--run-algorithm"
+
+_READ_SIZE = 64 * 1024
+
+# The child flushes its output at most this often (~60 times per second) while printing
+_FLUSH_INTERVAL = 0.016
+
+# Time an interrupted child gets to report where it stopped before it is killed
+INTERRUPT_GRACE_SECONDS = 0.05
+
+INTERRUPTED_MESSAGE = "Exécution interrompue par l'utilisateur"
+
+# Runs child_main() with the package importable from the directory that contains it
+_CHILD_BOOTSTRAP = ("import sys; sys.path.insert(0, {!r}); "
+                    "from algofx.process_runner import child_main; sys.exit(child_main())")
+
+
+def is_supported():
+    """Child processes need non-blocking pipes in a selector, which only POSIX systems offer."""
+    return os.name == "posix"
+
+
+def child_command(cpu_time_limit, memory_limit_mb):
+    """Command line that starts a runner process."""
+    limits = ["--cpu", str(float(cpu_time_limit)), "--memory", str(int(memory_limit_mb))]
+    if getattr(sys, "frozen", False):
+        return [sys.executable, RUNNER_ARGUMENT] + limits
+    # -E: ignore PYTHON* variables, -S: no site-packages, the runner only needs the stdlib and this package
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return [sys.executable, "-E", "-S", "-c", _CHILD_BOOTSTRAP.format(root)] + limits
+
+
+# Child side
+
+def _raise_cpu_time_exceeded(signum, frame):
+    raise ExecutionLimitExceeded
+
+
+def apply_resource_limits(cpu_time_limit, memory_limit_mb):
+    """
+    Limit the CPU time and address space of the current process, where the OS allows it.
+
+    A cpu_time_limit of None leaves the CPU time unlimited, e.g. in a worker
+    running many algorithms, each limited by algorithm_driver instead.
+    """
+    if resource is None:
+        return
+    limits = []
+    if cpu_time_limit is not None:
+        # The soft CPU limit sends SIGXCPU, turned into an exception; the hard one kills
+        seconds = max(1, int(round(cpu_time_limit)))
+        limits.append((resource.RLIMIT_CPU, seconds, seconds + 1))
+    if memory_limit_mb:
+        size = int(memory_limit_mb) * 1024 * 1024
+        limits.append((resource.RLIMIT_AS, size, size))
+    for kind, soft, hard in limits:
+        try:
+            current_soft, current_hard = resource.getrlimit(kind)
+            if current_hard != resource.RLIM_INFINITY:
+                soft, hard = min(soft, current_hard), min(hard, current_hard)
+            resource.setrlimit(kind, (soft, hard))
+        except (ValueError, OSError):
+            pass
+    if cpu_time_limit is not None and hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_time_exceeded)
+
+
+def child_main(argv=None):
+    """Entry point of the runner process: read the code on stdin, run it, report on stderr."""
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cpu", type=float, default=DEFAULT_CPU_TIME_LIMIT)
+    parser.add_argument("--memory", type=int, default=DEFAULT_MEMORY_LIMIT_MB)
+    args = parser.parse_args(argv)
+    return run_child(args.cpu, args.memory)
+
+
+def run_child(cpu_time_limit=DEFAULT_CPU_TIME_LIMIT, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB):
+    """Body of child_main() once the limits are known, the entry point of forked runners (see zygote)."""
+    stdin = sys.stdin.buffer
+    size = int(stdin.readline())
+    code = marshal.loads(stdin.read(size))
+    options = json.loads(stdin.readline() or "{}")
+    script = deque(options.get("inputs", ()))
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace", line_buffering=False)
+    stdout = sys.stdout
+    control = open(sys.stderr.fileno(), "w", encoding="utf-8", buffering=1, closefd=False)
+
+    def send(message):
+        try:
+            control.write(json.dumps(message) + "\n")
+        except (OSError, ValueError):
+            # The parent is gone
+            pass
+
+    last_flush = [0.0]
+
+    def algorithm_print(*values, sep=" ", end="\n", file=None, flush=False):
+        print(*values, sep=sep, end=end, file=file)
+        # The first print after a pause shows up at once, a burst in chunks
+        now = time.monotonic()
+        if file is None and (flush or now - last_flush[0] >= _FLUSH_INTERVAL):
+            stdout.flush()
+            last_flush[0] = now
+
+    def algorithm_input(prompt=""):
+        if script:
+            # No round trip: the parent is only told, to record the value
+            value = script.popleft()
+            stdout.write(str(prompt) + value + "\n")
+            send({"input": str(prompt), "answer": value})
+            return value
+        stdout.write(str(prompt))
+        stdout.flush()
+        send({"input": str(prompt)})
+        line = stdin.readline()
+        if not line:
+            # stdin closed: the input was cancelled
+            raise KeyboardInterrupt
+        value = line.decode("utf-8").rstrip("\r\n")
+        stdout.write(value + "\n")  # Echo input in output
+        return value
+
+    def algorithm_read_values(*fields):
+        if not options.get("form"):
+            return [convert_input(algorithm_input(input_prompt(name, var_type)), var_type)
+                    for name, var_type in fields]
+        answers = [script.popleft() for _ in range(min(len(fields), len(script)))]
+        for (name, var_type), value in zip(fields, answers):
+            send({"input": input_prompt(name, var_type), "answer": value})
+        if len(answers) < len(fields):
+            # The rest in one form, answered with a single JSON line
+            stdout.flush()
+            send({"form": [list(field) for field in fields[len(answers):]]})
+            line = stdin.readline()
+            if not line:
+                raise KeyboardInterrupt
+            answers += json.loads(line)
+        for (name, var_type), value in zip(fields, answers):
+            stdout.write(input_prompt(name, var_type) + value + "\n")
+        return [convert_input(value, var_type) for (name, var_type), value in zip(fields, answers)]
+
+    namespace = {"__name__": "__main__", "print": algorithm_print, "input": algorithm_input,
+                 READ_VALUES_FUNCTION: algorithm_read_values}
+    apply_resource_limits(cpu_time_limit, memory_limit_mb)
+    try:
+        exec(code, namespace)
+    except KeyboardInterrupt as e:
+        message = {"error": INTERRUPTED_MESSAGE, "interrupted": True, "line": generated_code_line(e.__traceback__)}
+    except MemoryError:
+        message = {"error": f"Mémoire insuffisante (limite de {memory_limit_mb} Mo)"}
+    except BaseException as e:
+        span = generated_code_span(e.__traceback__)
+        message = {"error": str(e), "line": span.line if span else None, "span": span}
+    else:
+        message = {"done": True}
+    try:
+        stdout.flush()
+    except (OSError, ValueError):
+        pass
+    send(message)
+    return 0
+
+
+# Parent side
+
+class AlgorithmProcess:
+    """
+    A runner process executing one algorithm.
+
+    Usage:
+
+        process = AlgorithmProcess(python_code, input_values=["5", "12"])
+        process.start()
+        for kind, value in process.events():
+            ...  # ("output", text) or ("control", message)
+        process.status  # last control message, e.g. {"done": True}
+
+    events() ends when the child has exited; interrupt() and kill() may be
+    called from any thread to make that happen.
+    """
+
+    def __init__(self, python_code, cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                 memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, input_values=(), input_form=False, zygote=None):
+        """
+        Args:
+            python_code: Code object to run, or Python source compiled here
+            zygote: zygote.Zygote to fork the child from, None to start a new interpreter
+        """
+        if isinstance(python_code, str):
+            python_code = compile(python_code, "<algorithme>", "exec")
+        self.code = python_code
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.input_values = list(input_values)
+        self.input_form = input_form
+        self.zygote = zygote
+        self.process = None
+        self.status = None
+        self.returncode = None
+        self.killed = False
+        self.interrupted = False
+
+    def start(self):
+        if self.zygote is not None:
+            try:
+                self.process = self.zygote.spawn(self.cpu_time_limit, self.memory_limit_mb)
+            except OSError:
+                # The zygote has exited: start an interpreter as without one
+                self.process = None
+        if self.process is None:
+            self._start_interpreter()
+        for pipe in (self.process.stdout, self.process.stderr):
+            os.set_blocking(pipe.fileno(), False)
+        data = marshal.dumps(self.code)
+        options = json.dumps({"inputs": self.input_values, "form": self.input_form}).encode("utf-8")
+        self._send(str(len(data)).encode() + b"\n" + data + options + b"\n")
+
+    def _start_interpreter(self):
+        self.process = subprocess.Popen(
+            child_command(self.cpu_time_limit, self.memory_limit_mb),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            bufsize=0, close_fds=True,
+            # Own session: a Ctrl+C in the terminal that started the IDE is not for the child
+            start_new_session=os.name == "posix")
+
+    def events(self):
+        """Yield ("output", text) and ("control", message) until the child exits."""
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        control_buffer = b""
+        selector = selectors.DefaultSelector()
+        selector.register(self.process.stdout, selectors.EVENT_READ, "output")
+        selector.register(self.process.stderr, selectors.EVENT_READ, "control")
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    data = self._read(key.fileobj)
+                    if data is None:
+                        continue
+                    if not data:
+                        selector.unregister(key.fileobj)
+                    if key.data == "output":
+                        text = decoder.decode(data, final=not data)
+                        if text:
+                            yield "output", text
+                        continue
+                    # A message may refer to output still in the pipe: forward that first
+                    pending = self._read(self.process.stdout) if self.process.stdout in selector.get_map() else None
+                    if pending:
+                        yield "output", decoder.decode(pending)
+                    control_buffer += data
+                    *lines, control_buffer = control_buffer.split(b"\n")
+                    if not data and control_buffer:
+                        lines.append(control_buffer)
+                    for line in lines:
+                        message = self._parse_control(line)
+                        if message is not None:
+                            if "error" in message or "done" in message:
+                                self.status = message
+                            yield "control", message
+        finally:
+            selector.close()
+            self.returncode = self.process.wait()
+            for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+    def send_input(self, text):
+        """Answer an {"input": ...} message; None closes stdin, which cancels the run."""
+        if text is None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            return
+        self._send((text.replace("\n", " ") + "\n").encode("utf-8"))
+
+    def send_form(self, values):
+        """Answer a {"form": ...} message with the text of each field; None cancels the run."""
+        if values is None:
+            self.send_input(None)
+            return
+        self._send((json.dumps(values) + "\n").encode("utf-8"))
+
+    def interrupt(self, grace=INTERRUPT_GRACE_SECONDS):
+        """
+        Stop the child, letting it report the line it was running.
+
+        SIGINT raises KeyboardInterrupt in the algorithm, which is reported
+        with its line; a child that has not exited after grace seconds (stuck
+        in a long builtin call) is killed.
+        """
+        self.interrupted = True
+        if self.process is None or self.process.poll() is not None:
+            return
+        if not hasattr(signal, "SIGINT") or os.name != "posix":
+            self.kill()
+            return
+        try:
+            self.process.send_signal(signal.SIGINT)
+        except OSError:
+            pass
+        timer = threading.Timer(grace, self.kill)
+        timer.daemon = True
+        timer.start()
+
+    def kill(self):
+        """Stop the child immediately (SIGKILL)."""
+        self.killed = True
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+
+    def error_message(self):
+        """Why the run failed, or None if it completed."""
+        if self.status is not None:
+            return self.status.get("error")
+        if self.killed or self.interrupted:
+            return INTERRUPTED_MESSAGE
+        if self.returncode in (-signal.SIGKILL, -getattr(signal, "SIGXCPU", signal.SIGKILL)):
+            # Hard CPU limit: the soft one was ignored or the process was stuck in C code
+            return str(ExecutionLimitExceeded())
+        return f"Le programme s'est arrêté de façon inattendue (code {self.returncode})"
+
+    def _send(self, data):
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            # The child is gone; events() reports why
+            pass
+
+    @staticmethod
+    def _read(pipe):
+        try:
+            return os.read(pipe.fileno(), _READ_SIZE)
+        except BlockingIOError:
+            return None
+
+    @staticmethod
+    def _parse_control(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            # Not from the runner, e.g. an interpreter crash report
+            return {"stderr": line.decode("utf-8", "replace")}
+        return message
+
+
+# Headless runs in a forked child
+
+def _run_forked_child(result_fd, python_code, inputs, cpu_time_limit, memory_limit_mb, options):
+    """Body of the child of run_isolated(): run, write the result as JSON on result_fd. Never returns."""
+    code = 1
+    try:
+        from .algorithm_driver import run_headless
+        apply_resource_limits(cpu_time_limit, memory_limit_mb)
+        result = run_headless(python_code, inputs, cpu_time_limit=cpu_time_limit, **options)
+        if hasattr(signal, "SIGXCPU"):
+            # Past the run: only the hard limit may stop the child now, not an exception while it reports
+            signal.signal(signal.SIGXCPU, signal.SIG_IGN)
+        with open(result_fd, "w", encoding="utf-8") as f:
+            json.dump(dict(result, output=result["output"]), f)
+        code = 0
+    except BaseException:
+        pass
+    finally:
+        os._exit(code)
+
+
+def run_isolated(python_code, inputs=(), cpu_time_limit=DEFAULT_CPU_TIME_LIMIT,
+                 memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, **options):
+    """
+    run_headless() (algorithm_driver) in a forked child with the resource limits of a runner.
+
+    algorithm_driver only looks at the clock between two loop iterations, so
+    a single long builtin call (e.g. 7 puissance 30000000) runs on past the
+    CPU time limit, and nothing bounds the memory of a run in the caller's
+    process. In the child, RLIMIT_CPU kills such a call and RLIMIT_AS stops
+    a huge allocation, and neither reaches the caller. Where fork() is not
+    available the run is done in this process, limited by algorithm_driver.
+
+    Args:
+        options: max_output_bytes, max_output_lines, echo_inputs: as for run_headless()
+
+    Returns:
+        The result dict of run_headless(), with "output" stored; "cpu_time"
+        is the CPU time of the child when it was killed
+    """
+    # Imported here: the runners of child_main() and of the zygote do not drive generators
+    from .algorithm_driver import run_headless
+    if not hasattr(os, "fork"):
+        result = run_headless(python_code, inputs, cpu_time_limit=cpu_time_limit, **options)
+        return dict(result, output=result["output"])
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.fork()
+    except OSError:
+        os.close(read_fd)
+        os.close(write_fd)
+        raise
+    if pid == 0:
+        os.close(read_fd)
+        _run_forked_child(write_fd, python_code, inputs, cpu_time_limit, memory_limit_mb, options)
+    os.close(write_fd)
+    # Read to the end before waiting: a large output would fill the pipe and block the child
+    with open(read_fd, "rb") as f:
+        data = f.read()
+    _, status, usage = os.wait4(pid, 0)
+    try:
+        result = json.loads(data)
+    except ValueError:
+        result = None
+    if isinstance(result, dict):
+        if result.get("span") is not None:
+            result["span"] = Span(*result["span"])
+        return result
+    # Killed before it could report: at the hard CPU limit, or crashed
+    killed = os.WIFSIGNALED(status) and os.WTERMSIG(status) in (signal.SIGKILL, getattr(signal, "SIGXCPU", None))
+    if killed:
+        error = str(ExecutionLimitExceeded())
+    else:
+        error = f"Le programme s'est arrêté de façon inattendue (code {os.waitstatus_to_exitcode(status)})"
+    return {"success": False, "error": error, "output": "", "inputs": [], "limit_exceeded": killed,
+            "cpu_time": usage.ru_utime + usage.ru_stime, "steps": 0}
+
+
+if __name__ == "__main__":
+    sys.exit(child_main())
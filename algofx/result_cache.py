@@ -0,0 +1,248 @@
+"""
+On-disk cache of headless runs, for graders re-running whole cohorts.
+
+The language has no randomness, no clock and no files: a generated program
+run with the same input values and the same limits always gives the same
+result. ResultCache stores the result of process_runner.run_isolated()
+under a hash of exactly those:
+
+- the compiled code (marshalled without object references, so two equal
+  code objects always give the same bytes; the loop limit is in it)
+- the text of each input value, in order
+- the limits and options of the run: CPU time, memory, output, whether
+  inputs are echoed
+
+The entries are JSON files (~/.AlgoFX/cache/results), bounded in total
+size, least recently used first evicted. A hit gives back the output, the
+status ("success", "error", "line", "span", "limit_exceeded"), the steps and
+the CPU time of the run that was stored, without running anything:
+
+    cache = ResultCache()
+    result = cache.run(code, ["12", "18"], cpu_time_limit=1.0)
+
+When a single test case changes, only its runs are computed again. A run
+stopped by a limit is not stored: whether it reaches the CPU time limit
+depends on the load of the machine, so it is done again next time. Pass no
+cache (e.g. "algofx grade --no-cache") to run everything again.
+
+The entries are kept in a folder per runtime version, a hash of the modules
+that run the code and of the Python version: the entries of other versions
+are never read, and being the least recently used they are evicted first.
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+
+from .algo_nodes import Span
+from .compile_cache import _module_fingerprint
+from .execution_guard import DEFAULT_CPU_TIME_LIMIT
+from .process_runner import DEFAULT_MEMORY_LIMIT_MB, run_isolated
+
+# Bump when the layout of the cached entries changes
+CACHE_FORMAT = 2
+
+# Modules whose code determines the result of a run
+_RUNTIME_MODULES = tuple(f"{__package__}.{name}" for name in (
+    "algorithm_driver", "execution_guard", "input_form", "output_buffer", "process_runner"))
+
+# The directory is scanned for eviction each time this fraction of its maximum size has been written
+_EVICTION_FRACTION = 16
+
+_runtime_version = None
+
+
+def runtime_version():
+    """Hash of the runtime modules, the Python version and the cache format."""
+    global _runtime_version
+    if _runtime_version is None:
+        digest = hashlib.sha256()
+        digest.update(sys.version.encode())
+        digest.update(str(CACHE_FORMAT).encode())
+        for name in _RUNTIME_MODULES:
+            digest.update(name.encode())
+            digest.update(_module_fingerprint(name))
+        _runtime_version = digest.hexdigest()[:16]
+    return _runtime_version
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".AlgoFX", "cache", "results")
+
+
+class ResultCache:
+    """A size-bounded directory of run results, shared by the processes that use it."""
+
+    def __init__(self, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            directory: Where to store the entries, None for the default location
+            max_disk_bytes: Total size of the entries before eviction
+        """
+        self.directory = default_cache_dir() if directory is None else directory
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._disk_ready = False
+        self._written = 0
+
+    def __getstate__(self):
+        # Sent to worker processes, see grading
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(code, inputs, options):
+        """Cache key of a run: hash of its marshalled code, input values and run_isolated() limits and options."""
+        digest = hashlib.sha256(marshal.dumps(code, 2))
+        digest.update(json.dumps([list(inputs), sorted(options.items())]).encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def run(self, code, inputs=(), cpu_time_limit=DEFAULT_CPU_TIME_LIMIT, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+            **options):
+        """
+        run_isolated(code, inputs, cpu_time_limit, memory_limit_mb, **options), or its stored result.
+
+        Returns:
+            The result dict of run_isolated(), and "cached": whether it comes from the cache
+        """
+        options = dict(options, cpu_time_limit=cpu_time_limit, memory_limit_mb=memory_limit_mb)
+        key = self.key(code, inputs, options)
+        result = self.get(key)
+        if result is not None:
+            result["cached"] = True
+            return result
+        result = run_isolated(code, inputs, **options)
+        if not result["limit_exceeded"] and result["cpu_time"] <= cpu_time_limit:
+            self.put(key, result)
+        result["cached"] = False
+        return result
+
+    def get(self, key):
+        """Return the stored result of a run, or None on a miss."""
+        return self._read_disk(key)
+
+    def put(self, key, result):
+        """Store the result of a run, a plain dict as run() returns."""
+        self._write_disk(key, result)
+
+    def clear(self):
+        """Drop every entry."""
+        for path in self._entry_paths():
+            self._remove(path)
+
+    # Every failure here only costs running the algorithm again, so errors are swallowed.
+
+    def _path(self, key):
+        # Spread over 256 folders, so none gets too large to list
+        return os.path.join(self.directory, runtime_version(), key[:2], key + ".json")
+
+    def _entry_paths(self):
+        """Paths of the entries of every runtime version."""
+        if not os.path.isdir(self.directory):
+            return
+        with os.scandir(self.directory) as versions:
+            for version in versions:
+                if not version.is_dir():
+                    continue
+                with os.scandir(version.path) as folders:
+                    for folder in folders:
+                        if len(folder.name) == 2 and folder.is_dir():
+                            with os.scandir(folder.path) as entries:
+                                yield from (entry.path for entry in entries if entry.name.endswith(".json"))
+
+    def _prepare_disk(self):
+        """Create the folder of the runtime version; nothing is wiped, so workers sharing the cache never race."""
+        if self._disk_ready:
+            return True
+        try:
+            os.makedirs(os.path.join(self.directory, runtime_version()), exist_ok=True)
+        except OSError:
+            return False
+        self._disk_ready = True
+        return True
+
+    def _read_disk(self, key):
+        if not self._prepare_disk():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._remove(path)
+            return None
+        valid = isinstance(data, dict) and data.get("format") == CACHE_FORMAT and isinstance(data.get("result"), dict)
+        if not valid:
+            self._remove(path)
+            return None
+        try:
+            # Mark as recently used for the eviction order
+            os.utime(path)
+        except OSError:
+            pass
+        result = data["result"]
+        if result.get("span") is not None:
+            result["span"] = Span(*result["span"])
+        return result
+
+    def _write_disk(self, key, result):
+        if not self._prepare_disk():
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = json.dumps({"format": CACHE_FORMAT, "result": result}, ensure_ascii=False).encode("utf-8")
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError):
+            self._remove(temp_path)
+            return
+        with self._lock:
+            self._written += len(data)
+            if self._written < self.max_disk_bytes // _EVICTION_FRACTION:
+                return
+            self._written = 0
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete the least recently used entries until the directory fits in max_disk_bytes."""
+        files = []
+        total = 0
+        try:
+            for path in self._entry_paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Evicted by another process meanwhile
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_disk_bytes:
+            return
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,107 @@
+"""
+Read-only access to the IDE settings without Qt.
+
+The IDE stores its settings with QSettings("AlgoFX", "AlgoFX"), in the
+native format of each system: an INI file on Linux, a property list on
+macOS, the registry on Windows. UserSettings reads the same store with the
+standard library only, so the command-line tool applies the limits chosen
+in the settings dialog without importing PyQt5:
+
+    settings = UserSettings()
+    steps = settings.value("algorithm_execution_steps", 1000, type=int)
+
+Values that cannot be read or converted fall back to the default, as with
+QSettings.value().
+"""
+import os
+import sys
+
+ORGANIZATION = "AlgoFX"
+APPLICATION = "AlgoFX"
+
+_TRUE_TEXTS = ("true", "1")
+
+
+def settings_path():
+    """The file QSettings uses on this system, None on Windows (registry)."""
+    if sys.platform == "win32":
+        return None
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Preferences",
+                            f"com.{ORGANIZATION.lower()}.{APPLICATION}.plist")
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(config_home, ORGANIZATION, APPLICATION + ".conf")
+
+
+def _read_ini(path):
+    """Keys of the [General] section of a QSettings INI file, with their raw text values."""
+    values = {}
+    section = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1]
+            elif section == "General" and "=" in line:
+                key, value = line.split("=", 1)
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+                values[key.strip()] = value
+    return values
+
+
+def _read_plist(path):
+    import plistlib
+    with open(path, "rb") as f:
+        return plistlib.load(f)
+
+
+def _read_registry():
+    import winreg
+    values = {}
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, rf"Software\{ORGANIZATION}\{APPLICATION}") as key:
+        index = 0
+        while True:
+            try:
+                name, value, _ = winreg.EnumValue(key, index)
+            except OSError:
+                break
+            values[name] = value
+            index += 1
+    return values
+
+
+class UserSettings:
+    """The settings of the IDE, read once from the QSettings store."""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Settings file to read instead of the one of the IDE
+        """
+        path = path or settings_path()
+        try:
+            if path is None:
+                self.values = _read_registry()
+            elif path.endswith(".plist"):
+                self.values = _read_plist(path)
+            else:
+                self.values = _read_ini(path)
+        except (OSError, ValueError):
+            # No settings saved yet: every value is its default
+            self.values = {}
+
+    def value(self, key, default=None, type=None):
+        """The stored value of key converted to type, or default if it is missing or invalid."""
+        value = self.values.get(key)
+        if value is None:
+            return default
+        if type is None:
+            return value
+        try:
+            if type is bool:
+                return value if isinstance(value, bool) else str(value).lower() in _TRUE_TEXTS
+            return type(value)
+        except (TypeError, ValueError):
+            return default
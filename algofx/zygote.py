@@ -0,0 +1,336 @@
+"""
+Forking runner processes from a warm zygote instead of starting each one.
+
+A runner started by process_runner is a fresh interpreter: 30 to 50 ms of
+start-up and imports before the algorithm runs its first line, paid on every
+run. The zygote is a runner process started once, which imports everything
+a run needs (process_runner, execution_guard, input_form, math)
+and then waits. Each run asks it to fork() a copy of itself, which becomes
+the runner of run_child(): the same pipes, the same protocol, the same
+resource limits, but ready in a few milliseconds.
+
+    zygote = shared_zygote()
+    process = AlgorithmProcess(code, zygote=zygote)
+
+The parent and the zygote talk over a Unix socket, one run at a time:
+
+- the parent sends {"cpu": seconds, "memory": megabytes} with four file
+  descriptors: the read end of the child's stdin, the write ends of its
+  stdout and stderr, and a socket on which the zygote writes the exit code
+  of the child when it has reaped it
+- the zygote answers {"pid": pid}, or {"error": message} if fork() failed
+
+The forked child starts its own session, puts the pipes on its standard
+streams and calls run_child(). Nothing a run does reaches the zygote or the
+next run: each child starts from the zygote as it was before the first one,
+with a new namespace for the algorithm, and the random module is reseeded
+at fork.
+
+Forking needs os.fork() and file descriptor passing (socket.send_fds), so
+POSIX only; AlgorithmProcess starts a new interpreter when the zygote is not
+available or not running.
+"""
+import gc
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+from .process_runner import run_child
+
+# First argument of the frozen executable when it is started as a zygote
+ZYGOTE_ARGUMENT = "--algorithm-zygote"
+
+_MESSAGE_SIZE = 4096
+
+# stdin, stdout and stderr of the child, and the socket its exit code is written to
+_RUN_DESCRIPTORS = 4
+
+# Runs zygote_main() with the package importable from the directory that contains it
+_ZYGOTE_BOOTSTRAP = ("import sys; sys.path.insert(0, {!r}); "
+                     "from algofx.zygote import zygote_main; sys.exit(zygote_main())")
+
+
+def is_supported():
+    """The zygote needs fork() and file descriptor passing over Unix sockets."""
+    return hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+def zygote_command(fd):
+    """Command line that starts a zygote listening on the socket fd."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, ZYGOTE_ARGUMENT, str(fd)]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return [sys.executable, "-E", "-S", "-c", _ZYGOTE_BOOTSTRAP.format(root), str(fd)]
+
+
+# Zygote side
+
+def _reap(children):
+    """Collect the children that have exited and send their exit codes."""
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        status_socket = children.pop(pid, None)
+        if status_socket is None:
+            continue
+        try:
+            status_socket.sendall(f"{os.waitstatus_to_exitcode(status)}\n".encode())
+        except OSError:
+            # The parent is no longer waiting
+            pass
+        status_socket.close()
+
+
+def _run_child(request, fds, inherited):
+    """Body of a forked child: become a runner on the received pipes. Never returns."""
+    code = 1
+    try:
+        os.setsid()
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for fd in inherited:
+            os.close(fd)
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.close(fds[3])
+        # The streams of the zygote were made for /dev/null; kept referenced, their collection would close 0, 1 and 2
+        zygote_streams = (sys.stdin, sys.stdout, sys.stderr)  # noqa: F841
+        sys.stdin = sys.__stdin__ = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = sys.__stdout__ = open(1, "w", encoding="utf-8", closefd=False)
+        sys.stderr = sys.__stderr__ = open(2, "w", encoding="utf-8", errors="backslashreplace",
+                                           closefd=False)
+        code = run_child(float(request["cpu"]), int(request["memory"]))
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        os._exit(code)
+
+
+def zygote_main(argv=None):
+    """Entry point of the zygote: fork a runner for each request on the socket, until it is closed."""
+    argv = sys.argv[1:] if argv is None else argv
+    control = socket.socket(fileno=int(argv[0]))
+    # What the generated code imports, once for every run
+    import math  # noqa: F401
+
+    wakeup_read, wakeup_write = os.pipe()
+    for fd in (wakeup_read, wakeup_write):
+        os.set_blocking(fd, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    children = {}
+    selector = selectors.DefaultSelector()
+    selector.register(control, selectors.EVENT_READ)
+    selector.register(wakeup_read, selectors.EVENT_READ)
+    # Everything allocated so far stays shared with the children, the collector no longer writes to it
+    gc.freeze()
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj != control:
+                try:
+                    os.read(wakeup_read, _MESSAGE_SIZE)
+                except BlockingIOError:
+                    pass
+                _reap(children)
+                continue
+            data, fds, _, _ = socket.recv_fds(control, _MESSAGE_SIZE, _RUN_DESCRIPTORS)
+            if not data:
+                # The parent is gone; the running children finish on their own
+                return 0
+            if len(fds) != _RUN_DESCRIPTORS:
+                for fd in fds:
+                    os.close(fd)
+                control.sendall(b'{"error": "expected 4 file descriptors"}\n')
+                continue
+            try:
+                pid = os.fork()
+            except OSError as e:
+                reply = {"error": str(e)}
+            else:
+                if pid == 0:
+                    inherited = [control.fileno(), wakeup_read, wakeup_write]
+                    inherited += [status_socket.fileno() for status_socket in children.values()]
+                    _run_child(json.loads(data), fds, inherited)
+                children[pid] = socket.socket(fileno=fds[3])
+                fds = fds[:3]
+                reply = {"pid": pid}
+            for fd in fds:
+                os.close(fd)
+            control.sendall((json.dumps(reply) + "\n").encode())
+
+
+# Parent side
+
+class ForkedProcess:
+    """
+    A runner forked by the zygote.
+
+    It has the part of the subprocess.Popen interface AlgorithmProcess uses:
+    stdin, stdout, stderr, poll(), wait(), send_signal() and kill().
+    """
+
+    def __init__(self, pid, stdin, stdout, stderr, status_socket):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.status_socket = status_socket
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            self.status_socket.setblocking(False)
+            try:
+                self._set_returncode(self.status_socket.recv(_MESSAGE_SIZE))
+            except BlockingIOError:
+                pass
+        return self.returncode
+
+    def wait(self):
+        if self.returncode is None:
+            self.status_socket.setblocking(True)
+            self._set_returncode(self.status_socket.recv(_MESSAGE_SIZE))
+        return self.returncode
+
+    def send_signal(self, signum):
+        # Not once reaped: the pid may already belong to another process
+        if self.poll() is None:
+            os.kill(self.pid, signum)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def _set_returncode(self, data):
+        try:
+            self.returncode = int(data)
+        except ValueError:
+            # The zygote died before the child: its exit code is lost
+            self.returncode = 1
+        self.status_socket.close()
+
+
+class Zygote:
+    """
+    A zygote process and the socket to it.
+
+    spawn() may be called from any thread; the requests are sent one at a
+    time. The zygote exits when the socket is closed, by close() or with the
+    process that started it.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.socket = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        parent_socket, zygote_socket = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                zygote_command(zygote_socket.fileno()), pass_fds=(zygote_socket.fileno(),),
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, start_new_session=True)
+        except OSError:
+            parent_socket.close()
+            raise
+        finally:
+            zygote_socket.close()
+        self.socket = parent_socket
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def spawn(self, cpu_time_limit, memory_limit_mb):
+        """
+        Fork a runner process with these limits.
+
+        Returns:
+            A ForkedProcess, with the pipes of its standard streams open
+
+        Raises:
+            OSError: If the zygote is not running or could not fork
+        """
+        stdin_read, stdin_write = os.pipe()
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        status_socket, child_status_socket = socket.socketpair()
+        child_fds = [stdin_read, stdout_write, stderr_write, child_status_socket.fileno()]
+        request = json.dumps({"cpu": float(cpu_time_limit), "memory": int(memory_limit_mb)}).encode()
+        try:
+            with self._lock:
+                if self.socket is None:
+                    raise OSError("The zygote is not running")
+                socket.send_fds(self.socket, [request], child_fds)
+                reply = self.socket.recv(_MESSAGE_SIZE)
+        except OSError:
+            for fd in (stdin_write, stdout_read, stderr_read):
+                os.close(fd)
+            status_socket.close()
+            raise
+        finally:
+            # Only the child keeps these ends, so the parent sees EOF when it exits
+            for fd in child_fds[:3]:
+                os.close(fd)
+            child_status_socket.close()
+        try:
+            reply = json.loads(reply)
+        except ValueError:
+            # No answer: the zygote has exited
+            reply = {}
+        if "pid" not in reply:
+            for fd in (stdin_write, stdout_read, stderr_read):
+                os.close(fd)
+            status_socket.close()
+            raise OSError(reply.get("error", "The zygote has exited"))
+        return ForkedProcess(reply["pid"], open(stdin_write, "wb", buffering=0), open(stdout_read, "rb", buffering=0),
+                             open(stderr_read, "rb", buffering=0), status_socket)
+
+    def close(self):
+        """Stop the zygote; runners already forked finish on their own."""
+        with self._lock:
+            if self.socket is not None:
+                self.socket.close()
+                self.socket = None
+        if self.process is not None:
+            self.process.wait()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_zygote():
+    """
+    The zygote of this process, started on first use and again if it died.
+
+    Returns None where fork() is not available or the zygote cannot start.
+    """
+    global _shared
+    if not is_supported():
+        return None
+    with _shared_lock:
+        if _shared is None or not _shared.is_running():
+            if _shared is not None:
+                _shared.close()
+            zygote = Zygote()
+            try:
+                zygote.start()
+            except OSError:
+                return None
+            _shared = zygote
+        return _shared
@@ -17,6 +17,8 @@ from app_data import about_text, syntax_help_text, templates, empty_template_cur
 from toolbar_manager import ToolbarManager
 from menu_manager import MenuManager
 from compiler_module import AlgorithmCompiler
+from output_viewer import OutputViewer
+from input_script_panel import InputScriptPanel
 from syntax_helpers import show_syntax_help, get_formatted_syntax_help
 from settings_manager import SettingsManager
 
@@ -72,7 +74,7 @@ class AlgorithmIDE(QMainWindow):
 
         # Set a white background for console with dark text for better visibility
         self.output_viewer.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #FFFFFF;
                 color: #000000;
                 border: 1px solid #CCCCCC;
@@ -99,6 +101,12 @@ class AlgorithmIDE(QMainWindow):
         # Add execution state flag
         self.is_executing = False
         
+        # Thread running the current algorithm, see real_time_execution.AlgorithmWorker
+        self.execution_worker = None
+        
+        # Values read by the last run, replayed by the input script panel
+        self.last_run_inputs = None
+        
         # Initialize settings
         self.init_settings()
         
@@ -111,6 +119,11 @@ class AlgorithmIDE(QMainWindow):
         self.setWindowTitle(f"AlgoFX - Version 64 Bit - {self.app_version}")
         #self.setGeometry(100, 100, 1200, 700)
         
+        # Input script dock, hidden until shown from the Affichage menu
+        self.input_script_panel = InputScriptPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.input_script_panel)
+        self.input_script_panel.hide()
+        
         # Create menu bar (now self.editor exists)
         menu_manager = MenuManager(self)
         self.menubar = menu_manager.create_menu()
@@ -237,15 +250,16 @@ class AlgorithmIDE(QMainWindow):
         output_layout = QVBoxLayout()
         self.output_widget.setLayout(output_layout)
         
-        self.output_viewer = QTextEdit()
+        self.output_viewer = OutputViewer()
         self.output_viewer.setFont(QFont("Courier New", 13))  # Changed from 10 to 12
-        self.output_viewer.setReadOnly(True)
+        self.output_viewer.save_requested.connect(self.save_output_as)
         output_layout.addWidget(self.output_viewer)
         
         # Add tabs to tab widget - HIDE PYTHON TAB INITIALLY
         self.tabs.addTab(self.editor_widget, "Éditeur d'Algorithme")
         # We'll add the Python tab only when needed
         self.tabs.addTab(self.output_widget, "Sortie d'Exécution")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         
         # Apply theme-adaptive tab styling
         self.apply_tab_styling(is_dark_mode)
@@ -546,12 +560,35 @@ class AlgorithmIDE(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement du fichier: {e}")
 
+    def save_output_as(self):
+        """Save the complete execution output, including lines no longer displayed"""
+        algo_folder = os.path.join(os.path.expanduser("~"), "algorithmes")
+        default_filename = os.path.join(algo_folder, f"{self.extract_algorithm_name()}_sortie.txt")
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer la sortie",
+            default_filename,
+            "Fichiers texte (*.txt);;Tous les fichiers (*)"
+        )
+        
+        if file_path:
+            try:
+                self.output_viewer.save_to(file_path)
+                self.statusBar().showMessage(f"Sortie enregistrée: {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement de la sortie: {e}")
+
+    def on_tab_changed(self, index):
+        """The Python code is only unparsed when its tab is shown"""
+        if self.tabs.widget(index) is self.python_code_widget:
+            self.algorithm_compiler.show_python_source()
+            
     def show_python_code(self):
         """Show Python code tab if it's not already shown"""
         # First, make sure we have compiled code
-        python_code = self.compile_algorithm(switch_tab=False)
+        code = self.compile_algorithm(switch_tab=False)
         
-        if not python_code:
+        if not code:
             return
             
         # Add the Python tab if it's not already added
@@ -564,27 +601,32 @@ class AlgorithmIDE(QMainWindow):
                 
     def compile_algorithm(self, switch_tab=True):
         """Forward to the compiler module"""
-        python_code = self.algorithm_compiler.compile_algorithm(switch_tab)
+        code = self.algorithm_compiler.compile_algorithm(switch_tab)
         
         # Add the Python tab if compilation was successful and tab isn't already added
-        if python_code and switch_tab and not self.python_tab_added:
+        if code and switch_tab and not self.python_tab_added:
             self.tabs.insertTab(1, self.python_code_widget, "Code Python")
             self.python_tab_added = True
             self.tabs.setCurrentIndex(1)
             
-        return python_code
+        return code
         
     def run_algorithm(self):
         """Forward to compiler module with execution flag"""
+        # Only one algorithm runs at a time
+        if self.execution_worker is not None:
+            self.statusBar().showMessage("Une exécution est déjà en cours")
+            return
+        
         self.is_executing = True
         
         # Check input type from settings
         settings = QSettings("AlgoFX", "AlgoFX")
         input_type = settings.value("input_type", 1, type=int)  # Default to console (1)
         
-        # If window input is selected (input_type == 2), ensure output tab is visible
+        # If window or output tab input is selected (input_type 2 or 3), ensure output tab is visible
         # For console input (input_type == 1), remove output tab if it exists
-        show_execution_tab = (input_type == 2)
+        show_execution_tab = input_type in (2, 3)
         
         # Get the index of the output tab
         output_tab_index = -1
@@ -607,7 +649,18 @@ class AlgorithmIDE(QMainWindow):
         # Pass the execution tab visibility info to the algorithm compiler
         self.algorithm_compiler.run_algorithm(self.tabs, self.python_tab_added, show_execution_tab)
         
-        self.is_executing = False  # Reset flag when execution completes normally
+        # In-app execution continues on a worker thread, which resets the flag when it finishes
+        if self.execution_worker is None:
+            self.is_executing = False  # Reset flag when execution completes normally
+  
+    def stop_algorithm(self):
+        """Interrupt the running algorithm; the worker reports where it stopped when it finishes"""
+        if self.execution_worker is None:
+            return
+        self.is_executing = False
+        # Before stop(): a worker that stops at once reports its own status
+        self.statusBar().showMessage("Arrêt de l'exécution...")
+        self.execution_worker.stop()
   
     def handle_execution_result(self, result):
         # Clear previous output
@@ -623,18 +676,9 @@ class AlgorithmIDE(QMainWindow):
         
     def clear_output(self):
         self.output_viewer.clear()
-        cursor = self.output_viewer.textCursor()
-        cursor.movePosition(cursor.Start)
-        self.output_viewer.setTextCursor(cursor)
         
     def append_colored_text(self, text, color="#E0E0E0"):
-        from PyQt5.QtGui import QTextCharFormat, QColor
-        cursor = self.output_viewer.textCursor()
-        format = QTextCharFormat()
-        format.setForeground(QColor(color))
-        cursor.mergeCharFormat(format)
-        cursor.insertText(text)
-        self.output_viewer.setTextCursor(cursor)
+        self.output_viewer.append_text(text, color)
         
     def show_about(self):
         msg_box = QMessageBox(self)
@@ -864,7 +908,7 @@ class AlgorithmIDE(QMainWindow):
             
             # Set dark background for output viewer with readable text
             self.output_viewer.setStyleSheet("""
-                QTextEdit {
+                QPlainTextEdit {
                     background-color: #101010;
                     color: #DCDCDC;
                     border: 1px solid #3E3E40;
@@ -887,7 +931,7 @@ class AlgorithmIDE(QMainWindow):
             
             # Set white background for console with dark text
             self.output_viewer.setStyleSheet("""
-                QTextEdit {
+                QPlainTextEdit {
                     background-color: #FFFFFF;
                     color: #000000;
                     border: 1px solid #CCCCCC;
@@ -1121,6 +1165,12 @@ class AlgorithmIDE(QMainWindow):
         # Save window state before closing
         self.saveWindowState()
         
+        # Stop a running algorithm so its thread does not outlive the window
+        if self.execution_worker is not None:
+            self.is_executing = False
+            self.execution_worker.stop()
+            self.execution_worker.wait(1000)
+        
         # Call the parent class method or handle other close operations
         super().closeEvent(event)
         
@@ -1310,7 +1360,7 @@ class AlgorithmIDE(QMainWindow):
         
         # Make output_viewer theme-aware instead of always using light theme
         output_style = """
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: %s;
                 color: %s;
                 border: 1px solid %s;
@@ -1394,6 +1444,8 @@ class AlgorithmIDE(QMainWindow):
         steps = settings.value("algorithm_execution_steps", 1000, type=int)
         if hasattr(self, 'compiler') and self.compiler:
             self.compiler.update_max_execution_steps(steps)
+            self.compiler.update_loop_guard()
+            self.compiler.update_fast_locals()
         
         # Apply error language setting
         error_language = settings.value("error_language_param", "french", type=str)
@@ -0,0 +1,541 @@
+"""
+Micro-benchmarks of the algorithm compiler and runtime.
+
+Usage:
+    python benchmarks.py [name ...] [--baseline DIR]
+
+Without arguments every benchmark runs. Timings are the best of several
+repeats, so they measure the code and not the machine's background noise.
+
+--baseline points at a checkout of the tree from before the rewrite of the
+compiler (e.g. made with "git worktree add DIR <commit>"); front_end then
+also times that tree's checker and translator on the same algorithm.
+"""
+import argparse
+import ast
+import contextlib
+import io
+import marshal
+import os
+import pkgutil
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import algofx
+
+from algofx import algo_compiler
+from algofx.algorithm_driver import run_headless
+from algofx.batch import compile_directory
+from algofx.execution_pool import ExecutionPool, INTERPRETERS, PROCESSES, subinterpreters_supported
+from algofx.grading import TestCase, TestSuite, grade_directory
+from algofx.process_runner import AlgorithmProcess
+from algofx.result_cache import ResultCache
+from algofx.zygote import Zygote
+from app_data import templates
+from algofx.algo_checker import analyze, check, parse_program
+from algofx.algo_compiler import CompileOptions
+from algofx.algo_lexer import tokenize
+from FrenchAlgorithmCompiler import FrenchAlgorithmCompiler
+from algofx.execution_guard import CpuWatchdog, LOOP_GUARD_MODES, LOOP_GUARD_PER_LOOP, LOOP_GUARD_WATCHDOG
+
+# A 'tantque' around a 'pour': OUTER * INNER iterations of a cheap body
+LOOP_ALGORITHM = """Algorithme Boucles;
+Var
+    i, j, s: Entier;
+Debut
+    s <- 0;
+    j <- 0;
+    Tantque j < {outer} Faire
+        Pour i de 1 a {inner} Faire
+            s <- s + i mod 7;
+        FinPour
+        j <- j + 1;
+    FinTantque
+    Ecrire(s);
+Fin
+"""
+
+# Repeated to build a long algorithm for the front end benchmark
+FRONT_END_BLOCK = """    Pour i de 1 a 10 Faire
+        Si i mod 2 = 0 Alors
+            s <- s + i;
+        Sinon
+            s <- s - 1;
+        FinSi
+    FinPour
+    Ecrire("s = ", s);
+"""
+
+# Run with the baseline checkout as working directory: best time of the
+# original IDE compile, i.e. the regex checker, the line by line translator,
+# then ast.parse and compile of the generated text
+BASELINE_FRONT_END = """
+import ast, sys, time, types
+from compiler_module import AlgorithmCompiler
+from FrenchAlgorithmCompiler import FrenchAlgorithmCompiler
+source = sys.stdin.read()
+translator = FrenchAlgorithmCompiler(max_steps=1000)
+best = float("inf")
+for _ in range(5):
+    start = time.perf_counter()
+    errors = AlgorithmCompiler.check_common_syntax_errors(types.SimpleNamespace(), source)
+    python_code = translator.compile_to_python(source)
+    ast.parse(python_code)
+    compile(python_code, "<algorithme>", "exec")
+    best = min(best, time.perf_counter() - start)
+assert not errors, errors
+print(best)
+"""
+
+
+# Counts the primes up to n: a few milliseconds per run, like the test cases of an exercise
+PRIMES_ALGORITHM = """Algorithme Premiers;
+Var
+    n, i, j, compte: Entier;
+    premier: Booleen;
+Debut
+    Lire(n);
+    compte <- 0;
+    Pour i de 2 a n Faire
+        premier <- Vrai;
+        j <- 2;
+        Tantque j * j <= i Et premier Faire
+            Si i mod j = 0 Alors
+                premier <- Faux;
+            FinSi
+            j <- j + 1;
+        FinTantque
+        Si premier Alors
+            compte <- compte + 1;
+        FinSi
+    FinPour
+    Ecrire(compte);
+Fin
+"""
+
+
+# Modules the core package must never load, directly or through a dependency
+GUI_MODULES = ("PyQt5", "sip", "tkinter", "_tkinter")
+
+# Import time allowed for any one module of the core package with everything it needs, in milliseconds
+CORE_IMPORT_BUDGET_MS = 100
+
+
+def best_time(function, repeat=5):
+    """Best wall-clock time of several calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_code(code, guard=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        with guard or contextlib.nullcontext():
+            exec(code, {})
+
+
+def bench_loop_guards(outer=200, inner=5000):
+    """Per-iteration cost of each loop guard mode against unguarded code."""
+    iterations = outer * (inner + 1)
+    source = LOOP_ALGORITHM.format(outer=outer, inner=inner)
+
+    print(f"Loop guards: {iterations} loop iterations per run")
+    compiled = {}
+    for mode in LOOP_GUARD_MODES:
+        compiler = FrenchAlgorithmCompiler(max_steps=10 ** 9, loop_guard=mode, cpu_time_limit=3600,
+                                           fast_locals=False)
+        compiled[mode] = compile(compiler.compile_to_module(source), "<algorithme>", "exec")
+
+    # The watchdog mode generates no guard code at all: run without a watchdog it is the reference
+    baseline = best_time(lambda: run_code(compiled[LOOP_GUARD_WATCHDOG]))
+    print(f"  {'no guard':<10} {baseline / iterations * 1e9:8.1f} ns/iteration")
+    for mode in LOOP_GUARD_MODES:
+        if mode == LOOP_GUARD_WATCHDOG:
+            elapsed = best_time(lambda: run_code(compiled[mode], CpuWatchdog(3600)))
+        else:
+            elapsed = best_time(lambda: run_code(compiled[mode]))
+        overhead = (elapsed - baseline) / iterations * 1e9
+        print(f"  {mode:<10} {elapsed / iterations * 1e9:8.1f} ns/iteration "
+              f"({overhead:+.1f} ns, {elapsed / baseline - 1:+.0%})")
+
+
+def run_with_inputs(code, values, runs):
+    """Run code several times, its Lire reading values and its Ecrire printing nothing."""
+    for _ in range(runs):
+        remaining = iter(values)
+        exec(code, {"input": lambda prompt="": next(remaining), "print": lambda *args, **kwargs: None})
+
+
+# Template of app_data -> the values its Lire read; chosen so the loops run long enough to measure
+FAST_LOCALS_TEMPLATES = {
+    # Consecutive Fibonacci numbers: the worst case of Euclid's algorithm, 90 iterations
+    "CalculPGCD": ["4660046610375530309", "7540113804746346429"],
+    "SommeN": ["500"] + ["7"] * 500,
+    "DecimalVersBinaire": [str(2 ** 62 - 1)],
+}
+
+
+def bench_fast_locals(runs=200):
+    """Variables as module globals against locals of the generated _algo_main() function."""
+    print(f"Fast locals: {runs} runs of each template")
+    for name, values in FAST_LOCALS_TEMPLATES.items():
+        timings = []
+        for fast_locals in (False, True):
+            compiler = FrenchAlgorithmCompiler(max_steps=10 ** 9, loop_guard=LOOP_GUARD_PER_LOOP,
+                                               cpu_time_limit=3600, fast_locals=fast_locals)
+            code = compile(compiler.compile_to_module(templates[name]), "<algorithme>", "exec")
+            timings.append(best_time(lambda: run_with_inputs(code, values, runs)))
+        globals_time, locals_time = timings
+        print(f"  {name:<20} globals {globals_time / runs * 1e6:8.1f} us/run, "
+              f"locals {locals_time / runs * 1e6:8.1f} us/run ({globals_time / locals_time:.2f}x faster)")
+
+
+def bench_code_generation(repeat=200):
+    """Generated syntax tree compiled directly against source text parsed again by compile()."""
+    print(f"Code generation: {repeat} compilations of each template")
+    compiler = FrenchAlgorithmCompiler(max_steps=1000, loop_guard=LOOP_GUARD_PER_LOOP, cpu_time_limit=3600,
+                                       fast_locals=True)
+
+    def from_tree():
+        for _ in range(repeat):
+            compile(compiler.compile_to_module(source), "<algorithme>", "exec")
+
+    def from_text():
+        for _ in range(repeat):
+            compile(compiler.compile_to_python(source), "<algorithme>", "exec")
+
+    for name in FAST_LOCALS_TEMPLATES:
+        source = templates[name]
+        tree_time = best_time(from_tree) / repeat
+        text_time = best_time(from_text) / repeat
+        # What a runner process does before running: compile the text, or load the marshalled code
+        python_code = compiler.compile_to_python(source)
+        data = marshal.dumps(compile(python_code, "<algorithme>", "exec"))
+        child_compile = best_time(lambda: [compile(python_code, "<algorithme>", "exec") for _ in range(repeat)])
+        child_load = best_time(lambda: [marshal.loads(data) for _ in range(repeat)])
+        print(f"  {name:<20} tree {tree_time * 1e6:7.1f} us, text {text_time * 1e6:7.1f} us; "
+              f"runner: load {child_load / repeat * 1e6:5.1f} us, compile {child_compile / repeat * 1e6:7.1f} us")
+
+
+def bench_front_end(lines=5000, baseline=None):
+    """
+    Checking and compiling a long algorithm, with the checker and the parser sharing one token list.
+
+    With baseline, the directory of a checkout of the original tree, the
+    same algorithm is also compiled by its checker and translator. The
+    original translator cannot compile "Si i mod 2 = 0", so both sides get
+    "==" there.
+    """
+    blocks = lines // FRONT_END_BLOCK.count("\n")
+    source = "Algorithme Long;\nVar\n    i, s: Entier;\nDebut\n    s <- 0;\n" + FRONT_END_BLOCK * blocks + "Fin\n"
+    lines = source.count("\n")
+    print(f"Front end: {lines} lines")
+    compiler = FrenchAlgorithmCompiler(max_steps=1000, loop_guard=LOOP_GUARD_PER_LOOP, cpu_time_limit=3600,
+                                       fast_locals=True)
+    # Tokenizing again for the parser, as when checking and compiling were separate
+    separate_time = best_time(lambda: (check(source), parse_program(tokenize(source))))
+    shared_time = best_time(lambda: analyze(source))
+    total_time = best_time(lambda: compile(compiler.compile_to_module(source, analyze(source).program),
+                                           "<algorithme>", "exec"))
+    print(f"  check + parse: separate {separate_time * 1e3:6.1f} ms, shared tokens {shared_time * 1e3:6.1f} ms")
+    print(f"  check + compile: {total_time * 1e3:6.1f} ms ({lines / total_time:,.0f} lines/s)")
+    if baseline is None:
+        return
+    source = source.replace("mod 2 = 0", "mod 2 == 0")
+    env = dict(os.environ, PYTHONPATH=baseline, QT_QPA_PLATFORM="offscreen")
+    completed = subprocess.run([sys.executable, "-c", BASELINE_FRONT_END], cwd=baseline, env=env, input=source,
+                               capture_output=True, text=True, check=True)
+    baseline_time = float(completed.stdout)
+    options = CompileOptions(max_steps=1000, fast_locals=True)
+    current_time = best_time(lambda: algo_compiler.compile(source, options))
+    print(f"  original check + compile: {baseline_time * 1e3:6.1f} ms, compile() now {current_time * 1e3:6.1f} ms "
+          f"({baseline_time / current_time:.2f}x)")
+
+
+def compile_outcome(source, options):
+    """Everything compile() returns, in a comparable form."""
+    result = algo_compiler.compile(source, options)
+    module = ast.dump(result.module, include_attributes=True) if result.module is not None else None
+    constants = {name: (constant_type, ast.dump(value)) for name, (constant_type, value) in result.constants.items()}
+    return (result.code is not None, module, result.diagnostics, str(result.error), dict(result.variables),
+            constants, result.needs_math_import, result.program_name)
+
+
+def bench_concurrent_compile(threads=8, rounds=10):
+    """
+    Stress test of algo_compiler.compile() from a thread pool.
+
+    Every template, also cut in half to exercise the error paths, is
+    compiled with several options by all the threads at once, in a different
+    order in each thread; every result must equal the one of a serial run.
+    """
+    sources = list(templates.values())
+    sources += ["\n".join(source.splitlines()[:len(source.splitlines()) // 2]) for source in sources]
+    jobs = [(source, CompileOptions(max_steps=max_steps, loop_guard=mode, fast_locals=fast_locals,
+                                    as_generator=as_generator, language=language))
+            for source in sources
+            for max_steps, mode, fast_locals, as_generator, language in (
+                (1000, LOOP_GUARD_PER_LOOP, True, False, "french"),
+                (50, LOOP_GUARD_MODES[1], False, False, "arabic"),
+                (10 ** 6, LOOP_GUARD_WATCHDOG, True, True, "french"))]
+    gil = "GIL disabled" if getattr(sys, "_is_gil_enabled", lambda: True)() is False else "GIL enabled"
+    print(f"Concurrent compile: {len(jobs)} compilations x {rounds} rounds in {threads} threads ({gil})")
+    expected = [compile_outcome(source, options) for source, options in jobs]
+
+    def worker(seed):
+        order = list(range(len(jobs)))
+        random.Random(seed).shuffle(order)
+        mismatches = 0
+        for _ in range(rounds):
+            for index in order:
+                if compile_outcome(*jobs[index]) != expected[index]:
+                    mismatches += 1
+        return mismatches
+
+    start = time.perf_counter()
+    mismatches = worker(0)
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        mismatches += sum(pool.map(worker, range(threads)))
+    pool_time = time.perf_counter() - start
+    compilations = len(jobs) * rounds
+    print(f"  1 thread  {compilations / serial_time:8.0f} compilations/s")
+    print(f"  {threads} threads {compilations * threads / pool_time:8.0f} compilations/s, {mismatches} mismatches")
+    if mismatches:
+        raise RuntimeError(f"{mismatches} concurrent compilations differ from the serial ones")
+    loaded = [name for name in sys.modules if name.startswith(("PyQt5", "tkinter"))]
+    if loaded:
+        raise RuntimeError("compiling imported " + ", ".join(loaded))
+
+
+def bench_core_imports():
+    """
+    Import time of each module of the core package, alone in a fresh interpreter.
+
+    Fails if one of them loads Qt or tkinter, or takes longer than
+    CORE_IMPORT_BUDGET_MS to import with everything it needs (the best of
+    a few tries, the interpreter's own start-up excluded).
+    """
+    # __main__ would run the command-line tool
+    modules = [f"algofx.{module.name}" for module in pkgutil.iter_modules(algofx.__path__) if module.name != "__main__"]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(algofx.__file__)))
+    print(f"Core imports: {len(modules)} modules (budget {CORE_IMPORT_BUDGET_MS} ms each)")
+    failures = []
+    for module in modules:
+        # -S: site-packages .pth files are not the core's import time
+        command = [sys.executable, "-S", "-X", "importtime", "-c", f"import {module}"]
+        elapsed = float("inf")
+        for _ in range(3):
+            process = subprocess.run(command, cwd=root, capture_output=True, text=True)
+            if process.returncode != 0:
+                raise RuntimeError(f"importing {module} failed:\n" + process.stderr)
+            imported = {}
+            for line in process.stderr.splitlines():
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():  # Not the header line
+                    imported[name.strip()] = int(cumulative) / 1000
+            # Cumulative: the package and every module it needs are counted in it
+            elapsed = min(elapsed, imported[module])
+        loaded = sorted(name for name in imported if name.split(".")[0] in GUI_MODULES)
+        print(f"  {module:<30} {elapsed:6.1f} ms" + (" imports " + ", ".join(loaded) if loaded else ""))
+        if loaded or elapsed > CORE_IMPORT_BUDGET_MS:
+            failures.append(module)
+    if failures:
+        raise RuntimeError("over the import budget or loading the GUI: " + ", ".join(failures))
+
+
+def bench_cli_startup(runs=20):
+    """Wall-clock time of the command-line tool on a small algorithm, against an empty interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(algofx.__file__)))
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".algo", delete=False) as f:
+        f.write(templates["CalculPGCD"])
+    try:
+        commands = {
+            "python -S -c pass": [sys.executable, "-S", "-c", "pass"],
+            "algofx check": [sys.executable, "-S", "-m", "algofx", "check", f.name],
+            "algofx run": [sys.executable, "-S", "-m", "algofx", "run", f.name],
+        }
+        print(f"Command-line tool: best of {runs} starts")
+        for name, command in commands.items():
+            elapsed = best_time(lambda: subprocess.run(command, cwd=root, input=b"12\n18\n", capture_output=True),
+                                repeat=runs)
+            print(f"  {name:<20} {elapsed * 1e3:6.1f} ms")
+    finally:
+        os.remove(f.name)
+
+
+def bench_batch_compile(files=1000):
+    """Files per second of the batch mode, compiling in this process and in worker pools."""
+    names = list(templates)
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(files):
+            source = templates[names[index % len(names)]]
+            if index % 7 == 0:
+                # Some submissions with errors, like in a real exam
+                source = "\n".join(source.splitlines()[:-3])
+            with open(os.path.join(directory, f"copie{index:04d}.algo"), "w", encoding="utf-8") as f:
+                f.write(source)
+        cpus = os.cpu_count() or 1
+        print(f"Batch compile: {files} files, {cpus} CPUs")
+        for workers in sorted({1, 2, cpus}):
+            start = time.perf_counter()
+            count = sum(1 for _ in compile_directory(directory, workers=workers))
+            elapsed = time.perf_counter() - start
+            print(f"  {workers:>3} workers {count / elapsed:8.0f} files/s")
+
+
+def bench_grading(submissions=300):
+    """Runs per second of the grading harness: the PGCD template and broken copies of it against 4 cases."""
+    expected = "Entrez le premier nombre:\nEntrez le deuxième nombre:\nLe PGCD est: {}\n"
+    suite = TestSuite([TestCase(f"pgcd_{a}_{b}", [str(a), str(b)], expected.format(gcd), 1, 1e-6, "lines")
+                       for a, b, gcd in ((12, 18, 6), (7, 5, 1), (100, 75, 25), (4660046610375530309,
+                                                                                  7540113804746346429, 1))],
+                      False)
+    source = templates["CalculPGCD"]
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(submissions):
+            # A third of wrong answers (off by a division), some that do not compile
+            variant = source.replace("a mod b", "a div b") if index % 3 == 1 else source
+            if index % 10 == 0:
+                variant = "\n".join(variant.splitlines()[:-2])
+            with open(os.path.join(directory, f"etudiant{index:04d}.algo"), "w", encoding="utf-8") as f:
+                f.write(variant)
+        cpus = os.cpu_count() or 1
+        print(f"Grading: {submissions} submissions x {len(suite.cases)} cases, {cpus} CPUs")
+        for workers in sorted({1, cpus}):
+            start = time.perf_counter()
+            runs = sum(case["status"] not in ("skipped", "compile_error")
+                       for report in grade_directory(directory, suite, workers=workers) for case in report["cases"])
+            elapsed = time.perf_counter() - start
+            print(f"  {workers:>3} workers {runs / elapsed:8.0f} runs/s ({runs / elapsed * 60:,.0f} runs/min)")
+
+
+def bench_zygote(runs=50):
+    """Time of an isolated run of the PGCD template: a new interpreter each time against a fork of the zygote."""
+    code = algo_compiler.compile(templates["CalculPGCD"]).code
+    zygote = Zygote()
+    zygote.start()
+
+    def run(zygote):
+        process = AlgorithmProcess(code, input_values=["12", "18"], zygote=zygote)
+        process.start()
+        output = "".join(value for kind, value in process.events() if kind == "output")
+        return output, process.status
+
+    try:
+        outputs = {"spawn": run(None), "fork": run(zygote)}
+        if outputs["spawn"] != outputs["fork"] or outputs["fork"][1] != {"done": True}:
+            raise AssertionError(f"the runs differ: {outputs}")
+        print(f"Isolated runs: best of {runs}")
+        spawn = best_time(lambda: run(None), repeat=runs)
+        fork = best_time(lambda: run(zygote), repeat=runs)
+        print(f"  spawn per run {spawn * 1e3:6.1f} ms")
+        print(f"  fork per run  {fork * 1e3:6.1f} ms ({spawn / fork:.1f}x)")
+    finally:
+        zygote.close()
+
+
+def bench_execution_pool(runs=2000):
+    """Runs per second of the PGCD template: one after the other in this process, then on each pool backend."""
+    code = algo_compiler.compile(templates["CalculPGCD"], CompileOptions(as_generator=True)).code
+    input_lists = [[str(12 * index), "18"] for index in range(1, runs + 1)]
+    expected = [run_headless(code, inputs)["output"] for inputs in input_lists]
+    cpus = os.cpu_count() or 1
+    print(f"Headless runs: {runs} runs, {cpus} CPUs")
+    start = time.perf_counter()
+    for inputs in input_lists:
+        run_headless(code, inputs)["output"]
+    print(f"  {'in process':<13} {runs / (time.perf_counter() - start):8.0f} runs/s")
+    for backend in (PROCESSES, INTERPRETERS):
+        if backend == INTERPRETERS and not subinterpreters_supported():
+            print(f"  {backend:<13} needs Python 3.12 or later")
+            continue
+        with ExecutionPool(cpus, backend) as pool:
+            # The workers start, and import the runtime, before the clock does
+            list(pool.map(code, input_lists[:cpus]))
+            start = time.perf_counter()
+            outputs = [result["output"] for result in pool.map(code, input_lists)]
+            elapsed = time.perf_counter() - start
+        if outputs != expected:
+            raise AssertionError(f"{backend}: the outputs differ from the runs in process")
+        print(f"  {backend:<13} {runs / elapsed:8.0f} runs/s")
+
+
+def bench_result_cache(submissions=100):
+    """Grading a cohort without the result cache, then cold, warm, and again after one test case changed."""
+    cases = [TestCase(f"premiers_{n}", [str(n)], f"{count}\n", 1, 1e-6, "lines")
+             for n, count in ((1000, 168), (2000, 303), (3000, 430), (5000, 669))]
+    options = CompileOptions(max_steps=10 ** 6)
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache_dir:
+        submissions_dir = os.path.join(directory, "copies")
+        os.mkdir(submissions_dir)
+        for index in range(submissions):
+            # Each submission compiles to its own code, as real ones do
+            variant = PRIMES_ALGORITHM.replace("compte <- 0;", f"compte <- n - n + {index} - {index};")
+            with open(os.path.join(submissions_dir, f"etudiant{index:04d}.algo"), "w", encoding="utf-8") as f:
+                f.write(variant)
+        cache = ResultCache(cache_dir)
+        changed = list(cases)
+        changed[1] = TestCase("premiers_100", ["100"], "25\n", 1, 1e-6, "lines")
+        grades = [("no cache", cases, None), ("cold cache", cases, cache), ("warm cache", cases, cache),
+                  ("1 case changed", changed, cache)]
+        print(f"Result cache: {submissions} submissions x {len(cases)} cases, 1 worker")
+        scores = {}
+        for name, suite_cases, result_cache in grades:
+            start = time.perf_counter()
+            reports = list(grade_directory(submissions_dir, TestSuite(suite_cases, False), options, workers=1,
+                                           result_cache=result_cache))
+            elapsed = time.perf_counter() - start
+            cached = sum(case["cached"] for report in reports for case in report["cases"])
+            scores[name] = sorted((report["student"], report["score"]) for report in reports)
+            print(f"  {name:<15} {elapsed * 1e3:8.1f} ms, {cached:>4} cached runs")
+        if len({points for report in scores["no cache"] for points in report[1:]}) != 1:
+            raise AssertionError("every submission should pass every case")
+        if scores["no cache"] != scores["cold cache"] or scores["cold cache"] != scores["warm cache"]:
+            raise AssertionError("the scores differ with the result cache")
+
+
+BENCHMARKS = {
+    "loop_guards": bench_loop_guards,
+    "fast_locals": bench_fast_locals,
+    "code_generation": bench_code_generation,
+    "front_end": bench_front_end,
+    "concurrent_compile": bench_concurrent_compile,
+    "core_imports": bench_core_imports,
+    "cli_startup": bench_cli_startup,
+    "batch_compile": bench_batch_compile,
+    "grading": bench_grading,
+    "zygote": bench_zygote,
+    "execution_pool": bench_execution_pool,
+    "result_cache": bench_result_cache,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help="benchmarks to run: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--baseline", metavar="DIR",
+                        help="checkout of the original tree to compare the front end against")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark: " + ", ".join(unknown))
+    for name in args.names or BENCHMARKS:
+        if name == "front_end":
+            bench_front_end(baseline=args.baseline)
+        else:
+            BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
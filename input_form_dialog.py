@@ -0,0 +1,96 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLabel, QLineEdit, QComboBox,
+                             QPushButton, QHBoxLayout)
+from PyQt5.QtCore import QSettings
+from input_dialog import InputDialog
+from algofx.input_form import validation_error
+
+TYPE_LABELS = {
+    "int": "entier",
+    "float": "réel",
+    "bool": "booléen",
+    "char": "caractère",
+    "str": "chaîne"
+}
+
+
+class InputFormDialog(QDialog):
+    """One form for all the variables of a Lire, each field checked against its declared type"""
+
+    def __init__(self, fields, parent=None):
+        """
+        Args:
+            fields: (name, type) pairs, type as in algo_codegen.TYPE_MAPPING values
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Input")
+        self.resize(340, 80 + 40 * len(fields))
+        self.fields = [tuple(field) for field in fields]
+
+        # Same theme as the single-value dialog
+        settings = QSettings("AlgoFX", "AlgoFX")
+        if settings.value("dark_mode", False, type=bool):
+            InputDialog.apply_dark_theme(self)
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+        form_layout = QFormLayout()
+        self.inputs = []
+        self.error_labels = []
+        for name, var_type in self.fields:
+            if var_type == "bool":
+                field = QComboBox()
+                field.addItems(["vrai", "faux"])
+            else:
+                field = QLineEdit()
+                if var_type == "char":
+                    field.setMaxLength(1)
+                field.setPlaceholderText(TYPE_LABELS.get(var_type, ""))
+                field.textChanged.connect(lambda _, index=len(self.inputs): self.error_labels[index].hide())
+            error_label = QLabel()
+            error_label.setStyleSheet("color: #d32f2f;")
+            error_label.hide()
+
+            field_layout = QVBoxLayout()
+            field_layout.setSpacing(2)
+            field_layout.addWidget(field)
+            field_layout.addWidget(error_label)
+            form_layout.addRow(f"{name} ({TYPE_LABELS.get(var_type, var_type)}) :", field_layout)
+            self.inputs.append(field)
+            self.error_labels.append(error_label)
+        self.layout.addLayout(form_layout)
+
+        button_layout = QHBoxLayout()
+        self.ok_button = QPushButton("OK")
+        self.ok_button.setDefault(True)
+        self.ok_button.clicked.connect(self.accept)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(self.cancel_button)
+        self.layout.addLayout(button_layout)
+
+        if self.inputs:
+            self.inputs[0].setFocus()
+
+    def accept(self):
+        """Close only when every value matches its type; otherwise show what is wrong"""
+        first_invalid = None
+        for (name, var_type), field, error_label, value in zip(
+                self.fields, self.inputs, self.error_labels, self.get_values()):
+            error = validation_error(value, var_type)
+            error_label.setText(error or "")
+            error_label.setVisible(error is not None)
+            if error is not None and first_invalid is None:
+                first_invalid = field
+        if first_invalid is not None:
+            first_invalid.setFocus()
+            return
+        super().accept()
+
+    def get_values(self):
+        """The typed values as text, in the order of the fields"""
+        return [field.currentText() if isinstance(field, QComboBox) else field.text()
+                for field in self.inputs]
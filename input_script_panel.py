@@ -0,0 +1,96 @@
+from PyQt5.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QCheckBox,
+                             QPlainTextEdit, QPushButton, QFileDialog, QMessageBox)
+from PyQt5.QtGui import QFont
+import os
+from algofx.input_script import parse_input_script, read_input_script, write_input_script
+
+
+class InputScriptPanel(QDockWidget):
+    """Dock where the user writes, loads or replays the inputs of the next run, see input_script"""
+
+    def __init__(self, parent=None):
+        super().__init__("Script d'entrées", parent)
+        self.parent = parent
+        # Needed by QMainWindow.saveState() to remember whether the panel is shown
+        self.setObjectName("input_script_panel")
+
+        widget = QWidget()
+        layout = QVBoxLayout()
+        widget.setLayout(layout)
+
+        self.enabled_checkbox = QCheckBox("Utiliser ces entrées pour Lire")
+        self.enabled_checkbox.setToolTip("Une valeur par ligne. Quand elles sont épuisées, "
+                                         "la saisie habituelle prend le relais.")
+        layout.addWidget(self.enabled_checkbox)
+
+        self.script_editor = QPlainTextEdit()
+        self.script_editor.setFont(QFont("Courier New", 12))
+        self.script_editor.setPlaceholderText("Une valeur par ligne, par exemple :\n5\n12\nBonjour")
+        # Typing a script means wanting to use it
+        self.script_editor.textChanged.connect(lambda: self.enabled_checkbox.setChecked(True))
+        layout.addWidget(self.script_editor)
+
+        button_layout = QHBoxLayout()
+        load_button = QPushButton("Charger...")
+        load_button.clicked.connect(self.load_file)
+        button_layout.addWidget(load_button)
+
+        save_button = QPushButton("Enregistrer...")
+        save_button.clicked.connect(self.save_file)
+        button_layout.addWidget(save_button)
+        layout.addLayout(button_layout)
+
+        replay_button = QPushButton("Rejouer la dernière exécution")
+        replay_button.setToolTip("Relance l'algorithme avec exactement les valeurs lues lors de la dernière exécution")
+        replay_button.clicked.connect(self.replay_last_run)
+        layout.addWidget(replay_button)
+
+        self.setWidget(widget)
+
+    def script_values(self):
+        """Values to feed to the next run, or None when the script is not used"""
+        if not self.enabled_checkbox.isChecked():
+            return None
+        return parse_input_script(self.script_editor.toPlainText())
+
+    def set_script_values(self, values):
+        self.script_editor.setPlainText("\n".join(values))
+        self.enabled_checkbox.setChecked(True)
+
+    def _default_folder(self):
+        algo_folder = os.path.join(os.path.expanduser("~"), "algorithmes")
+        if not os.path.exists(algo_folder):
+            os.makedirs(algo_folder)
+        return algo_folder
+
+    def load_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Charger un script d'entrées", self._default_folder(),
+            "Fichiers texte (*.txt);;Tous les fichiers (*)"
+        )
+        if file_path:
+            try:
+                self.set_script_values(read_input_script(file_path))
+            except Exception as e:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ouverture du fichier: {e}")
+
+    def save_file(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer le script d'entrées",
+            os.path.join(self._default_folder(), "entrees.txt"),
+            "Fichiers texte (*.txt);;Tous les fichiers (*)"
+        )
+        if file_path:
+            try:
+                write_input_script(file_path, parse_input_script(self.script_editor.toPlainText()))
+            except Exception as e:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement du fichier: {e}")
+
+    def replay_last_run(self):
+        """Run the algorithm again with the values recorded during the last run"""
+        values = getattr(self.parent, "last_run_inputs", None)
+        if values is None:
+            self.parent.statusBar().showMessage("Aucune exécution à rejouer")
+            return
+        self.set_script_values(values)
+        self.parent.run_algorithm()
@@ -1,6 +1,15 @@
 import sys
 import time
 import os
+
+# The frozen application runs algorithms in a copy of itself, see process_runner
+if __name__ == "__main__" and sys.argv[1:2] == ["--run-algorithm"]:
+    from algofx import process_runner
+    sys.exit(process_runner.child_main(sys.argv[2:]))
+if __name__ == "__main__" and sys.argv[1:2] == ["--algorithm-zygote"]:
+    from algofx import zygote
+    sys.exit(zygote.zygote_main(sys.argv[2:]))
+
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QProgressBar, QDesktopWidget
 )
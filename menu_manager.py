@@ -53,6 +53,10 @@ class MenuManager:
         save_as_action.triggered.connect(self.parent.save_file_as)
         file_menu.addAction(save_as_action)
         
+        save_output_action = QAction("Enregistrer la sortie", self.parent)
+        save_output_action.triggered.connect(self.parent.save_output_as)
+        file_menu.addAction(save_output_action)
+        
         file_menu.addSeparator()
         
         # Print action
@@ -130,6 +134,11 @@ class MenuManager:
         show_python_action = QAction("Afficher le code Python", self.parent)
         show_python_action.triggered.connect(self.parent.show_python_code)
         view_menu.addAction(show_python_action)
+        
+        # Show or hide the input script panel
+        input_script_action = self.parent.input_script_panel.toggleViewAction()
+        input_script_action.setText("Script d'entrées")
+        view_menu.addAction(input_script_action)
     
     def _create_tools_menu(self):
         """Create the Tools menu with compilation and execution options"""
@@ -144,6 +153,10 @@ class MenuManager:
         
         run_action.triggered.connect(self.parent.run_algorithm)
         tools_menu.addAction(run_action)
+        
+        stop_action = QAction("Arrêter l'exécution", self.parent)
+        stop_action.triggered.connect(self.parent.stop_algorithm)
+        tools_menu.addAction(stop_action)
     
     def create_templates_menu(self):
         """Create the Templates menu with available code templates"""
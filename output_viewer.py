@@ -0,0 +1,178 @@
+"""
+Execution output view that stays fast with very long outputs.
+
+OutputViewer is a QPlainTextEdit: its document is a list of plain text
+blocks and only the blocks on screen are laid out and painted, unlike the
+rich QTextEdit it replaces. The text itself is kept in an append-only list
+of the chunks as they were appended, with only a count of its lines and the
+length of the last one; the document mirrors the last max_display_lines
+lines (200,000 by default), so its size stays bounded whatever the
+algorithm prints. "Enregistrer la sortie" writes the chunk list to a file
+chunk by chunk, without building the whole output as one string.
+
+Colours are not stored per character: each change of colour is one
+(line, column, colour) run, and a syntax highlighter paints the runs of
+the blocks Qt asks for. Plain output has no run at all.
+"""
+from bisect import bisect_right
+
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QTextCursor
+from PyQt5.QtCore import pyqtSignal
+
+# Lines kept in the document; older ones are only in the chunk list (and saved files)
+DEFAULT_DISPLAY_LINES = 200000
+
+# Share of the display dropped at once when it is full, so trimming is rare
+_TRIM_SLACK = 0.1
+
+
+class ColorRunHighlighter(QSyntaxHighlighter):
+    """Paints the colour runs of an OutputViewer, one block at a time."""
+
+    def __init__(self, viewer):
+        super().__init__(viewer.document())
+        self.viewer = viewer
+        self._formats = {}
+
+    def format_for(self, color):
+        text_format = self._formats.get(color)
+        if text_format is None:
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            self._formats[color] = text_format
+        return text_format
+
+    def highlightBlock(self, text):
+        viewer = self.viewer
+        line = viewer.first_displayed_line() + self.currentBlock().blockNumber()
+        # Run in effect at the start of the line, then every run starting on it
+        index = max(bisect_right(viewer.run_starts, (line, 0)) - 1, 0)
+        runs = viewer.runs
+        while index < len(runs) and runs[index][0] <= line:
+            run_line, column, color = runs[index]
+            start = column if run_line == line else 0
+            index += 1
+            if index < len(runs) and runs[index][0] == line:
+                end = runs[index][1]
+            else:
+                end = len(text)
+            if color is not None and end > start:
+                self.setFormat(start, end - start, self.format_for(color))
+
+
+class OutputViewer(QPlainTextEdit):
+    """Read-only output console: an append-only chunk list mirrored by a document of at most max_display_lines."""
+
+    # Emitted by the context menu action, the main window asks for a file name
+    save_requested = pyqtSignal()
+
+    def __init__(self, parent=None, max_display_lines=DEFAULT_DISPLAY_LINES):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        # Not setMaximumBlockCount(): Qt would drop the old blocks one by one
+        self.max_display_lines = max_display_lines
+        self.highlighter = None
+        self._reset_store()
+
+    def _reset_store(self):
+        self.chunks = []
+        # Lines in the chunks (the last one possibly empty) and length of the last one
+        self.line_count = 1
+        self.column = 0
+        self.runs = []
+        self.run_starts = []
+        if self.highlighter is not None:
+            self.highlighter.setDocument(None)
+            self.highlighter = None
+
+    def first_displayed_line(self):
+        """Store line shown in the first block of the document."""
+        return self.line_count - self.document().blockCount()
+
+    def append_text(self, text, color=None):
+        """
+        Append text at the end of the output.
+
+        Args:
+            text: The text to append, possibly spanning many lines
+            color: Text colour, None for the default colour of the theme
+        """
+        if not text:
+            return
+        current_color = self.runs[-1][2] if self.runs else None
+        if color != current_color:
+            self.runs.append((self.line_count - 1, self.column, color))
+            self.run_starts.append((self.line_count - 1, self.column))
+            if self.highlighter is None:
+                self.highlighter = ColorRunHighlighter(self)
+
+        self.chunks.append(text)
+        newlines = text.count("\n")
+        self.line_count += newlines
+        if newlines:
+            self.column = len(text) - text.rindex("\n") - 1
+        else:
+            self.column += len(text)
+
+        # Only follow the output if the user has not scrolled up to read it
+        scroll_bar = self.verticalScrollBar()
+        follow = scroll_bar.value() >= scroll_bar.maximum()
+        document = self.document()
+        if newlines >= self.max_display_lines:
+            # The text alone fills the display: show its end only
+            document.clear()
+            text = "\n".join(text.split("\n")[-self.max_display_lines:])
+        elif document.blockCount() + newlines > self.max_display_lines:
+            self._trim(document.blockCount() + newlines - self.max_display_lines)
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if follow:
+            self.moveCursor(QTextCursor.End)
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def _trim(self, excess):
+        """Remove the first lines of the document in a single edit."""
+        count = excess + int(self.max_display_lines * _TRIM_SLACK)
+        document = self.document()
+        cursor = QTextCursor(document)
+        end = document.findBlockByNumber(count)
+        if end.isValid():
+            cursor.setPosition(end.position(), QTextCursor.KeepAnchor)
+        else:
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+
+    def append(self, text):
+        """QTextEdit compatible append: the text is a new paragraph, even after a line break."""
+        if self.chunks:
+            text = "\n" + text
+        self.append_text(text)
+
+    def clear(self):
+        self._reset_store()
+        super().clear()
+
+    def setPlainText(self, text):
+        self.clear()
+        self.append_text(text)
+
+    def iter_chunks(self):
+        """Iterate over the whole output, including the lines no longer displayed."""
+        return iter(self.chunks)
+
+    def save_to(self, file_path):
+        """Write the whole output to a UTF-8 file, one chunk at a time."""
+        with open(file_path, "w", encoding="utf-8", newline="") as file:
+            for chunk in self.chunks:
+                file.write(chunk)
+
+    def contextMenuEvent(self, event):
+        menu = self.createStandardContextMenu()
+        menu.addSeparator()
+        save_action = menu.addAction("Enregistrer toute la sortie...")
+        save_action.setEnabled(bool(self.chunks))
+        save_action.triggered.connect(self.save_requested.emit)
+        menu.exec_(event.globalPos())
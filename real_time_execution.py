@@ -1,37 +1,512 @@
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import QSettings
+from PyQt5.QtWidgets import QApplication, QMessageBox, QDialog
+from PyQt5.QtCore import Qt, QEvent, QObject, QSettings, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
+import builtins
 import sys
 import os
 import time
 import threading
 import subprocess
 import tempfile
+from algofx.execution_guard import (LOOP_GUARD_WATCHDOG, watchdog_preamble, error_line_preamble, raise_in_thread,
+                             generated_code_line, generated_code_span, error_status)
+from algofx.output_buffer import (OutputBuffer, OutputLimitExceeded, ExecutionResult,
+                           DEFAULT_MAX_OUTPUT_BYTES, DEFAULT_MAX_OUTPUT_LINES)
+from algofx import process_runner
+from algofx.process_runner import AlgorithmProcess, DEFAULT_MEMORY_LIMIT_MB
+from algofx.zygote import shared_zygote
+from algofx.input_script import InputScript, input_script_preamble
+from algofx.input_form import READ_VALUES_FUNCTION, input_prompt, convert_input
+from input_form_dialog import InputFormDialog
+from algofx.algorithm_driver import AlgorithmDriver
+
+# The GUI copies pending output into the output view once per frame (~60 per second)
+OUTPUT_FRAME_MS = 16
+
+# Characters the worker may get ahead of the GUI before print() blocks
+OUTPUT_QUEUE_CHARS = 256 * 1024
+
+# CPU time a GeneratorWorker step may take before it gives the event loop a turn;
+# the GUI's own timers only get every other turn, so this is about half a frame
+GENERATOR_SLICE_SECONDS = 0.008
+
+
+def interruption_status(line):
+    """Message written to the output when the user stops an algorithm at a given algorithm line."""
+    if line is None:
+        return "\n\n[Exécution interrompue par l'utilisateur]"
+    return f"\n\n[Exécution interrompue par l'utilisateur à la ligne {line}]"
+
+
+def input_script_values(main_window):
+    """Values of the input script panel for the next run, None when it is not used."""
+    panel = getattr(main_window, "input_script_panel", None)
+    return panel.script_values() if panel is not None else None
+
+
+class OutputQueue:
+    """Bounded queue of output text between the execution thread and the GUI thread.
+    
+    The worker appends text with put(); the GUI takes everything pending at
+    once with take_all(). When the GUI falls behind by more than max_chars,
+    put() blocks until the next frame has been drained.
+    """
+    def __init__(self, max_chars=OUTPUT_QUEUE_CHARS):
+        self.max_chars = max_chars
+        self._chunks = []
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        
+    def put(self, text):
+        with self._condition:
+            while self._size >= self.max_chars and not self._closed:
+                self._condition.wait()
+            self._chunks.append(text)
+            self._size += len(text)
+            
+    def take_all(self):
+        """Return all pending text as one string and wake up a blocked writer"""
+        with self._condition:
+            chunks = self._chunks
+            self._chunks = []
+            self._size = 0
+            self._condition.notify_all()
+        return "".join(chunks)
+    
+    def close(self):
+        """Stop applying back-pressure, so a stopping worker never blocks on output"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
 
 class RealTimeStream:
-    """Custom stream that sends output in real-time to a QTextEdit widget."""
-    def __init__(self, text_widget):
-        self.text_widget = text_widget
-        self.buffer = ""
+    """Output stream of a running algorithm, written from the execution thread.
+    
+    Text is kept in a bounded OutputBuffer and forwarded to the GUI through
+    the OutputQueue. The write that hits the buffer's cap raises
+    OutputLimitExceeded, which stops the algorithm.
+    """
+    def __init__(self, output_queue, output_buffer):
+        self.output_queue = output_queue
+        self.buffer = output_buffer
         
     def write(self, text):
-        from PyQt5.QtCore import QCoreApplication
-        
-        # Append text to the buffer
-        self.buffer += text
-        
-        # Use insertText instead of append to avoid extra line breaks
-        cursor = self.text_widget.textCursor()
-        cursor.movePosition(cursor.End)
-        cursor.insertText(text)
-        self.text_widget.setTextCursor(cursor)
-        
-        # Ensure UI updates immediately
-        QCoreApplication.processEvents()
+        stored = self.buffer.write(text)
+        if stored:
+            self.output_queue.put(stored)
+            if self.buffer.truncated:
+                raise OutputLimitExceeded(self.buffer.truncation_message)
         return len(text)
         
     def flush(self):
         pass
 
+class AlgorithmWorker(QThread):
+    """Runs a compiled algorithm away from the GUI thread.
+    
+    Output goes through an OutputQueue that the GUI drains on a timer. Calls
+    to input() emit input_requested and block until the GUI thread answers
+    with provide_input(). With input_form, a Lire of several variables emits
+    form_requested once and waits for provide_form().
+    """
+    input_requested = pyqtSignal(str)
+    form_requested = pyqtSignal(list)
+    
+    def __init__(self, code, compiler, parent=None, max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES,
+                 max_output_lines=DEFAULT_MAX_OUTPUT_LINES, input_values=None, input_form=False):
+        super().__init__(parent)
+        self.code = code
+        self.compiler = compiler
+        self.output_queue = OutputQueue()
+        self.output_buffer = OutputBuffer(max_output_bytes, max_output_lines)
+        self.stream = RealTimeStream(self.output_queue, self.output_buffer)
+        # "output" is joined from the buffer only if someone reads it
+        self.result = ExecutionResult(self.output_buffer)
+        self.interrupted = False
+        # Scripted values, taken before asking the GUI; every value read is recorded in result["inputs"]
+        self.input_script = InputScript(input_values or ())
+        self.result["inputs"] = self.input_script.recorded
+        self.input_form = input_form
+        self._input_replies = []
+        self._input_ready = threading.Condition()
+        self._thread_id = None
+        
+    def run(self):
+        self._thread_id = threading.get_ident()
+        # The algorithm gets its own namespace; print and input are resolved there first
+        namespace = {"__name__": "__main__", "print": self._print, "input": self._input,
+                     READ_VALUES_FUNCTION: self._read_values}
+        try:
+            if self.interrupted:
+                raise KeyboardInterrupt
+            with self.compiler.execution_guard():
+                exec(self.code, namespace)
+        except KeyboardInterrupt as e:
+            self.result["success"] = False
+            self.result["error"] = "Exécution interrompue par l'utilisateur"
+            self.result["line"] = generated_code_line(e.__traceback__)
+            self._write_status(interruption_status(self.result["line"]))
+        except OutputLimitExceeded as e:
+            # The buffer already ends with the "sortie tronquée" marker
+            self.result["success"] = False
+            self.result["error"] = str(e)
+        except Exception as e:
+            self.result["success"] = False
+            self.result["error"] = str(e)
+            self.result["span"] = generated_code_span(e.__traceback__)
+            self.result["line"] = self.result["span"].line if self.result["span"] else None
+            self._write_status(error_status(e, self.result["line"]))
+        finally:
+            self._thread_id = None
+        
+    def _write_status(self, text):
+        """Write a message about how the run ended; it never stops anything itself"""
+        try:
+            self.stream.write(text)
+        except OutputLimitExceeded:
+            pass
+        
+    def _print(self, *args, sep=" ", end="\n", file=None, flush=False):
+        builtins.print(*args, sep=sep, end=end, file=self.stream if file is None else file)
+        
+    def _input(self, prompt=""):
+        # Print the prompt to the output
+        self.stream.write(str(prompt))
+        
+        # A scripted value needs no round trip to the GUI thread
+        user_input = self.input_script.take()
+        if user_input is None:
+            # Ask the GUI thread and wait for its answer
+            self.input_requested.emit(str(prompt))
+            with self._input_ready:
+                while not self._input_replies:
+                    self._input_ready.wait()
+                user_input = self._input_replies.pop(0)
+        
+        # None means the dialog was cancelled or the execution stopped
+        if user_input is None:
+            raise KeyboardInterrupt("Exécution interrompue par l'utilisateur")
+        
+        self.input_script.record(user_input)
+        self.stream.write(user_input + "\n")  # Echo input in output
+        return user_input
+    
+    def _read_values(self, *fields):
+        """Lire of several variables, see input_form"""
+        if not self.input_form:
+            return [convert_input(self._input(input_prompt(name, var_type)), var_type)
+                    for name, var_type in fields]
+        answers = self.input_script.take_many(len(fields))
+        if len(answers) < len(fields):
+            # The values the script does not give, all in one form
+            self.form_requested.emit([list(field) for field in fields[len(answers):]])
+            with self._input_ready:
+                while not self._input_replies:
+                    self._input_ready.wait()
+                values = self._input_replies.pop(0)
+            if values is None:
+                raise KeyboardInterrupt("Exécution interrompue par l'utilisateur")
+            answers += values
+        for (name, var_type), value in zip(fields, answers):
+            self.input_script.record(value)
+            self.stream.write(input_prompt(name, var_type) + value + "\n")
+        return [convert_input(value, var_type) for (name, var_type), value in zip(fields, answers)]
+    
+    def provide_input(self, text):
+        """Answer a pending input() call, from the GUI thread; None cancels the execution"""
+        with self._input_ready:
+            self._input_replies.append(text)
+            self._input_ready.notify_all()
+    
+    def provide_form(self, values):
+        """Answer a form_requested signal with the text of each field; None cancels the execution"""
+        self.provide_input(values)
+            
+    def stop(self):
+        """Interrupt the algorithm: unblock input and output, then raise KeyboardInterrupt in it.
+        
+        The exception is delivered before the next bytecode, so a loop stops at
+        once; only a single long builtin call (a huge power for instance) is
+        interrupted when it returns. ProcessAlgorithmWorker has no such limit.
+        """
+        self.interrupted = True
+        self.output_queue.close()
+        self.provide_input(None)
+        thread_id = self._thread_id
+        if thread_id is not None:
+            raise_in_thread(thread_id, KeyboardInterrupt)
+
+class ProcessAlgorithmWorker(QThread):
+    """Runs an algorithm in a child process, see process_runner.
+    
+    Same interface as AlgorithmWorker: the thread only pumps the child's
+    pipes into the OutputQueue and forwards its input requests, so a crash
+    or an exhausted resource limit never reaches the IDE. stop() interrupts
+    the child, which reports the line it was running, and kills it if it has
+    not exited within process_runner.INTERRUPT_GRACE_SECONDS.
+    """
+    input_requested = pyqtSignal(str)
+    form_requested = pyqtSignal(list)
+    
+    def __init__(self, code, compiler, parent=None, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                 max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES, max_output_lines=DEFAULT_MAX_OUTPUT_LINES,
+                 input_values=None, input_form=False):
+        super().__init__(parent)
+        # The child takes the scripted values itself and reports each one it reads
+        self.process = AlgorithmProcess(code, compiler.cpu_time_limit, memory_limit_mb,
+                                        input_values or (), input_form)
+        self.output_queue = OutputQueue()
+        self.output_buffer = OutputBuffer(max_output_bytes, max_output_lines)
+        self.stream = RealTimeStream(self.output_queue, self.output_buffer)
+        self.result = ExecutionResult(self.output_buffer)
+        self.result["inputs"] = []
+        self.interrupted = False
+        
+    def run(self):
+        try:
+            # Forked from the zygote, started here on the first run rather than in the GUI thread
+            self.process.zygote = shared_zygote()
+            self.process.start()
+        except OSError as e:
+            self.result["success"] = False
+            self.result["error"] = str(e)
+            self._write_status(f"\nError: {str(e)}")
+            return
+        if self.interrupted:
+            self.process.kill()
+        truncated = None
+        for kind, value in self.process.events():
+            if kind == "output":
+                try:
+                    self.stream.write(value)
+                except OutputLimitExceeded as e:
+                    truncated = e
+                    self.process.kill()
+            elif "answer" in value:
+                self.result["inputs"].append(value["answer"])
+            elif "input" in value:
+                self.input_requested.emit(value["input"])
+            elif "form" in value:
+                self.form_requested.emit(value["form"])
+        
+        if truncated is not None:
+            # The buffer already ends with the "sortie tronquée" marker
+            self.result["success"] = False
+            self.result["error"] = str(truncated)
+            return
+        error = self.process.error_message()
+        if error is None:
+            return
+        status = self.process.status or {}
+        self.result["success"] = False
+        self.result["error"] = error
+        self.result["line"] = status.get("line")
+        if self.interrupted or status.get("interrupted"):
+            self._write_status(interruption_status(self.result["line"]))
+        else:
+            self.result["span"] = status.get("span")
+            self._write_status(error_status(error, self.result["line"]))
+        
+    def _write_status(self, text):
+        try:
+            self.stream.write(text)
+        except OutputLimitExceeded:
+            pass
+    
+    def provide_input(self, text):
+        """Answer a pending input() call, from the GUI thread; None cancels the execution"""
+        if text is not None:
+            self.result["inputs"].append(text)
+        self.process.send_input(text)
+    
+    def provide_form(self, values):
+        """Answer a form_requested signal with the text of each field; None cancels the execution"""
+        if values is not None:
+            self.result["inputs"].extend(values)
+        self.process.send_form(values)
+            
+    def stop(self):
+        """Interrupt the child process; run() then ends as soon as its pipes are closed"""
+        self.interrupted = True
+        self.output_queue.close()
+        self.process.interrupt()
+
+class GeneratorWorker(QObject):
+    """Runs an algorithm compiled as a generator on the GUI thread, see algorithm_driver.
+    
+    Same interface as AlgorithmWorker, without any thread: each step runs the
+    algorithm for at most GENERATOR_SLICE_SECONDS and schedules the next one
+    on the event loop, which paints and handles the user's events in between.
+    A Lire only emits its request and the algorithm is resumed when the answer
+    arrives, so nothing ever waits. stop() applies at the current pause, hence
+    at once. A single long builtin call (a huge power for instance) freezes
+    the window until it returns; ProcessAlgorithmWorker has no such limit.
+    """
+    input_requested = pyqtSignal(str)
+    form_requested = pyqtSignal(list)
+    finished = pyqtSignal()
+    
+    def __init__(self, code, compiler, parent=None, max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES,
+                 max_output_lines=DEFAULT_MAX_OUTPUT_LINES, input_values=None, input_form=False):
+        super().__init__(parent)
+        self.code = code
+        self.cpu_time_limit = compiler.cpu_time_limit
+        # Filled and drained on the same thread: print() must never wait for it
+        self.output_queue = OutputQueue(max_chars=float("inf"))
+        self.output_buffer = OutputBuffer(max_output_bytes, max_output_lines)
+        self.stream = RealTimeStream(self.output_queue, self.output_buffer)
+        self.result = ExecutionResult(self.output_buffer)
+        self.input_script = InputScript(input_values or ())
+        self.result["inputs"] = self.input_script.recorded
+        self.input_form = input_form
+        self.interrupted = False
+        self.driver = None
+        self._running = False
+        # Fields of the pending Lire still to be asked, and the texts answered so far
+        self._fields = []
+        self._answers = []
+        
+    def start(self):
+        self._running = True
+        QTimer.singleShot(0, self._step)
+        
+    def isRunning(self):
+        return self._running
+    
+    def wait(self, msecs=None):
+        """Nothing to wait for: the algorithm only runs when the event loop gives it a step"""
+        return True
+        
+    def _step(self, answers=None):
+        if not self._running:
+            return
+        try:
+            if self.driver is None:
+                namespace = {"__name__": "__main__", "print": self._print}
+                self.driver = AlgorithmDriver(self.code, namespace, self.cpu_time_limit)
+                request = self.driver.resume(time_slice=GENERATOR_SLICE_SECONDS)
+            elif answers is not None:
+                request = self.driver.answer(answers, GENERATOR_SLICE_SECONDS)
+            else:
+                request = self.driver.resume(time_slice=GENERATOR_SLICE_SECONDS)
+        except OutputLimitExceeded as e:
+            # The buffer already ends with the "sortie tronquée" marker
+            self.result["success"] = False
+            self.result["error"] = str(e)
+            self._finish()
+            return
+        except Exception as e:
+            self.result["success"] = False
+            self.result["error"] = str(e)
+            self.result["span"] = generated_code_span(e.__traceback__)
+            self.result["line"] = self.result["span"].line if self.result["span"] else None
+            self._write_status(error_status(e, self.result["line"]))
+            self._finish()
+            return
+        if self.driver.finished:
+            self._finish()
+        elif request is None:
+            # Paused in a loop: let the event loop run, then go on
+            QTimer.singleShot(0, self._step)
+        else:
+            self._read(request)
+            
+    def _read(self, fields):
+        """Collect the values of a Lire: scripted ones first, then a form or one request per field"""
+        answers = self.input_script.take_many(len(fields))
+        for (name, var_type), value in zip(fields, answers):
+            self.input_script.record(value)
+            if not self._echo(input_prompt(name, var_type) + value + "\n"):
+                return
+        self._answers = answers
+        self._fields = list(fields[len(answers):])
+        if not self._fields:
+            QTimer.singleShot(0, lambda: self._step(answers))
+        elif self.input_form and len(self._fields) > 1:
+            self.form_requested.emit([list(field) for field in self._fields])
+        else:
+            self._ask_next()
+            
+    def _ask_next(self):
+        prompt = input_prompt(*self._fields[0])
+        if self._echo(prompt):
+            self.input_requested.emit(prompt)
+        
+    def _echo(self, text):
+        """Write a prompt or an answer; False if the output cap stopped the run"""
+        try:
+            self.stream.write(text)
+            return True
+        except OutputLimitExceeded as e:
+            self.driver.close()
+            self.result["success"] = False
+            self.result["error"] = str(e)
+            self._finish()
+            return False
+        
+    def _print(self, *args, sep=" ", end="\n", file=None, flush=False):
+        builtins.print(*args, sep=sep, end=end, file=self.stream if file is None else file)
+        
+    def _write_status(self, text):
+        try:
+            self.stream.write(text)
+        except OutputLimitExceeded:
+            pass
+    
+    def provide_input(self, text):
+        """Answer the pending input request; None cancels the execution"""
+        if not self._running:
+            return
+        if text is None:
+            self._interrupt()
+            return
+        self._fields.pop(0)
+        self.input_script.record(text)
+        if not self._echo(text + "\n"):
+            return
+        self._answers.append(text)
+        if self._fields:
+            self._ask_next()
+        else:
+            answers = self._answers
+            QTimer.singleShot(0, lambda: self._step(answers))
+    
+    def provide_form(self, values):
+        """Answer a form_requested signal with the text of each field; None cancels the execution"""
+        if not self._running:
+            return
+        if values is None:
+            self._interrupt()
+            return
+        for (name, var_type), value in zip(self._fields, values):
+            self.input_script.record(value)
+            if not self._echo(input_prompt(name, var_type) + value + "\n"):
+                return
+        self._fields = []
+        answers = self._answers + list(values)
+        QTimer.singleShot(0, lambda: self._step(answers))
+        
+    def _interrupt(self):
+        line = self.driver.close() if self.driver is not None else None
+        self.result["success"] = False
+        self.result["error"] = "Exécution interrompue par l'utilisateur"
+        self.result["line"] = line
+        self._write_status(interruption_status(self.result["line"]))
+        self._finish()
+            
+    def stop(self):
+        """Stop the algorithm at the pause it is in"""
+        if not self._running:
+            return
+        self.interrupted = True
+        self._interrupt()
+        
+    def _finish(self):
+        if self._running:
+            self._running = False
+            self.finished.emit()
+
 def patched_execute(self, python_code):
     """Execute the generated Python code with support for real console execution"""
     import sys
@@ -54,13 +529,13 @@ def patched_execute(self, python_code):
     
     # Check input type setting
     settings = QSettings("AlgoFX", "AlgoFX")
-    input_type = settings.value("input_type", 1, type=int)  # 1 = Console, 2 = Dialog
+    input_type = settings.value("input_type", 1, type=int)  # 1 = Console, 2 = Dialog, 3 = Output tab
     
     # OPTION 1: Real console execution
     if input_type == 1:  # Console
         return execute_in_real_console(python_code, main_window)
     
-    # OPTION 2: In-app dialog execution
+    # OPTION 2: In-app execution, input in a dialog or in the output tab
     else:  # Dialog
         return execute_with_dialog(python_code, main_window)
 
@@ -69,7 +544,20 @@ def execute_in_real_console(python_code, main_window):
     # First create a temporary Python file with the code
     with tempfile.NamedTemporaryFile(suffix='.py', delete=False, mode='w', encoding='utf-8') as temp_file:
         temp_file_path = temp_file.name
-        # Write the Python code to execute
+        preamble = ""
+        # Without loop counters in the code, the script arms its own CPU watchdog
+        if main_window.compiler.loop_guard == LOOP_GUARD_WATCHDOG:
+            preamble += watchdog_preamble(main_window.compiler.cpu_time_limit)
+        # Scripted inputs first, then the terminal; the values typed there cannot be recorded
+        input_values = input_script_values(main_window)
+        if input_values:
+            preamble += input_script_preamble(input_values)
+        # The Python code to execute, unparsed from the compiled syntax tree; its
+        # source map lets an uncaught error name the algorithm line
+        if not isinstance(python_code, str):
+            python_code = main_window.compiler.python_source()
+            preamble += error_line_preamble(main_window.compiler.source_map, preamble.count("\n"))
+        temp_file.write(preamble)
         temp_file.write(python_code)
     
     # Create different wrapper scripts based on the platform
@@ -157,26 +645,8 @@ read -n 1 -s
     
     return result
 
-def execute_with_dialog(python_code, main_window):
-    """Execute Python code in the app with dialog input"""
-    import sys
-    import time
-    import threading
-    
-    # Clear the output view before execution
-    main_window.output_viewer.clear()
-    
-    # Create our real-time output stream
-    real_time_stream = RealTimeStream(main_window.output_viewer)
-    
-    # Redirect stdout to our real-time stream
-    old_stdout = sys.stdout
-    sys.stdout = real_time_stream
-    
-    # Store the original input function
-    original_input = __builtins__["input"]
-    
-    # Import or create InputDialog class
+def load_input_dialog_class():
+    """Import or create the InputDialog class"""
     try:
         # First check if we can import directly
         from input_dialog import InputDialog
@@ -184,7 +654,6 @@ def execute_with_dialog(python_code, main_window):
         # If not, try to find and import it from the current directory
         try:
             import importlib.util
-            import os
             spec = importlib.util.spec_from_file_location("input_dialog", 
                                                          os.path.join(os.path.dirname(__file__), "input_dialog.py"))
             input_dialog_module = importlib.util.module_from_spec(spec)
@@ -218,75 +687,168 @@ def execute_with_dialog(python_code, main_window):
                     
                 def get_input(self):
                     return self.input_field.text()
+    return InputDialog
+
+def execute_with_dialog(python_code, main_window):
+    """
+    Execute Python code in the app with dialog input.
     
-    # Custom input function for dialog input
-    def dialog_style_input(prompt=""):
-        # Check if execution should stop
-        if not main_window.is_executing:
-            raise KeyboardInterrupt("Exécution interrompue par l'utilisateur")
-            
-        # Print the prompt to the output
-        print(prompt, end="")
-        
-        # Create input dialog and show it
-        dialog = InputDialog(prompt, main_window)
-        result = dialog.exec_()
-        
-        # If dialog was rejected (Cancel button or closed), stop execution
-        if result != dialog.Accepted:
+    The algorithm runs on an AlgorithmWorker thread, in a child process or
+    in steps on the event loop (GeneratorWorker), so the window stays
+    responsive. This function returns as soon as the worker has started;
+    the returned result is marked "running" and is completed in place when
+    the worker finishes. Input dialogs are opened without a nested event
+    loop: the answer is handed to the worker when the dialog closes.
+    """
+    InputDialog = load_input_dialog_class()
+    
+    # Clear the output view before execution
+    output_viewer = main_window.output_viewer
+    output_viewer.clear()
+    
+    settings = QSettings("AlgoFX", "AlgoFX")
+    output_limits = dict(
+        max_output_bytes=settings.value("output_max_kb", DEFAULT_MAX_OUTPUT_BYTES // 1024, type=int) * 1024,
+        max_output_lines=settings.value("output_max_lines", DEFAULT_MAX_OUTPUT_LINES, type=int))
+    input_values = input_script_values(main_window)
+    # A Lire of several variables asks for them in one form, in dialog mode only
+    input_type = settings.value("input_type", 1, type=int)
+    input_form = input_type == 2
+    code = main_window.compiler.code_for(python_code)
+    generator_code = None
+    if settings.value("generator_execution", False, type=bool):
+        generator_code = main_window.compiler.generator_code(code)
+    if generator_code is not None:
+        # No thread at all: the algorithm runs in short steps between the GUI's events
+        worker = GeneratorWorker(generator_code, main_window.compiler, main_window,
+                                 input_values=input_values, input_form=input_form, **output_limits)
+    elif process_runner.is_supported() and settings.value("isolated_execution", True, type=bool):
+        # Separate process: memory and CPU limits, a crash cannot take the IDE down
+        worker = ProcessAlgorithmWorker(
+            code, main_window.compiler, main_window,
+            memory_limit_mb=settings.value("algorithm_memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB, type=int),
+            input_values=input_values, input_form=input_form, **output_limits)
+    else:
+        worker = AlgorithmWorker(code, main_window.compiler,
+                                 main_window, input_values=input_values, input_form=input_form,
+                                 **output_limits)
+    result = worker.result
+    result["running"] = True
+    
+    # Answers typed in the output tab itself instead of a dialog
+    console_input = None
+    if input_type == 3:
+        console_input = ConsoleInput(output_viewer)
+    # Dialog waiting for an answer, closed if the run ends first
+    pending = {"dialog": None}
+    
+    def flush_output():
+        """Copy everything the worker printed since the last frame into the output view, in one insert"""
+        text = worker.output_queue.take_all()
+        if text:
+            output_viewer.append_text(text)
+    
+    def deliver(provide, answer):
+        """Hand the user's answer to the worker; None (Cancel, Escape, closed) stops the execution"""
+        pending["dialog"] = None
+        if not result["running"]:
+            return
+        if worker.isRunning():
+            frame_timer.start()
+        if answer is None or not main_window.is_executing:
             main_window.is_executing = False
-            raise KeyboardInterrupt("Exécution interrompue par l'utilisateur")
-            
-        user_input = dialog.get_input()
-            
-        # Check again if execution was stopped while dialog was open
-        if not main_window.is_executing:
-            raise KeyboardInterrupt("Exécution interrompue par l'utilisateur")
-            
-        print(user_input)  # Echo input in output
-        return user_input
+            provide(None)
+            return
+        provide(answer)
     
-    # Use dialog-style input
-    __builtins__["input"] = dialog_style_input
+    def show_dialog(dialog, get_answer, provide):
+        # open() shows the dialog window-modal and returns at once, unlike exec_()
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.finished.connect(
+            lambda code: deliver(provide, get_answer() if code == QDialog.Accepted else None))
+        pending["dialog"] = dialog
+        dialog.open()
     
-    # Function to periodically check if execution should be stopped
-    def check_stop_execution():
-        while main_window.is_executing:
-            if not main_window.is_executing:
-                break
-            time.sleep(0.1)  # Check every 100ms
+    def ask_input(prompt):
+        """Runs on the GUI thread when the algorithm calls input()"""
+        # Make sure the prompt and everything before it is visible
+        flush_output()
+        
+        # Check if execution should stop
+        if not main_window.is_executing:
+            worker.provide_input(None)
+            return
+        
+        # Nothing to draw while the algorithm waits: no timer wakes the GUI up
+        frame_timer.stop()
+        if console_input is not None:
+            # The prompt is already at the end of the output
+            console_input.request_input(lambda text: deliver(worker.provide_input, text))
+        else:
+            dialog = InputDialog(prompt, main_window)
+            show_dialog(dialog, dialog.get_input, worker.provide_input)
     
-    # Start a monitoring thread
-    stop_checker = threading.Thread(target=check_stop_execution)
-    stop_checker.daemon = True
-    stop_checker.start()
+    def ask_form(fields):
+        """Runs on the GUI thread when a Lire reads several variables"""
+        flush_output()
+        if not main_window.is_executing:
+            worker.provide_form(None)
+            return
+        frame_timer.stop()
+        dialog = InputFormDialog(fields, main_window)
+        show_dialog(dialog, dialog.get_values, worker.provide_form)
     
-    # Execute code
-    result = {"success": True, "output": "", "error": ""}
-    try:
-        # Execute the Python code
-        exec(python_code)
-        result["output"] = real_time_stream.buffer
-    except KeyboardInterrupt:
-        result["success"] = False
-        result["error"] = "Exécution interrompue par l'utilisateur"
-        main_window.output_viewer.append("\n\n[Exécution interrompue par l'utilisateur]")
-    except Exception as e:
-        result["success"] = False
-        result["error"] = str(e)
-        # Show the error in the output view
-        main_window.output_viewer.append(f"\nError: {str(e)}")
-    finally:
-        # Restore stdout and the original input function
-        sys.stdout = old_stdout
-        __builtins__["input"] = original_input
+    def on_finished():
+        frame_timer.stop()
+        result["running"] = False
+        # An answer nobody waits for any more; a half-typed one leaves the output first
+        if pending["dialog"] is not None:
+            pending["dialog"].reject()
+        if console_input is not None:
+            console_input.cancel()
+        flush_output()
+        # Kept for "Rejouer la dernière exécution"
+        main_window.last_run_inputs = list(result["inputs"])
         
         # Make sure the output viewer is read-only again
-        main_window.output_viewer.setReadOnly(True)
+        output_viewer.setReadOnly(True)
         
         # Ensure execution flag is reset
         main_window.is_executing = False
+        if getattr(main_window, "execution_worker", None) is worker:
+            main_window.execution_worker = None
+        if worker.result.output_buffer.truncated:
+            main_window.statusBar().showMessage("Exécution arrêtée : sortie tronquée")
+        elif worker.interrupted:
+            line = result.get("line")
+            main_window.statusBar().showMessage(
+                "Exécution interrompue" + (f" à la ligne {line}" if line is not None else ""))
+        elif result["success"]:
+            main_window.statusBar().showMessage("Exécution réussie")
+        else:
+            line = result.get("line")
+            main_window.statusBar().showMessage(
+                "Erreur d'exécution" + (f" à la ligne {line}" if line is not None else ""))
+            # Show where it failed, down to the expression when the columns are known
+            if result.get("span"):
+                main_window.algorithm_compiler.highlight_algorithm_span(*result["span"])
     
+    frame_timer = QTimer(main_window)
+    frame_timer.setInterval(OUTPUT_FRAME_MS)
+    frame_timer.timeout.connect(flush_output)
+    
+    # Signals emitted by the worker are delivered on the GUI thread (queued connections,
+    # direct ones for a GeneratorWorker, which lives there)
+    worker.input_requested.connect(ask_input)
+    worker.form_requested.connect(ask_form)
+    worker.finished.connect(on_finished)
+    worker.finished.connect(worker.deleteLater)
+    worker.finished.connect(frame_timer.deleteLater)
+    
+    main_window.execution_worker = worker
+    main_window.is_executing = True
+    frame_timer.start()
+    worker.start()
     return result
 
 def patch_real_time_execution():
@@ -298,105 +860,84 @@ def patch_real_time_execution():
     FrenchAlgorithmCompiler.execute = patched_execute
     return True
 
-class ConsoleInput:
-    """Handles console-style input in the output tab"""
+class ConsoleInput(QObject):
+    """Handles console-style input in the output tab
+    
+    request_input() lets the user type at the end of the output widget and
+    returns at once; the callback receives the line when Enter is pressed,
+    or None on Escape or cancel(). Nothing waits in between: no nested event
+    loop, no timer, no CPU used while the user types.
+    """
     def __init__(self, output_widget):
+        super().__init__(output_widget)
         self.output_widget = output_widget
-        self.input_buffer = ""
-        self.input_ready = False
-        self.current_prompt = ""
-        
-        # Connect to key press events of the output widget
-        self.output_widget.keyPressEvent = self.handle_key_press
-        # Make output widget editable temporarily when input is requested
-        self.output_widget.setReadOnly(False)
-        
-    def handle_key_press(self, event):
-        """Custom key press handler for the output widget"""
-        from PyQt5.QtCore import Qt
-        from PyQt5.QtWidgets import QTextEdit
-        
-        # Only process keys if we're waiting for input
-        if not self.input_ready:
-            # Pass the event to the parent class
-            QTextEdit.keyPressEvent(self.output_widget, event)
-            return
-            
-        # Get cursor position
-        cursor = self.output_widget.textCursor()
+        # Document position where the answer starts, after the prompt
+        self.input_start = 0
+        self._callback = None
         
-        # Check if Enter/Return key is pressed
-        if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
-            # Extract the text from the current line
-            cursor.movePosition(cursor.EndOfLine)
-            self.input_buffer = self.get_current_line().strip()
-            
-            # Move to the next line
-            cursor.insertText("\n")
-            self.output_widget.setTextCursor(cursor)
-            
-            # Signal that input is complete
-            self.input_ready = False
-            self.output_widget.setReadOnly(True)
-            
-        # Handle backspace only if we're in the input area
-        elif event.key() == Qt.Key_Backspace:
-            # Check if we're past the prompt position
-            line = self.get_current_line()
-            if len(line) > len(self.current_prompt):
-                # Allow backspace
-                QTextEdit.keyPressEvent(self.output_widget, event)
-            
-        # Regular character input - only allow if we're in the input zone
-        elif event.text():
-            # Only allow typing at the end of the document
-            cursor.movePosition(cursor.End)
-            self.output_widget.setTextCursor(cursor)
-            QTextEdit.keyPressEvent(self.output_widget, event)
-            
-        # Other keys (navigation, etc.)
-        else:
-            QTextEdit.keyPressEvent(self.output_widget, event)
-    
-    def get_current_line(self):
-        """Get the text in the current line"""
-        cursor = self.output_widget.textCursor()
-        cursor.movePosition(cursor.StartOfLine)
-        end_cursor = self.output_widget.textCursor()
-        end_cursor.movePosition(end_cursor.EndOfLine)
-        return self.output_widget.toPlainText()[cursor.position():end_cursor.position()]
-    
-    def get_input(self, prompt=""):
-        """Get input from the user with a prompt"""
-        from PyQt5.QtCore import QEventLoop, QCoreApplication
+    def request_input(self, callback, prompt=""):
+        """Let the user type an answer after the prompt (which may already be in the output)"""
+        widget = self.output_widget
+        cursor = widget.textCursor()
+        if prompt:
+            # Through the chunk list of the output, like everything else shown before the answer
+            widget.append_text(prompt)
+        cursor.movePosition(QTextCursor.End)
+        self.input_start = cursor.position()
+        widget.setTextCursor(cursor)
         
-        # Store the prompt
-        self.current_prompt = prompt
+        # Allow editing at the end of the output until Enter is pressed
+        self._callback = callback
+        widget.setReadOnly(False)
+        widget.setFocus()
+        widget.installEventFilter(self)
+    
+    def cancel(self):
+        """Stop waiting; the callback receives None"""
+        self._finish(None)
         
-        # Display the prompt in the output widget
+    def _finish(self, text):
+        callback = self._callback
+        if callback is None:
+            return
+        self._callback = None
+        self.output_widget.removeEventFilter(self)
+        if text is None:
+            # A cancelled answer is not part of the output either
+            self._take_answer()
+        self.output_widget.setReadOnly(True)
+        callback(text)
+    
+    def _take_answer(self):
+        """Remove what the user typed after input_start from the output widget and return it"""
         cursor = self.output_widget.textCursor()
-        cursor.movePosition(cursor.End)
-        cursor.insertText(prompt)
-        self.output_widget.setTextCursor(cursor)
-        
-        # Allow editing and set flag that we're waiting for input
-        self.output_widget.setReadOnly(False)
-        self.input_ready = True
-        
-        # Create an event loop to wait for input
-        loop = QEventLoop()
-        
-        # Function to check if input is ready
-        def check_input():
-            if not self.input_ready:
-                loop.quit()
-                return True
+        cursor.movePosition(QTextCursor.End)
+        # The output may have been cleared since request_input()
+        cursor.setPosition(min(self.input_start, cursor.position()), QTextCursor.KeepAnchor)
+        # Pasted line breaks come back as paragraph separators
+        text = cursor.selectedText().replace("\u2029", " ")
+        # The document only mirrors the appended output: the running algorithm echoes the answer itself
+        cursor.removeSelectedText()
+        return text
+        
+    def eventFilter(self, obj, event):
+        if event.type() != QEvent.KeyPress:
             return False
+        widget = self.output_widget
+        cursor = widget.textCursor()
+        key = event.key()
         
-        # Check periodically if input is ready
-        while self.input_ready:
-            QCoreApplication.processEvents()
-            if check_input():
-                break
+        if key in (Qt.Key_Return, Qt.Key_Enter):
+            self._finish(self._take_answer())
+            return True
+        if key == Qt.Key_Escape:
+            self.cancel()
+            return True
         
-        return self.input_buffer
\ No newline at end of file
+        # Never edit the output before the answer
+        if event.text() and min(cursor.position(), cursor.anchor()) < self.input_start:
+            cursor.movePosition(QTextCursor.End)
+            widget.setTextCursor(cursor)
+        if key == Qt.Key_Backspace and not cursor.hasSelection() and cursor.position() <= self.input_start:
+            return True
+        return False
@@ -6,6 +6,10 @@ from PyQt5.QtGui import QFont, QPalette, QColor
 import os
 import sys
 from settings_manager import SettingsManager
+from algofx.output_buffer import DEFAULT_MAX_OUTPUT_BYTES, DEFAULT_MAX_OUTPUT_LINES
+from algofx import process_runner
+from algofx.process_runner import DEFAULT_MEMORY_LIMIT_MB
+from algofx.execution_guard import LOOP_GUARD_PER_LOOP, LOOP_GUARD_GLOBAL, LOOP_GUARD_WATCHDOG, DEFAULT_CPU_TIME_LIMIT
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -121,6 +125,64 @@ class SettingsDialog(QDialog):
         self.exec_steps.setRange(100, 100000)
         self.exec_steps.setValue(self.settings.value("algorithm_execution_steps", 1000, type=int))
         exec_steps_layout.addRow("Nombre maximal d'itérations par boucle:", self.exec_steps)
+        
+        # Infinite loop protection strategy, see execution_guard
+        self.loop_guard_combo = QComboBox()
+        self.loop_guard_combo.addItem("Compteur par boucle", LOOP_GUARD_PER_LOOP)
+        self.loop_guard_combo.addItem("Compteur global (toutes les boucles)", LOOP_GUARD_GLOBAL)
+        self.loop_guard_combo.addItem("Aucun compteur, limite de temps de calcul", LOOP_GUARD_WATCHDOG)
+        loop_guard = self.settings.value("loop_guard_mode", LOOP_GUARD_PER_LOOP, type=str)
+        self.loop_guard_combo.setCurrentIndex(max(0, self.loop_guard_combo.findData(loop_guard)))
+        exec_steps_layout.addRow("Protection contre les boucles infinies:", self.loop_guard_combo)
+        
+        # Instructions generated inside a function, see algo_codegen
+        self.fast_locals_checkbox = QCheckBox("Variables locales rapides (programme dans une fonction)")
+        self.fast_locals_checkbox.setToolTip("Le code Python généré place les instructions dans la fonction "
+                                             "_algo_main() : les boucles s'exécutent plus vite.")
+        self.fast_locals_checkbox.setChecked(self.settings.value("fast_locals", True, type=bool))
+        exec_steps_layout.addRow(self.fast_locals_checkbox)
+        
+        self.cpu_time_limit = QSpinBox()
+        self.cpu_time_limit.setRange(1, 600)
+        self.cpu_time_limit.setSuffix(" s")
+        self.cpu_time_limit.setValue(int(self.settings.value("algorithm_cpu_time_limit", DEFAULT_CPU_TIME_LIMIT, type=float)))
+        exec_steps_layout.addRow("Temps de calcul maximal:", self.cpu_time_limit)
+        
+        # Output caps, see output_buffer
+        self.output_max_lines = QSpinBox()
+        self.output_max_lines.setRange(100, 10000000)
+        self.output_max_lines.setSingleStep(10000)
+        self.output_max_lines.setValue(self.settings.value("output_max_lines", DEFAULT_MAX_OUTPUT_LINES, type=int))
+        exec_steps_layout.addRow("Nombre maximal de lignes de sortie:", self.output_max_lines)
+        
+        self.output_max_kb = QSpinBox()
+        self.output_max_kb.setRange(64, 1024 * 1024)
+        self.output_max_kb.setSingleStep(1024)
+        self.output_max_kb.setSuffix(" Ko")
+        self.output_max_kb.setValue(self.settings.value("output_max_kb", DEFAULT_MAX_OUTPUT_BYTES // 1024, type=int))
+        exec_steps_layout.addRow("Taille maximale de la sortie:", self.output_max_kb)
+        
+        # Child process execution, see process_runner
+        self.isolated_execution_checkbox = QCheckBox("Exécuter dans un processus séparé")
+        self.isolated_execution_checkbox.setChecked(self.settings.value("isolated_execution", True, type=bool))
+        self.isolated_execution_checkbox.setEnabled(process_runner.is_supported())
+        exec_steps_layout.addRow(self.isolated_execution_checkbox)
+        
+        self.memory_limit = QSpinBox()
+        self.memory_limit.setRange(64, 16384)
+        self.memory_limit.setSingleStep(256)
+        self.memory_limit.setSuffix(" Mo")
+        self.memory_limit.setValue(self.settings.value("algorithm_memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB, type=int))
+        self.memory_limit.setEnabled(process_runner.is_supported())
+        exec_steps_layout.addRow("Mémoire maximale:", self.memory_limit)
+        
+        # Step-by-step execution on the GUI thread, see algorithm_driver
+        self.generator_execution_checkbox = QCheckBox("Exécuter pas à pas dans l'interface (sans thread)")
+        self.generator_execution_checkbox.setToolTip(
+            "L'algorithme s'exécute par petites étapes entre les événements de la fenêtre. "
+            "Prioritaire sur l'exécution dans un processus séparé.")
+        self.generator_execution_checkbox.setChecked(self.settings.value("generator_execution", False, type=bool))
+        exec_steps_layout.addRow(self.generator_execution_checkbox)
         exec_layout.addLayout(exec_steps_layout)
         
         # Input type selection
@@ -138,9 +200,15 @@ class SettingsDialog(QDialog):
         self.input_type_group.addButton(self.window_input, 2)
         input_layout.addWidget(self.window_input)
         
+        self.output_tab_input = QRadioButton("Dans l'onglet de sortie")
+        self.input_type_group.addButton(self.output_tab_input, 3)
+        input_layout.addWidget(self.output_tab_input)
+        
         input_type = self.settings.value("input_type", 1, type=int)
         if input_type == 1:
             self.console_input.setChecked(True)
+        elif input_type == 3:
+            self.output_tab_input.setChecked(True)
         else:
             self.window_input.setChecked(True)
         
@@ -293,6 +361,14 @@ class SettingsDialog(QDialog):
             self.settings.setValue("autocomplete_enabled", self.autocomplete_checkbox.isChecked())
             self.settings.setValue("syntax_highlight_enabled", self.syntax_highlight_checkbox.isChecked())
             self.settings.setValue("algorithm_execution_steps", self.exec_steps.value())
+            self.settings.setValue("loop_guard_mode", self.loop_guard_combo.currentData())
+            self.settings.setValue("fast_locals", self.fast_locals_checkbox.isChecked())
+            self.settings.setValue("algorithm_cpu_time_limit", float(self.cpu_time_limit.value()))
+            self.settings.setValue("output_max_lines", self.output_max_lines.value())
+            self.settings.setValue("output_max_kb", self.output_max_kb.value())
+            self.settings.setValue("isolated_execution", self.isolated_execution_checkbox.isChecked())
+            self.settings.setValue("algorithm_memory_limit_mb", self.memory_limit.value())
+            self.settings.setValue("generator_execution", self.generator_execution_checkbox.isChecked())
             self.settings.setValue("input_type", self.input_type_group.checkedId())
             self.settings.setValue("error_language", error_language_ui)
             # Also save the parameter name for direct access in other parts of the application
@@ -315,6 +391,9 @@ class SettingsDialog(QDialog):
                 if hasattr(self.parent, 'compiler') and self.parent.compiler:
                     print(f"Updating compiler execution steps to {self.exec_steps.value()}")
                     self.parent.compiler.update_max_execution_steps(self.exec_steps.value())
+                    self.parent.compiler.update_loop_guard(self.loop_guard_combo.currentData(),
+                                                           float(self.cpu_time_limit.value()))
+                    self.parent.compiler.update_fast_locals(self.fast_locals_checkbox.isChecked())
                     
                     # Update compiler's error language directly for immediate effect
                     print(f"Updating compiler error language to {error_language_param}")
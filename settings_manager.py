@@ -83,8 +83,8 @@ class SettingsManager:
                 print(f"Set autocomplete to {settings_data['autocomplete_enabled']}")
                 
             if "input_type" in settings_data:
-                # Convert "console" or "window" to 1 or 2
-                input_type = 1 if settings_data["input_type"].lower() == "console" else 2
+                # Convert "console", "window" or "output" to 1, 2 or 3
+                input_type = {"console": 1, "output": 3}.get(settings_data["input_type"].lower(), 2)
                 self.qsettings.setValue("input_type", input_type)
                 print(f"Set input type to {input_type} ({settings_data['input_type']})")
                 
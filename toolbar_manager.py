@@ -192,6 +192,12 @@ class ToolbarManager:
         
         toolbar.addWidget(run_button)
         
+        stop_action = QAction(self.parent.style().standardIcon(self.parent.style().SP_MediaStop), "Arrêter", self.parent)
+        stop_action.setShortcut("Shift+F6")
+        stop_action.setToolTip("Arrêter l'exécution (Shift+F6)")
+        stop_action.triggered.connect(self.parent.stop_algorithm)
+        toolbar.addAction(stop_action)
+        
         print_action = QAction(QIcon("icons/printer.png"), "Imprimer code", self.parent)
         print_action.setToolTip("Imprimer code")
         print_action.triggered.connect(self.parent.print_code)